@@ -1,21 +1,152 @@
 # %%
+import asyncio
+import gzip
 import requests
 import json
 import os
+import re
 from dotenv import load_dotenv
 import time
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, AsyncIterator, Callable, Iterator, Optional, List, Tuple
 import pandas as pd
 
+from snapshot_cache import SnapshotCache, normalize_request
+from snapshot_polling import MAX_INTERVAL, ReadyTimeHistogram, retry_after_seconds
+
 # Load environment variables
 load_dotenv()
 
+# Default API key; functions raise ValueError when neither it nor api_key is set
 brightdata_api_key = os.getenv("BRIGHTDATA_API_KEY")
-if not brightdata_api_key:
-    raise ValueError("BRIGHTDATA_API_KEY environment variable is required. Please check your .env file.")
+
+# BrightData dataset API (override the base URL to point at a local stub server)
+BRIGHTDATA_API_URL = "https://api.brightdata.com/datasets/v3"
+
+# Snapshot status values that indicate the snapshot is still processing
+PROCESSING_STATUSES = {"building", "running", "pending", "queued", "STATUS"}
+
+# Observed time-to-ready per dataset type ("location" or "url"), used to tune polling
+READY_TIMES_PATH = os.path.join("Resources", "snapshot_ready_times.json")
+
+# Bytes per chunk when streaming a snapshot download to disk
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Local cache of snapshot results, keyed by the normalized request
+SNAPSHOT_CACHE_DIR = os.path.join("Resources", "snapshot_cache")
+
+# Created on first use (see get_ready_times/get_snapshot_cache), so importing has no side effects
+_ready_times: Optional[ReadyTimeHistogram] = None
+_snapshot_cache: Optional[SnapshotCache] = None
+
+# Airbnb dataset and the fields requested from it
+DATASET_ID = "gd_ld7ll037kqy322v05"
+CUSTOM_OUTPUT_FIELDS = [
+    "name",
+    "price",
+    # "image",
+    "description",
+    "category",
+    "availability",
+    "discount",
+    "reviews",
+    "ratings",
+    # "seller_info",
+    # "breadcrumbs",
+    "location",
+    "lat",
+    "long",
+    "guests",
+    "pets_allowed",
+    "description_items",
+    "category_rating",
+    "house_rules",
+    "details",
+    "highlights",
+    "arrangement_details",
+    "amenities",
+    # "images",
+    # "available_dates",
+    "url",
+    # "final_url",
+    "listing_title",
+    "property_id",
+    "listing_name",
+    "location_details",
+    "description_by_sections",
+    # "description_html",
+    # "location_details_html",
+    "is_supperhost",
+    "host_number_of_reviews",
+    "host_rating",
+    "hosts_year",
+    "host_response_rate",
+    "is_guest_favorite",
+    "travel_details",
+    "pricing_details",
+    "total_price",
+    "currency",
+    "cancellation_policy",
+    "property_number_of_reviews",
+    # "country",
+    # "postcode_map_url",
+    # "host_image",
+    "host_details",
+    "reviews_details",
+    "timestamp",
+    # "input",
+    # "discovery_input",
+    # "error",
+    # "error_code",
+    # "warning",
+    # "warning_code"
+]
+
+# %%
+def get_ready_times() -> ReadyTimeHistogram:
+    """
+    Returns the time-to-ready histograms, loading them from READY_TIMES_PATH on first use.
+    
+    Returns
+    -------
+    ReadyTimeHistogram
+        Histograms shared by every poller in this process.
+    """
+    global _ready_times
+    if _ready_times is None:
+        _ready_times = ReadyTimeHistogram(READY_TIMES_PATH)
+    return _ready_times
+
+# %%
+def get_snapshot_cache() -> SnapshotCache:
+    """
+    Returns the snapshot cache in SNAPSHOT_CACHE_DIR, opening it on first use.
+    
+    The freshness TTL and size bound come from SNAPSHOT_CACHE_TTL_HOURS
+    (default 24) and SNAPSHOT_CACHE_MAX_MB (default 500).
+    
+    Returns
+    -------
+    SnapshotCache
+        Cache shared by every fetch in this process.
+    """
+    global _snapshot_cache
+    if _snapshot_cache is None:
+        _snapshot_cache = SnapshotCache(
+            SNAPSHOT_CACHE_DIR,
+            ttl=float(os.getenv("SNAPSHOT_CACHE_TTL_HOURS", "24")) * 3600,
+            max_bytes=int(float(os.getenv("SNAPSHOT_CACHE_MAX_MB", "500")) * 1024 * 1024)
+        )
+    return _snapshot_cache
 
 # %%
-def get_brightdata_snapshot_by_location(location: str, limit_per_input: int, api_key: str) -> str:
+def get_brightdata_snapshot_by_location(
+    location: str,
+    limit_per_input: int,
+    api_key: str,
+    session: Optional[requests.Session] = None,
+    base_url: str = BRIGHTDATA_API_URL,
+    custom_output_fields: Optional[List[str]] = None
+) -> str:
     """
     Triggers a BrightData Airbnb dataset scrape by location.
     
@@ -27,19 +158,25 @@ def get_brightdata_snapshot_by_location(location: str, limit_per_input: int, api
         Maximum number of listings to retrieve per location.
     api_key : str
         BrightData API key.
+    session : requests.Session, optional
+        Shared HTTP session (default: a one-off request).
+    base_url : str, optional
+        Dataset API base URL (default: BRIGHTDATA_API_URL).
+    custom_output_fields : List[str], optional
+        Fields to request (default: CUSTOM_OUTPUT_FIELDS).
     
     Returns
     -------
     str
         The snapshot ID for retrieving results.
     """
-    api_url = "https://api.brightdata.com/datasets/v3/trigger"
+    api_url = f"{base_url}/trigger"
     headers = {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json",
     }
     params = {
-        "dataset_id": "gd_ld7ll037kqy322v05",
+        "dataset_id": DATASET_ID,
         "include_errors": "false",
         "type": "discover_new",
         "discover_by": "location",
@@ -47,75 +184,23 @@ def get_brightdata_snapshot_by_location(location: str, limit_per_input: int, api
     }
     data = {
         "input": [{"location": location, "currency": "CAD", "country": "CA", "num_of_infants": ""}],
-        "custom_output_fields": [
-            "name",
-            "price",
-            # "image",
-            "description",
-            "category",
-            "availability",
-            "discount",
-            "reviews",
-            "ratings",
-            # "seller_info",
-            # "breadcrumbs",
-            "location",
-            "lat",
-            "long",
-            "guests",
-            "pets_allowed",
-            "description_items",
-            "category_rating",
-            "house_rules",
-            "details",
-            "highlights",
-            "arrangement_details",
-            "amenities",
-            # "images",
-            # "available_dates",
-            "url",
-            # "final_url",
-            "listing_title",
-            "property_id",
-            "listing_name",
-            "location_details",
-            "description_by_sections",
-            # "description_html",
-            # "location_details_html",
-            "is_supperhost",
-            "host_number_of_reviews",
-            "host_rating",
-            "hosts_year",
-            "host_response_rate",
-            "is_guest_favorite",
-            "travel_details",
-            "pricing_details",
-            "total_price",
-            "currency",
-            "cancellation_policy",
-            "property_number_of_reviews",
-            # "country",
-            # "postcode_map_url",
-            # "host_image",
-            "host_details",
-            "reviews_details",
-            "timestamp",
-            # "input",
-            # "discovery_input",
-            # "error",
-            # "error_code",
-            # "warning",
-            # "warning_code"
-        ],
+        "custom_output_fields": list(custom_output_fields or CUSTOM_OUTPUT_FIELDS),
     }
 
-    response = requests.post(api_url, headers=headers, params=params, json=data)
+    response = (session or requests).post(api_url, headers=headers, params=params, json=data)
     response.raise_for_status()
     response_json = response.json()
     return response_json['snapshot_id']
 
 # %%
-def get_brightdata_snapshot_by_url(url: str, api_key: str, country: str = "CA") -> str:
+def get_brightdata_snapshot_by_url(
+    url: str,
+    api_key: str,
+    country: str = "CA",
+    session: Optional[requests.Session] = None,
+    base_url: str = BRIGHTDATA_API_URL,
+    custom_output_fields: Optional[List[str]] = None
+) -> str:
     """
     Triggers a BrightData Airbnb dataset scrape by listing URL.
     
@@ -127,93 +212,88 @@ def get_brightdata_snapshot_by_url(url: str, api_key: str, country: str = "CA")
         BrightData API key.
     country : str, optional
         Country code (default: "CA").
+    session : requests.Session, optional
+        Shared HTTP session (default: a one-off request).
+    base_url : str, optional
+        Dataset API base URL (default: BRIGHTDATA_API_URL).
+    custom_output_fields : List[str], optional
+        Fields to request (default: CUSTOM_OUTPUT_FIELDS).
+    
+    Returns
+    -------
+    str
+        The snapshot ID for retrieving results.
+    """
+    return get_brightdata_snapshot_by_urls(
+        [url], api_key, country, session, base_url, custom_output_fields=custom_output_fields
+    )
+
+# %%
+def get_brightdata_snapshot_by_urls(
+    urls: List[str],
+    api_key: str,
+    country: str = "CA",
+    session: Optional[requests.Session] = None,
+    base_url: str = BRIGHTDATA_API_URL,
+    with_inputs: bool = False,
+    custom_output_fields: Optional[List[str]] = None
+) -> str:
+    """
+    Triggers one BrightData Airbnb dataset scrape for several listing URLs.
+    
+    Parameters
+    ----------
+    urls : List[str]
+        Airbnb listing URLs to scrape, one input each.
+    api_key : str
+        BrightData API key.
+    country : str, optional
+        Country code (default: "CA").
+    session : requests.Session, optional
+        Shared HTTP session (default: a one-off request).
+    base_url : str, optional
+        Dataset API base URL (default: BRIGHTDATA_API_URL).
+    with_inputs : bool, optional
+        Also request the "input", "error" and "error_code" fields, so each
+        output record can be matched to its input URL (default: False).
+    custom_output_fields : List[str], optional
+        Fields to request (default: CUSTOM_OUTPUT_FIELDS).
     
     Returns
     -------
     str
         The snapshot ID for retrieving results.
     """
-    api_url = "https://api.brightdata.com/datasets/v3/trigger"
+    api_url = f"{base_url}/trigger"
     headers = {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json",
     }
     params = {
-        "dataset_id": "gd_ld7ll037kqy322v05",
+        "dataset_id": DATASET_ID,
     }
     data = {
-        "input": [{"url": url, "country": country}],
-        "custom_output_fields": [
-            "name",
-            "price",
-            # "image",
-            "description",
-            "category",
-            "availability",
-            "discount",
-            "reviews",
-            "ratings",
-            # "seller_info",
-            # "breadcrumbs",
-            "location",
-            "lat",
-            "long",
-            "guests",
-            "pets_allowed",
-            "description_items",
-            "category_rating",
-            "house_rules",
-            "details",
-            "highlights",
-            "arrangement_details",
-            "amenities",
-            # "images",
-            # "available_dates",
-            "url",
-            # "final_url",
-            "listing_title",
-            "property_id",
-            "listing_name",
-            "location_details",
-            "description_by_sections",
-            # "description_html",
-            # "location_details_html",
-            "is_supperhost",
-            "host_number_of_reviews",
-            "host_rating",
-            "hosts_year",
-            "host_response_rate",
-            "is_guest_favorite",
-            "travel_details",
-            "pricing_details",
-            "total_price",
-            "currency",
-            "cancellation_policy",
-            "property_number_of_reviews",
-            # "country",
-            # "postcode_map_url",
-            # "host_image",
-            "host_details",
-            "reviews_details",
-            "timestamp",
-            # "input",
-            # "discovery_input",
-            # "error",
-            # "error_code",
-            # "warning",
-            # "warning_code"
-        ],
+        "input": [{"url": url, "country": country} for url in urls],
+        "custom_output_fields": list(custom_output_fields or CUSTOM_OUTPUT_FIELDS),
     }
 
-    response = requests.post(api_url, headers=headers, params=params, json=data)
+    if with_inputs:
+        data["custom_output_fields"] += ["input", "error", "error_code"]
+
+    response = (session or requests).post(api_url, headers=headers, params=params, json=data)
     response.raise_for_status()
     response_json = response.json()
     return response_json['snapshot_id']
 
 # %%
-def get_snapshot_output(snapshot_id: str, api_key: str, max_retries: int = 30, wait_time: int = 30) -> dict:
+def check_snapshot_output(
+    snapshot_id: str,
+    api_key: str,
+    session: Optional[requests.Session] = None,
+    base_url: str = BRIGHTDATA_API_URL
+) -> Optional[Any]:
     """
-    Retrieves snapshot output from Bright Data API with automatic retry logic.
+    Checks a snapshot once and returns its output if it is ready.
     
     Parameters
     ----------
@@ -221,10 +301,73 @@ def get_snapshot_output(snapshot_id: str, api_key: str, max_retries: int = 30, w
         The snapshot ID returned from triggering the dataset.
     api_key : str
         Bright Data API key.
-    max_retries : int, optional
-        Maximum number of retry attempts (default: 30).
-    wait_time : int, optional
-        Wait time in seconds between retries (default: 30).
+    session : requests.Session, optional
+        Shared HTTP session (default: a one-off request).
+    base_url : str, optional
+        Dataset API base URL (default: BRIGHTDATA_API_URL).
+    
+    Returns
+    -------
+    dict, list or None
+        The snapshot output, or None while the snapshot is still processing.
+    
+    Raises
+    ------
+    requests.RequestException
+        If API request fails.
+    """
+    url = f"{base_url}/snapshot/{snapshot_id}"
+    headers = {
+        "Authorization": f"Bearer {api_key}"
+    }
+    params = {
+        "format": "json"
+    }
+    
+    response = (session or requests).get(url, headers=headers, params=params)
+    response.raise_for_status()  # Raise exception for HTTP errors
+    
+    data = response.json()
+    
+    # Check if snapshot is still running
+    if isinstance(data, dict) and data.get("status") in PROCESSING_STATUSES:
+        return None
+    return data
+
+# %%
+def get_snapshot_output(
+    snapshot_id: str,
+    api_key: str,
+    timeout: float = 1800,
+    dataset_type: str = "url",
+    max_interval: float = MAX_INTERVAL,
+    session: Optional[requests.Session] = None,
+    base_url: str = BRIGHTDATA_API_URL
+) -> dict:
+    """
+    Retrieves snapshot output from Bright Data API with adaptive polling.
+    
+    Checks start a few seconds apart and back off geometrically (with jitter)
+    up to max_interval, until the timeout. The first check and the starting
+    interval are tuned to the ready times observed for the dataset type, and
+    Retry-After headers on 429/5xx responses are honoured.
+    
+    Parameters
+    ----------
+    snapshot_id : str
+        The snapshot ID returned from triggering the dataset.
+    api_key : str
+        Bright Data API key.
+    timeout : float, optional
+        Total seconds to wait for the snapshot (default: 1800, i.e. 30 minutes).
+    dataset_type : str, optional
+        Kind of scrape, "location" or "url" (default: "url").
+    max_interval : float, optional
+        Cap on the seconds between checks (default: MAX_INTERVAL).
+    session : requests.Session, optional
+        Shared HTTP session (default: one-off requests).
+    base_url : str, optional
+        Dataset API base URL (default: BRIGHTDATA_API_URL).
 
     Returns
     -------
@@ -234,49 +377,219 @@ def get_snapshot_output(snapshot_id: str, api_key: str, max_retries: int = 30, w
     Raises
     ------
     TimeoutError
-        If snapshot is not ready after max_retries.
+        If snapshot is not ready within timeout seconds.
+    requests.RequestException
+        If the last API request before the timeout fails.
+    """
+    return _poll_until_ready(
+        lambda: check_snapshot_output(snapshot_id, api_key, session, base_url),
+        snapshot_id, timeout, dataset_type, max_interval
+    )
+
+# %%
+def _poll_until_ready(
+    check: Callable[[], Optional[Any]],
+    snapshot_id: str,
+    timeout: float,
+    dataset_type: str,
+    max_interval: float
+) -> Any:
+    """Run check on the adaptive schedule until it returns a result (see get_snapshot_output)."""
+    schedule = get_ready_times().schedule(dataset_type, timeout, max_interval=max_interval)
+    delay = schedule.first_delay
+    if delay:
+        print(f"Snapshots of this type take at least {delay:.0f} seconds. Waiting...")
+    
+    attempt = 0
+    while True:
+        time.sleep(delay)
+        attempt += 1
+        error = None
+        retry_after = None
+        try:
+            print(f"Attempt {attempt} ({schedule.elapsed():.0f}s elapsed): Checking snapshot status...")
+            data = check()
+            
+            # Data is ready - return the parsed response
+            if data is not None:
+                get_ready_times().record(dataset_type, schedule.elapsed())
+                print("Snapshot ready! Data retrieved successfully.")
+                return data
+        except requests.RequestException as e:
+            print(f"API request failed on attempt {attempt}: {e}")
+            error = e
+            retry_after = retry_after_seconds(e.response)
+        
+        delay = schedule.next_delay(retry_after)
+        if delay is None:
+            if error is not None:
+                raise error
+            raise TimeoutError(f"Snapshot {snapshot_id} was not ready after {timeout} seconds ({attempt} attempts)")
+        
+        if error is None:
+            print(f"Snapshot still processing. Waiting {delay:.0f} seconds...")
+        else:
+            print(f"Retrying in {delay:.0f} seconds...")
+
+# %%
+def download_snapshot_ndjson(
+    snapshot_id: str,
+    api_key: str,
+    path: str,
+    session: Optional[requests.Session] = None,
+    base_url: str = BRIGHTDATA_API_URL
+) -> Optional[str]:
+    """
+    Streams a ready snapshot as gzip-compressed NDJSON (one listing per line) to disk.
+    
+    The body is requested in NDJSON format and written chunk by chunk, so
+    neither the raw response nor the parsed listings are held in memory.
+    The file is written under a ".part" name and renamed once complete.
+    
+    Parameters
+    ----------
+    snapshot_id : str
+        The snapshot ID returned from triggering the dataset.
+    api_key : str
+        Bright Data API key.
+    path : str
+        Destination file (e.g., "Resources/airbnb_listing_s_<snapshot_id>.ndjson.gz").
+    session : requests.Session, optional
+        Shared HTTP session (default: a one-off request).
+    base_url : str, optional
+        Dataset API base URL (default: BRIGHTDATA_API_URL).
+    
+    Returns
+    -------
+    str or None
+        path once the snapshot is saved, or None while it is still processing.
+    
+    Raises
+    ------
     requests.RequestException
         If API request fails.
     """
-    url = f"https://api.brightdata.com/datasets/v3/snapshot/{snapshot_id}"
+    url = f"{base_url}/snapshot/{snapshot_id}"
     headers = {
         "Authorization": f"Bearer {api_key}"
     }
     params = {
-        "format": "json"
+        "format": "ndjson"
     }
     
-    for attempt in range(max_retries):
+    with (session or requests).get(url, headers=headers, params=params, stream=True) as response:
+        response.raise_for_status()
+        chunks = response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE)
+        first_chunk = next(chunks, b"")
+        
+        # A still-processing snapshot answers with a small status object instead of listings
         try:
-            print(f"Attempt {attempt + 1}/{max_retries}: Checking snapshot status...")
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()  # Raise exception for HTTP errors
-            
-            data = response.json()
+            status = json.loads(first_chunk)
+        except ValueError:
+            status = None
+        if isinstance(status, dict) and status.get("status") in PROCESSING_STATUSES:
+            return None
+        
+        partial_path = f"{path}.part"
+        with gzip.open(partial_path, "wb") as snapshot_file:
+            snapshot_file.write(first_chunk)
+            for chunk in chunks:
+                snapshot_file.write(chunk)
+    
+    os.replace(partial_path, path)
+    return path
 
-            # Status values that indicate the snapshot is still processing
-            processing_statuses = {"building", "running", "pending", "queued", "STATUS"}
-            
-            # Check if snapshot is still running
-            if isinstance(data, dict) and data.get("status") in processing_statuses:
-                print(f"Snapshot still processing (status: {data.get('status')}). Waiting {wait_time} seconds...")
-                if attempt < max_retries - 1:  # Don't sleep on the last attempt
-                    time.sleep(wait_time)
+# %%
+def iter_snapshot_listings(path: str) -> Iterator[Dict]:
+    """
+    Yields the listings of a snapshot file saved by download_snapshot_ndjson one at a time.
+    
+    Parameters
+    ----------
+    path : str
+        Gzip-compressed NDJSON snapshot file.
+    
+    Yields
+    ------
+    dict
+        One listing per line (lines holding a JSON array yield each element).
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as snapshot_file:
+        for line in snapshot_file:
+            if not line.strip():
                 continue
-            
-            # Data is ready - return the parsed response
-            print("Snapshot ready! Data retrieved successfully.")
-            return data
+            record = json.loads(line)
+            if isinstance(record, list):
+                yield from record
+            else:
+                yield record
 
-        except requests.RequestException as e:
-            print(f"API request failed on attempt {attempt + 1}: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(wait_time)
-                continue
-            raise
+# %%
+def stream_snapshot_listings(
+    snapshot_id: str,
+    api_key: str,
+    path: Optional[str] = None,
+    timeout: float = 1800,
+    dataset_type: str = "url",
+    max_interval: float = MAX_INTERVAL,
+    session: Optional[requests.Session] = None,
+    base_url: str = BRIGHTDATA_API_URL
+) -> Iterator[Dict]:
+    """
+    Waits for a snapshot, streams it to disk and yields its listings incrementally.
+    
+    Polls on the same adaptive schedule as get_snapshot_output, but the
+    finished snapshot goes straight to a compressed file and listings are
+    parsed one line at a time, so memory stays flat however large the
+    snapshot is. The file is kept, so the listings can be read again with
+    iter_snapshot_listings.
+    
+    Parameters
+    ----------
+    snapshot_id : str
+        The snapshot ID returned from triggering the dataset.
+    api_key : str
+        Bright Data API key.
+    path : str, optional
+        Destination file (default: "Resources/airbnb_listing_s_<snapshot_id>.ndjson.gz").
+    timeout : float, optional
+        Total seconds to wait for the snapshot (default: 1800, i.e. 30 minutes).
+    dataset_type : str, optional
+        Kind of scrape, "location" or "url" (default: "url").
+    max_interval : float, optional
+        Cap on the seconds between checks (default: MAX_INTERVAL).
+    session : requests.Session, optional
+        Shared HTTP session (default: one-off requests).
+    base_url : str, optional
+        Dataset API base URL (default: BRIGHTDATA_API_URL).
     
-    # If we've exhausted all retries
-    raise TimeoutError(f"Snapshot {snapshot_id} was not ready after {max_retries} attempts ({max_retries * wait_time} seconds)")
+    Yields
+    ------
+    dict
+        One listing at a time.
+    
+    Raises
+    ------
+    TimeoutError
+        If snapshot is not ready within timeout seconds.
+    requests.RequestException
+        If the last API request before the timeout fails.
+    
+    Examples
+    --------
+    >>> for listing in stream_snapshot_listings(snapshot_id, api_key, dataset_type="location"):
+    ...     load_listing(listing)
+    """
+    if path is None:
+        os.makedirs("Resources", exist_ok=True)
+        path = f"Resources/airbnb_listing_s_{snapshot_id}.ndjson.gz"
+    
+    _poll_until_ready(
+        lambda: download_snapshot_ndjson(snapshot_id, api_key, path, session, base_url),
+        snapshot_id, timeout, dataset_type, max_interval
+    )
+    print(f"✓ Snapshot streamed to {path}")
+    yield from iter_snapshot_listings(path)
 
 # %%
 def extract_airbnb_listings(json_output: Any) -> Tuple[List[Dict], pd.DataFrame]:
@@ -322,13 +635,42 @@ def extract_airbnb_listings(json_output: Any) -> Tuple[List[Dict], pd.DataFrame]
     
     return data, df
 
+# %%
+def load_cached_listings(request: Dict[str, Any], max_age: Optional[float] = None) -> Optional[Tuple[str, List[Dict], pd.DataFrame]]:
+    """
+    Loads the listings of a request from the snapshot cache if a fresh snapshot is cached.
+    
+    Parameters
+    ----------
+    request : dict
+        Normalized request (see snapshot_cache.normalize_request).
+    max_age : float, optional
+        Freshness in seconds (default: the cache TTL, SNAPSHOT_CACHE_TTL_HOURS).
+    
+    Returns
+    -------
+    Tuple[str, List[Dict], pd.DataFrame] or None
+        Snapshot ID, list of listing dictionaries and DataFrame, or None on
+        a cache miss.
+    """
+    cached = get_snapshot_cache().get(request, max_age)
+    if cached is None:
+        return None
+    
+    snapshot_id, cache_path = cached
+    print(f"✓ Served from cache: snapshot {snapshot_id} ({cache_path})")
+    listings_data, listings_df = extract_airbnb_listings(list(iter_snapshot_listings(cache_path)))
+    return snapshot_id, listings_data, listings_df
+
 # %%
 def fetch_airbnb_listings_by_location(
     location: str, 
     limit_per_input: int = 100,
     api_key: Optional[str] = None,
-    max_retries: int = 240, 
-    wait_time: int = 30
+    timeout: float = 7200,
+    custom_output_fields: Optional[List[str]] = None,
+    use_cache: bool = True,
+    max_age: Optional[float] = None
 ) -> Tuple[str, List[Dict], pd.DataFrame]:
     """
     Orchestrates the full Airbnb listings scraping process by location using Bright Data API.
@@ -344,10 +686,16 @@ def fetch_airbnb_listings_by_location(
         Maximum number of listings to retrieve (default: 100).
     api_key : str, optional
         BrightData API key. If not provided, will use BRIGHTDATA_API_KEY from .env file.
-    max_retries : int, optional
-        Maximum retries for snapshot polling (default: 240, allows for 2 hours with 30s intervals).
-    wait_time : int, optional
-        Wait time in seconds between retries (default: 30).
+    timeout : float, optional
+        Seconds to wait for the snapshot (default: 7200, i.e. 2 hours).
+    custom_output_fields : List[str], optional
+        Fields to request (default: CUSTOM_OUTPUT_FIELDS).
+    use_cache : bool, optional
+        Serve a fresh cached snapshot of the same request from
+        the snapshot cache (get_snapshot_cache) and cache new results
+        (default: True).
+    max_age : float, optional
+        Freshness in seconds for the cache lookup (default: the cache TTL).
     
     Returns
     -------
@@ -362,7 +710,7 @@ def fetch_airbnb_listings_by_location(
     ValueError
         If API key is not provided and not found in environment.
     TimeoutError
-        If snapshot is not ready after max_retries.
+        If snapshot is not ready within timeout seconds.
     
     Examples
     --------
@@ -386,18 +734,29 @@ def fetch_airbnb_listings_by_location(
     
     print(f"Fetching Airbnb listings for location: {location}")
     print(f"Limit per input: {limit_per_input}")
-    print(f"Max wait time: {max_retries * wait_time} seconds (~{(max_retries * wait_time) / 60:.1f} minutes)")
+    
+    request = normalize_request(
+        "location", location, "CA", "CAD", limit_per_input, custom_output_fields or CUSTOM_OUTPUT_FIELDS
+    )
+    if use_cache:
+        cached = load_cached_listings(request, max_age)
+        if cached is not None:
+            return cached
+    
+    print(f"Max wait time: {timeout} seconds (~{timeout / 60:.1f} minutes)")
     print("-" * 80)
     
     # Step 1: Trigger the snapshot
     print("Step 1: Triggering BrightData API snapshot...")
-    snapshot_id = get_brightdata_snapshot_by_location(location, limit_per_input, api_key)
+    snapshot_id = get_brightdata_snapshot_by_location(
+        location, limit_per_input, api_key, custom_output_fields=custom_output_fields
+    )
     print(f"✓ Snapshot triggered successfully. Snapshot ID: {snapshot_id}")
     print()
     
     # Step 2: Wait for and retrieve the snapshot output
     print("Step 2: Waiting for snapshot to complete...")
-    output = get_snapshot_output(snapshot_id, api_key, max_retries, wait_time)
+    output = get_snapshot_output(snapshot_id, api_key, timeout, dataset_type="location")
     print("✓ Snapshot retrieved successfully")
     print()
     
@@ -412,6 +771,9 @@ def fetch_airbnb_listings_by_location(
     print(f"Total listings retrieved: {len(listings_data)}")
     print(f"Snapshot ID: {snapshot_id}")
     
+    if use_cache:
+        get_snapshot_cache().put(request, snapshot_id, listings_data)
+    
     return snapshot_id, listings_data, listings_df
 
 # %%
@@ -419,8 +781,10 @@ def fetch_airbnb_listings_by_url(
     url: str,
     api_key: Optional[str] = None,
     country: str = "CA",
-    max_retries: int = 60, 
-    wait_time: int = 30
+    timeout: float = 1800,
+    custom_output_fields: Optional[List[str]] = None,
+    use_cache: bool = True,
+    max_age: Optional[float] = None
 ) -> Tuple[str, List[Dict], pd.DataFrame]:
     """
     Orchestrates the full Airbnb listing scraping process by URL using Bright Data API.
@@ -436,10 +800,16 @@ def fetch_airbnb_listings_by_url(
         BrightData API key. If not provided, will use BRIGHTDATA_API_KEY from .env file.
     country : str, optional
         Country code (default: "CA").
-    max_retries : int, optional
-        Maximum retries for snapshot polling (default: 60, allows for 30 minutes with 30s intervals).
-    wait_time : int, optional
-        Wait time in seconds between retries (default: 30).
+    timeout : float, optional
+        Seconds to wait for the snapshot (default: 1800, i.e. 30 minutes).
+    custom_output_fields : List[str], optional
+        Fields to request (default: CUSTOM_OUTPUT_FIELDS).
+    use_cache : bool, optional
+        Serve a fresh cached snapshot of the same request from
+        the snapshot cache (get_snapshot_cache) and cache new results
+        (default: True).
+    max_age : float, optional
+        Freshness in seconds for the cache lookup (default: the cache TTL).
     
     Returns
     -------
@@ -454,7 +824,7 @@ def fetch_airbnb_listings_by_url(
     ValueError
         If API key is not provided and not found in environment.
     TimeoutError
-        If snapshot is not ready after max_retries.
+        If snapshot is not ready within timeout seconds.
     
     Examples
     --------
@@ -478,18 +848,25 @@ def fetch_airbnb_listings_by_url(
     
     print(f"Fetching Airbnb listing from URL: {url}")
     print(f"Country: {country}")
-    print(f"Max wait time: {max_retries * wait_time} seconds (~{(max_retries * wait_time) / 60:.1f} minutes)")
+    
+    request = normalize_request("url", url, country, None, None, custom_output_fields or CUSTOM_OUTPUT_FIELDS)
+    if use_cache:
+        cached = load_cached_listings(request, max_age)
+        if cached is not None:
+            return cached
+    
+    print(f"Max wait time: {timeout} seconds (~{timeout / 60:.1f} minutes)")
     print("-" * 80)
     
     # Step 1: Trigger the snapshot
     print("Step 1: Triggering BrightData API snapshot...")
-    snapshot_id = get_brightdata_snapshot_by_url(url, api_key, country)
+    snapshot_id = get_brightdata_snapshot_by_url(url, api_key, country, custom_output_fields=custom_output_fields)
     print(f"✓ Snapshot triggered successfully. Snapshot ID: {snapshot_id}")
     print()
     
     # Step 2: Wait for and retrieve the snapshot output
     print("Step 2: Waiting for snapshot to complete (this typically takes 2-5 minutes)...")
-    output = get_snapshot_output(snapshot_id, api_key, max_retries, wait_time)
+    output = get_snapshot_output(snapshot_id, api_key, timeout, dataset_type="url")
     print("✓ Snapshot retrieved successfully")
     print()
     
@@ -504,9 +881,457 @@ def fetch_airbnb_listings_by_url(
     print(f"Total listings retrieved: {len(listings_data)}")
     print(f"Snapshot ID: {snapshot_id}")
     
+    if use_cache:
+        get_snapshot_cache().put(request, snapshot_id, listings_data)
+    
     return snapshot_id, listings_data, listings_df
 
 
+# %%
+def create_shared_session(pool_size: int) -> requests.Session:
+    """
+    Creates an HTTP session whose connection pool serves concurrent requests.
+    
+    Parameters
+    ----------
+    pool_size : int
+        Expected number of concurrent requests.
+    
+    Returns
+    -------
+    requests.Session
+        Session with a connection pool of at least pool_size connections.
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=max(10, pool_size))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+# %%
+async def poll_snapshot_output_async(
+    snapshot_id: str,
+    api_key: str,
+    session: requests.Session,
+    dataset_type: str = "location",
+    max_poll_interval: float = MAX_INTERVAL,
+    timeout: float = 7200,
+    base_url: str = BRIGHTDATA_API_URL
+) -> Any:
+    """
+    Polls a snapshot without blocking the event loop until its output is ready.
+    
+    Each check runs in a worker thread on the shared session; between checks
+    the coroutine sleeps, so many snapshots can be polled at the same time.
+    Checks follow the same adaptive schedule as get_snapshot_output.
+    
+    Parameters
+    ----------
+    snapshot_id : str
+        The snapshot ID returned from triggering the dataset.
+    api_key : str
+        Bright Data API key.
+    session : requests.Session
+        Shared HTTP session.
+    dataset_type : str, optional
+        Kind of scrape, "location" or "url" (default: "location").
+    max_poll_interval : float, optional
+        Cap on the seconds between status checks (default: MAX_INTERVAL).
+    timeout : float, optional
+        Seconds to wait for the snapshot before giving up (default: 7200).
+    base_url : str, optional
+        Dataset API base URL (default: BRIGHTDATA_API_URL).
+    
+    Returns
+    -------
+    dict or list
+        The snapshot output.
+    
+    Raises
+    ------
+    TimeoutError
+        If the snapshot is not ready within timeout seconds.
+    requests.RequestException
+        If the last API request before the timeout fails.
+    """
+    schedule = get_ready_times().schedule(dataset_type, timeout, max_interval=max_poll_interval)
+    delay = schedule.first_delay
+    
+    while True:
+        await asyncio.sleep(delay)
+        error = None
+        retry_after = None
+        try:
+            data = await asyncio.to_thread(check_snapshot_output, snapshot_id, api_key, session, base_url)
+            if data is not None:
+                get_ready_times().record(dataset_type, schedule.elapsed())
+                return data
+        except requests.RequestException as e:
+            print(f"[{snapshot_id}] API request failed: {e}")
+            error = e
+            retry_after = retry_after_seconds(e.response)
+        
+        delay = schedule.next_delay(retry_after)
+        if delay is None:
+            if error is not None:
+                raise error
+            raise TimeoutError(f"Snapshot {snapshot_id} was not ready after {timeout} seconds")
+
+# %%
+async def _fetch_location_async(
+    location: str,
+    limit_per_input: int,
+    api_key: str,
+    session: requests.Session,
+    max_poll_interval: float,
+    timeout: float,
+    base_url: str
+) -> Tuple[str, str, List[Dict], pd.DataFrame]:
+    """Trigger, poll and extract one location for fetch_many_locations."""
+    try:
+        snapshot_id = await asyncio.to_thread(
+            get_brightdata_snapshot_by_location, location, limit_per_input, api_key, session, base_url
+        )
+        print(f"✓ Snapshot triggered for {location}. Snapshot ID: {snapshot_id}")
+        
+        output = await poll_snapshot_output_async(
+            snapshot_id, api_key, session, "location", max_poll_interval, timeout, base_url
+        )
+        listings_data, listings_df = extract_airbnb_listings(output)
+        print(f"✓ {location}: {len(listings_data)} listings (snapshot {snapshot_id})")
+        return location, snapshot_id, listings_data, listings_df
+    except Exception as e:
+        e.add_note(f"Location: {location}")
+        raise
+
+# %%
+async def fetch_many_locations(
+    locations: List[str],
+    limit_per_input: int = 100,
+    api_key: Optional[str] = None,
+    max_poll_interval: float = MAX_INTERVAL,
+    timeout: float = 7200,
+    base_url: str = BRIGHTDATA_API_URL
+) -> AsyncIterator[Tuple[str, str, List[Dict], pd.DataFrame]]:
+    """
+    Fetches Airbnb listings for many locations concurrently.
+    
+    Every location is triggered right away and all snapshots are polled at
+    the same time over one shared HTTP session, so the total wall time is
+    close to the slowest snapshot instead of the sum of all of them.
+    Results are yielded as soon as each snapshot is ready.
+    
+    Parameters
+    ----------
+    locations : List[str]
+        Locations to search (e.g., ["Beltline, Calgary", "Kensington, Calgary"]).
+    limit_per_input : int, optional
+        Maximum number of listings to retrieve per location (default: 100).
+    api_key : str, optional
+        BrightData API key. If not provided, will use BRIGHTDATA_API_KEY from .env file.
+    max_poll_interval : float, optional
+        Cap on the seconds between status checks of each snapshot
+        (default: MAX_INTERVAL).
+    timeout : float, optional
+        Seconds to wait for each snapshot (default: 7200, i.e. 2 hours).
+    base_url : str, optional
+        Dataset API base URL (default: BRIGHTDATA_API_URL).
+    
+    Yields
+    ------
+    Tuple[str, str, List[Dict], pd.DataFrame]
+        Location, snapshot ID, list of listing dictionaries and DataFrame,
+        in order of completion.
+    
+    Raises
+    ------
+    ValueError
+        If API key is not provided and not found in environment.
+    ExceptionGroup
+        After all other locations finished, if any location failed (each
+        exception carries a note with its location).
+    
+    Examples
+    --------
+    >>> async for location, snapshot_id, listings_data, listings_df in fetch_many_locations(
+    ...     ["Beltline, Calgary", "Kensington, Calgary"], limit_per_input=50
+    ... ):
+    ...     print(f"{location}: {len(listings_df)} listings")
+    """
+    # Use provided API key or fall back to environment variable
+    if api_key is None:
+        api_key = brightdata_api_key
+    
+    if not api_key:
+        raise ValueError("API key must be provided or set in BRIGHTDATA_API_KEY environment variable")
+    
+    print(f"Fetching Airbnb listings for {len(locations)} locations concurrently")
+    print("-" * 80)
+    
+    # One connection pool shared by every trigger and poll
+    session = create_shared_session(len(locations))
+    
+    tasks = [
+        asyncio.create_task(_fetch_location_async(
+            location, limit_per_input, api_key, session, max_poll_interval, timeout, base_url
+        ))
+        for location in locations
+    ]
+    errors = []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                result = await next_done
+            except Exception as e:
+                print(f"❌ {e} ({'; '.join(getattr(e, '__notes__', []))})")
+                errors.append(e)
+                continue
+            yield result
+    finally:
+        # Stop polling if the consumer stops early
+        for task in tasks:
+            task.cancel()
+        session.close()
+    
+    if errors:
+        raise ExceptionGroup(f"{len(errors)} of {len(locations)} locations failed", errors)
+
+
+# %%
+def listing_id_from_url(url: str) -> Optional[str]:
+    """
+    Extracts the Airbnb property ID from a listing URL.
+    
+    Parameters
+    ----------
+    url : str
+        Listing URL (e.g., "https://www.airbnb.ca/rooms/1300059188064308611?adults=2").
+    
+    Returns
+    -------
+    str or None
+        The numeric ID after /rooms/, or None if the URL has none.
+    """
+    match = re.search(r"/rooms/(\d+)", url or "")
+    return match.group(1) if match else None
+
+# %%
+def match_url_results(urls: List[str], output: Any, snapshot_id: str) -> List[Dict[str, Any]]:
+    """
+    Maps the records of a multi-URL snapshot back to their input URLs.
+    
+    Records are matched by their "input" URL when present, otherwise by
+    property_id against the ID in the input URL. Records carrying an
+    "error" or "error_code" mark their input as errored.
+    
+    Parameters
+    ----------
+    urls : List[str]
+        Input URLs of the snapshot.
+    output : dict or list
+        Snapshot output (see check_snapshot_output).
+    snapshot_id : str
+        Snapshot ID, copied into each result.
+    
+    Returns
+    -------
+    List[Dict[str, Any]]
+        One result per input URL, in input order, with keys: url,
+        property_id, status ("ok", "error" or "missing"), listing (dict or
+        None), error (str or None) and snapshot_id.
+    """
+    records = output if isinstance(output, list) else [output]
+    by_url = {url: i for i, url in enumerate(urls)}
+    by_id = {listing_id_from_url(url): i for i, url in enumerate(urls) if listing_id_from_url(url)}
+    
+    results = [
+        {"url": url, "property_id": listing_id_from_url(url), "status": "missing",
+         "listing": None, "error": None, "snapshot_id": snapshot_id}
+        for url in urls
+    ]
+    for record in records:
+        if not isinstance(record, dict):
+            continue
+        record_input = record.get("input")
+        input_url = record_input.get("url") if isinstance(record_input, dict) else None
+        index = by_url.get(input_url)
+        if index is None:
+            index = by_id.get(str(record.get("property_id") or listing_id_from_url(input_url)))
+        if index is None:
+            print(f"[{snapshot_id}] Output record matches no input URL (property_id: {record.get('property_id')})")
+            continue
+        
+        result = results[index]
+        if record.get("error") or record.get("error_code"):
+            result["status"] = "error"
+            result["error"] = f"{record.get('error_code') or 'error'}: {record.get('error') or ''}".rstrip(": ")
+        else:
+            result["status"] = "ok"
+            result["listing"] = record
+            result["error"] = None
+            result["property_id"] = str(record.get("property_id") or result["property_id"])
+    
+    return results
+
+# %%
+async def _fetch_url_chunk_async(
+    urls: List[str],
+    api_key: str,
+    country: str,
+    session: requests.Session,
+    max_poll_interval: float,
+    timeout: float,
+    base_url: str
+) -> List[Dict[str, Any]]:
+    """Trigger, poll and map one chunk of URLs for fetch_airbnb_listings_by_urls."""
+    snapshot_id = None
+    try:
+        snapshot_id = await asyncio.to_thread(
+            get_brightdata_snapshot_by_urls, urls, api_key, country, session, base_url, True
+        )
+        print(f"✓ Snapshot triggered for {len(urls)} URLs. Snapshot ID: {snapshot_id}")
+        
+        output = await poll_snapshot_output_async(
+            snapshot_id, api_key, session, "url", max_poll_interval, timeout, base_url
+        )
+        results = match_url_results(urls, output, snapshot_id)
+        print(f"✓ Snapshot {snapshot_id}: {sum(r['status'] == 'ok' for r in results)}/{len(urls)} URLs scraped")
+        return results
+    except Exception as e:
+        # A failed chunk marks its own inputs as errored, not the whole batch
+        print(f"❌ Chunk of {len(urls)} URLs failed (snapshot {snapshot_id}): {e}")
+        return [
+            {"url": url, "property_id": listing_id_from_url(url), "status": "error",
+             "listing": None, "error": f"{type(e).__name__}: {e}", "snapshot_id": snapshot_id}
+            for url in urls
+        ]
+
+# %%
+async def fetch_airbnb_listings_by_urls(
+    urls: List[str],
+    api_key: Optional[str] = None,
+    country: str = "CA",
+    chunk_size: int = 100,
+    max_poll_interval: float = MAX_INTERVAL,
+    timeout: float = 1800,
+    base_url: str = BRIGHTDATA_API_URL
+) -> Tuple[List[Dict[str, Any]], pd.DataFrame]:
+    """
+    Scrapes many Airbnb listing URLs with a few multi-input snapshots.
+    
+    URLs are de-duplicated and packed chunk_size per trigger; all chunks are
+    triggered and polled concurrently over one shared HTTP session. Every
+    input URL gets its own result, so a missing or errored URL (or a failed
+    chunk) is reported without failing the rest of the batch.
+    
+    Parameters
+    ----------
+    urls : List[str]
+        Airbnb listing URLs to scrape.
+    api_key : str, optional
+        BrightData API key. If not provided, will use BRIGHTDATA_API_KEY from .env file.
+    country : str, optional
+        Country code (default: "CA").
+    chunk_size : int, optional
+        URLs per trigger (default: 100).
+    max_poll_interval : float, optional
+        Cap on the seconds between status checks of each snapshot
+        (default: MAX_INTERVAL).
+    timeout : float, optional
+        Seconds to wait for each snapshot (default: 1800, i.e. 30 minutes).
+    base_url : str, optional
+        Dataset API base URL (default: BRIGHTDATA_API_URL).
+    
+    Returns
+    -------
+    Tuple[List[Dict[str, Any]], pd.DataFrame]
+        A tuple containing:
+        - One result per input URL, in input order (see match_url_results)
+        - DataFrame with the successfully scraped listings
+    
+    Raises
+    ------
+    ValueError
+        If API key is not provided and not found in environment, or
+        chunk_size is not positive.
+    
+    Examples
+    --------
+    >>> results, listings_df = await fetch_airbnb_listings_by_urls(tracked_urls, chunk_size=50)
+    >>> failed = [r["url"] for r in results if r["status"] != "ok"]
+    """
+    # Use provided API key or fall back to environment variable
+    if api_key is None:
+        api_key = brightdata_api_key
+    
+    if not api_key:
+        raise ValueError("API key must be provided or set in BRIGHTDATA_API_KEY environment variable")
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    
+    unique_urls = list(dict.fromkeys(urls))
+    chunks = [unique_urls[i:i + chunk_size] for i in range(0, len(unique_urls), chunk_size)]
+    print(f"Fetching {len(unique_urls)} Airbnb listing URLs in {len(chunks)} snapshots")
+    print("-" * 80)
+    
+    session = create_shared_session(len(chunks))
+    try:
+        chunk_results = await asyncio.gather(*(
+            _fetch_url_chunk_async(chunk, api_key, country, session, max_poll_interval, timeout, base_url)
+            for chunk in chunks
+        ))
+    finally:
+        session.close()
+    
+    by_url = {result["url"]: result for results in chunk_results for result in results}
+    results = [dict(by_url[url]) for url in urls]
+    
+    listings_df = pd.DataFrame([result["listing"] for result in by_url.values() if result["status"] == "ok"])
+    print("=" * 80)
+    print(f"URLs scraped: {len(listings_df)}/{len(unique_urls)} "
+          f"({sum(r['status'] == 'error' for r in by_url.values())} errors, "
+          f"{sum(r['status'] == 'missing' for r in by_url.values())} missing)")
+    
+    return results, listings_df
+
+# %%
+def save_listings(snapshot_id: str, listings_data: List[Dict], listings_df: pd.DataFrame) -> Tuple[str, str]:
+    """
+    Saves snapshot listings to JSON and Excel files in the Resources folder.
+    
+    Parameters
+    ----------
+    snapshot_id : str
+        Snapshot ID (used in the file names).
+    listings_data : List[Dict]
+        Listing dictionaries.
+    listings_df : pd.DataFrame
+        Listings DataFrame.
+    
+    Returns
+    -------
+    Tuple[str, str]
+        Paths of the JSON and Excel files.
+    """
+    # Create Resources folder if it doesn't exist
+    os.makedirs("Resources", exist_ok=True)
+    
+    # Define file paths with snapshot ID
+    json_filepath = f"Resources/airbnb_listing_s_{snapshot_id}.json"
+    excel_filepath = f"Resources/airbnb_listing_s_{snapshot_id}.xlsx"
+    
+    # Save to JSON
+    with open(json_filepath, "w") as json_file:
+        json.dump(listings_data, json_file, indent=2)
+    print(f"✓ JSON saved: {json_filepath}")
+    
+    # Save to Excel
+    listings_df.to_excel(excel_filepath, index=False)
+    print(f"✓ Excel saved: {excel_filepath}")
+    
+    return json_filepath, excel_filepath
+
+
 # %%
 if __name__ == "__main__":
     """
@@ -520,68 +1345,120 @@ if __name__ == "__main__":
     # CONFIGURATION - Modify as needed
     # ========================================
     
-    # Choose mode: "location" or "url"
+    # Choose mode: "location", "location_stream", "locations", "url" or "urls"
+    # ("location_stream" saves a compressed NDJSON file without holding the listings in memory)
     MODE = "location"  # Change to "url" for URL-based fetching
     
     # For location-based fetching
     LOCATION = "Beltline, Calgary"
     LIMIT_PER_INPUT = 100
     
+    # For concurrent multi-location fetching
+    LOCATIONS = ["Beltline, Calgary", "Kensington, Calgary", "Mission, Calgary"]
+    
     # For URL-based fetching
     LISTING_URL = "https://www.airbnb.ca/rooms/1300059188064308611"
     COUNTRY = "CA"
     
+    # For batch URL fetching
+    LISTING_URLS = [
+        "https://www.airbnb.ca/rooms/1300059188064308611",
+    ]
+    URL_CHUNK_SIZE = 100
+    
+    # Serve repeated "location"/"url" requests from Resources/snapshot_cache
+    # (freshness: SNAPSHOT_CACHE_TTL_HOURS, default 24)
+    USE_CACHE = True
+    
     # ========================================
     # EXECUTION
     # ========================================
     
     try:
-        if MODE.lower() == "location":
-            # Fetch listings by location
-            snapshot_id, listings_data, listings_df = fetch_airbnb_listings_by_location(
-                location=LOCATION,
-                limit_per_input=LIMIT_PER_INPUT
-            )
-        elif MODE.lower() == "url":
-            # Fetch listing by URL
-            snapshot_id, listings_data, listings_df = fetch_airbnb_listings_by_url(
-                url=LISTING_URL,
-                country=COUNTRY
-            )
-        else:
-            raise ValueError(f"Invalid MODE: {MODE}. Must be 'location' or 'url'")
-        
-        # ========================================
-        # SAVE TO FILES
-        # ========================================
-        
-        print("\n" + "=" * 80)
-        print("Step 4: Saving data to files...")
-        print("=" * 80)
-        
-        # Create Resources folder if it doesn't exist
-        os.makedirs("Resources", exist_ok=True)
+        if not brightdata_api_key:
+            raise ValueError("BRIGHTDATA_API_KEY environment variable is required. Please check your .env file.")
         
-        # Define file paths with snapshot ID
-        json_filepath = f"Resources/airbnb_listing_s_{snapshot_id}.json"
-        excel_filepath = f"Resources/airbnb_listing_s_{snapshot_id}.xlsx"
-        
-        # Save to JSON
-        with open(json_filepath, "w") as json_file:
-            json.dump(listings_data, json_file, indent=2)
-        print(f"✓ JSON saved: {json_filepath}")
-        
-        # Save to Excel
-        listings_df.to_excel(excel_filepath, index=False)
-        print(f"✓ Excel saved: {excel_filepath}")
+        if MODE.lower() == "locations":
+            # Fetch all locations concurrently, saving each as soon as it is ready
+            async def fetch_and_save_locations() -> List[Tuple[str, int, str, str]]:
+                saved = []
+                async for location, snapshot_id, listings_data, listings_df in fetch_many_locations(
+                    LOCATIONS, limit_per_input=LIMIT_PER_INPUT
+                ):
+                    print(f"\nSaving {location}...")
+                    saved.append((snapshot_id, len(listings_data)) + save_listings(snapshot_id, listings_data, listings_df))
+                return saved
+            
+            saved_files = asyncio.run(fetch_and_save_locations())
+        elif MODE.lower() == "location_stream":
+            # Stream the snapshot to disk and walk the listings one at a time
+            snapshot_id = get_brightdata_snapshot_by_location(LOCATION, LIMIT_PER_INPUT, brightdata_api_key)
+            print(f"✓ Snapshot triggered successfully. Snapshot ID: {snapshot_id}")
+            
+            ndjson_filepath = f"Resources/airbnb_listing_s_{snapshot_id}.ndjson.gz"
+            listing_count = 0
+            for listing in stream_snapshot_listings(
+                snapshot_id, brightdata_api_key, ndjson_filepath, timeout=7200, dataset_type="location"
+            ):
+                listing_count += 1
+            saved_files = [(snapshot_id, listing_count, ndjson_filepath)]
+            print(f"Load into PostgreSQL with: JSON_FILE={ndjson_filepath} python etl_airbnb_normalized_postgres.py")
+        elif MODE.lower() == "urls":
+            # Fetch many URLs in chunked snapshots, saving each snapshot's listings
+            url_results, _ = asyncio.run(fetch_airbnb_listings_by_urls(
+                LISTING_URLS, country=COUNTRY, chunk_size=URL_CHUNK_SIZE
+            ))
+            
+            print("\nPer-URL results:")
+            for result in url_results:
+                detail = f" - {result['error']}" if result["error"] else ""
+                print(f"  [{result['status']}] {result['property_id']} {result['url']}{detail}")
+            
+            saved_files = []
+            for snapshot_id in dict.fromkeys(r["snapshot_id"] for r in url_results if r["status"] == "ok"):
+                snapshot_listings = list({
+                    r["url"]: r["listing"] for r in url_results
+                    if r["snapshot_id"] == snapshot_id and r["status"] == "ok"
+                }.values())
+                saved_files.append((snapshot_id, len(snapshot_listings)) + save_listings(
+                    snapshot_id, snapshot_listings, pd.DataFrame(snapshot_listings)
+                ))
+        else:
+            if MODE.lower() == "location":
+                # Fetch listings by location
+                snapshot_id, listings_data, listings_df = fetch_airbnb_listings_by_location(
+                    location=LOCATION,
+                    limit_per_input=LIMIT_PER_INPUT,
+                    use_cache=USE_CACHE
+                )
+            elif MODE.lower() == "url":
+                # Fetch listing by URL
+                snapshot_id, listings_data, listings_df = fetch_airbnb_listings_by_url(
+                    url=LISTING_URL,
+                    country=COUNTRY,
+                    use_cache=USE_CACHE
+                )
+            else:
+                raise ValueError(f"Invalid MODE: {MODE}. Must be 'location', 'location_stream', 'locations', 'url' or 'urls'")
+            
+            # ========================================
+            # SAVE TO FILES
+            # ========================================
+            
+            print("\n" + "=" * 80)
+            print("Step 4: Saving data to files...")
+            print("=" * 80)
+            
+            saved_files = [(snapshot_id, len(listings_data)) + save_listings(snapshot_id, listings_data, listings_df)]
         
         print("\n" + "=" * 80)
         print("✅ Script completed successfully!")
-        print(f"Total listings: {len(listings_data)}")
-        print(f"Snapshot ID: {snapshot_id}")
-        print(f"Files saved:")
-        print(f"  - {json_filepath}")
-        print(f"  - {excel_filepath}")
+        for snapshot_id, listing_count, *filepaths in saved_files:
+            print(f"Total listings: {listing_count}")
+            print(f"Snapshot ID: {snapshot_id}")
+            print(f"Files saved:")
+            for filepath in filepaths:
+                print(f"  - {filepath}")
         print("=" * 80)
         
     except Exception as e:
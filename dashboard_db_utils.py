@@ -166,7 +166,7 @@ def get_property_list(_conn: psycopg2.extensions.connection) -> pd.DataFrame:
             p.name,
             p.url
         FROM dim_property p
-        JOIN fact_listing_metrics f ON p.property_key = f.property_key
+        JOIN view_latest_listing_metrics f ON p.property_key = f.property_key
         ORDER BY p.listing_title
     """
     
@@ -233,6 +233,9 @@ def get_property_overview(_conn: psycopg2.extensions.connection,
     - dim_host (host reputation)
     - dim_category_ratings (quality metrics)
     - fact_listing_amenities_summary (amenity aggregates)
+    
+    Only the latest snapshot is read, so the query scans a single
+    fact_listing_metrics partition.
     """
     query = """
         SELECT 
@@ -294,6 +297,7 @@ def get_property_overview(_conn: psycopg2.extensions.connection,
             
         FROM view_listing_summary
         WHERE property_id = %s
+          AND snapshot_date = (SELECT MAX(snapshot_date) FROM fact_listing_metrics)
     """
     
     try:
@@ -394,10 +398,10 @@ def get_top_competitors(_conn: psycopg2.extensions.connection,
             vtc.weight
             
         FROM view_top_competitors vtc
-        -- Join to get listing_key for source property
-        JOIN fact_listing_metrics f_source ON vtc.listing_key = f_source.listing_key
+        -- Join to get listing_key for source property (latest snapshot)
+        JOIN view_latest_listing_metrics f_source ON vtc.listing_key = f_source.listing_key
         -- Join to get competitor details
-        JOIN fact_listing_metrics f ON vtc.competitor_listing_key = f.listing_key
+        JOIN view_latest_listing_metrics f ON vtc.competitor_listing_key = f.listing_key
         JOIN dim_property p ON f.property_key = p.property_key
         JOIN dim_location l ON f.location_key = l.location_key
         
@@ -14,9 +14,12 @@
 -- ============================================================================
 
 DROP MATERIALIZED VIEW IF EXISTS view_top_competitors CASCADE;
+DROP VIEW IF EXISTS view_latest_listing_metrics CASCADE;
 DROP VIEW IF EXISTS view_price_recommendations CASCADE;
 DROP VIEW IF EXISTS view_listing_summary CASCADE;
 
+DROP TABLE IF EXISTS location_cluster_centroids CASCADE;
+DROP TABLE IF EXISTS similarity_feature_state CASCADE;
 DROP TABLE IF EXISTS fact_competitor_pricing_analysis CASCADE;
 DROP TABLE IF EXISTS bridge_listing_competitors CASCADE;
 DROP TABLE IF EXISTS fact_listing_amenities_summary CASCADE;
@@ -167,6 +170,7 @@ COMMENT ON COLUMN dim_location.location_tier IS 'CALCULATED: Urban Core (<1km),
 -- ----------------------------------------------------------------------------
 CREATE TABLE dim_category_ratings (
     rating_key SERIAL PRIMARY KEY,
+    property_id TEXT UNIQUE,  -- Business key (one rating set per property, upserted)
     cleanliness_rating DECIMAL(3, 2),
     accuracy_rating DECIMAL(3, 2),
     checkin_rating DECIMAL(3, 2),
@@ -215,9 +219,12 @@ COMMENT ON COLUMN dim_date.season IS 'Calgary seasons: Stampede (Jul), Summer Pe
 
 -- ----------------------------------------------------------------------------
 -- fact_listing_metrics: Central fact table (one row per listing per snapshot)
+-- Range-partitioned by month of snapshot_date (fact_listing_metrics_pYYYYMM).
+-- The ETL creates the current and next month's partitions before each load
+-- and can detach old ones into the "archive" schema.
 -- ----------------------------------------------------------------------------
 CREATE TABLE fact_listing_metrics (
-    listing_key SERIAL PRIMARY KEY,
+    listing_key SERIAL,
     property_id TEXT NOT NULL,  -- Business key
     
     -- Foreign keys to dimensions
@@ -245,10 +252,13 @@ CREATE TABLE fact_listing_metrics (
     
     -- Metadata
     data_scraped_at TIMESTAMP,
-    snapshot_date DATE DEFAULT CURRENT_DATE,
+    snapshot_date DATE NOT NULL DEFAULT CURRENT_DATE,  -- Partition key
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    
+    -- Unique constraints on a partitioned table must include the partition key
+    PRIMARY KEY (listing_key, snapshot_date)
+) PARTITION BY RANGE (snapshot_date);
 
 COMMENT ON TABLE fact_listing_metrics IS 'Central fact table: listing performance metrics with dimensional context';
 COMMENT ON COLUMN fact_listing_metrics.price_per_guest IS 'CALCULATED: price_per_night / guests_capacity';
@@ -264,7 +274,7 @@ COMMENT ON COLUMN fact_listing_metrics.popularity_index IS 'CALCULATED: (number_
 -- ----------------------------------------------------------------------------
 CREATE TABLE fact_listing_amenities_summary (
     amenity_summary_key SERIAL PRIMARY KEY,
-    listing_key INTEGER REFERENCES fact_listing_metrics(listing_key) ON DELETE CASCADE,
+    listing_key INTEGER,  -- fact_listing_metrics.listing_key (no FK: the partitioned fact's key includes snapshot_date)
     
     -- Amenity counts
     total_amenities_count INTEGER DEFAULT 0,
@@ -289,11 +299,13 @@ COMMENT ON COLUMN fact_listing_amenities_summary.amenity_tier IS 'CALCULATED: Lu
 
 -- ----------------------------------------------------------------------------
 -- fact_competitor_pricing_analysis: Aggregated competitor pricing metrics
+-- Range-partitioned by month of analysis_date_key
+-- (fact_competitor_pricing_analysis_pYYYYMM), managed like fact_listing_metrics.
 -- ----------------------------------------------------------------------------
 CREATE TABLE fact_competitor_pricing_analysis (
-    pricing_analysis_key SERIAL PRIMARY KEY,
-    listing_key INTEGER REFERENCES fact_listing_metrics(listing_key) ON DELETE CASCADE,
-    analysis_date_key INTEGER REFERENCES dim_date(date_key),
+    pricing_analysis_key SERIAL,
+    listing_key INTEGER,  -- fact_listing_metrics.listing_key (no FK: the partitioned fact's key includes snapshot_date)
+    analysis_date_key INTEGER NOT NULL REFERENCES dim_date(date_key),  -- Partition key
     
     -- Competitor statistics
     competitor_count INTEGER DEFAULT 25,
@@ -315,8 +327,9 @@ CREATE TABLE fact_competitor_pricing_analysis (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     
+    PRIMARY KEY (pricing_analysis_key, analysis_date_key),
     UNIQUE(listing_key, analysis_date_key)
-);
+) PARTITION BY RANGE (analysis_date_key);
 
 COMMENT ON TABLE fact_competitor_pricing_analysis IS 'Aggregate fact: competitor pricing statistics and recommendations';
 COMMENT ON COLUMN fact_competitor_pricing_analysis.weighted_avg_price IS 'CALCULATED: Average weighted by similarity scores';
@@ -332,8 +345,8 @@ COMMENT ON COLUMN fact_competitor_pricing_analysis.recommended_optimal_price IS
 -- ----------------------------------------------------------------------------
 CREATE TABLE bridge_listing_competitors (
     bridge_key SERIAL PRIMARY KEY,
-    listing_key INTEGER REFERENCES fact_listing_metrics(listing_key) ON DELETE CASCADE,
-    competitor_listing_key INTEGER REFERENCES fact_listing_metrics(listing_key) ON DELETE CASCADE,
+    listing_key INTEGER,  -- fact_listing_metrics.listing_key (no FK: the partitioned fact's key includes snapshot_date)
+    competitor_listing_key INTEGER,  -- fact_listing_metrics.listing_key
     
     -- Ranking and scoring
     similarity_rank INTEGER NOT NULL CHECK (similarity_rank BETWEEN 1 AND 25),
@@ -369,6 +382,54 @@ COMMENT ON COLUMN bridge_listing_competitors.quality_similarity IS 'CALCULATED:
 COMMENT ON COLUMN bridge_listing_competitors.amenity_similarity IS 'CALCULATED: Jaccard index of shared amenities';
 COMMENT ON COLUMN bridge_listing_competitors.price_similarity IS 'CALCULATED: Price range overlap metric';
 
+-- ============================================================================
+-- ETL STATE TABLES
+-- ============================================================================
+
+-- ----------------------------------------------------------------------------
+-- similarity_feature_state: Similarity inputs as of the last competitor scoring
+-- ----------------------------------------------------------------------------
+CREATE TABLE similarity_feature_state (
+    property_id TEXT PRIMARY KEY,  -- Business key (stable across snapshots)
+    listing_key INTEGER,  -- fact_listing_metrics.listing_key (no FK: the partitioned fact's key includes snapshot_date)
+    
+    -- Similarity inputs used for the current bridge rows
+    price_per_night DECIMAL(10, 2),
+    listing_rating DECIMAL(3, 2),
+    bedrooms INTEGER,
+    beds INTEGER,
+    baths INTEGER,
+    guests_capacity INTEGER,
+    latitude DECIMAL(10, 7),
+    longitude DECIMAL(10, 7),
+    location_cluster_id INTEGER,
+    amenity_score INTEGER,
+    amenity_set_hash TEXT,  -- Hash of the sorted amenity_ids (NULL unless amenity overlap scoring is on)
+    
+    -- Metadata
+    computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE similarity_feature_state IS 'ETL state: similarity inputs per listing, used to detect changes for incremental competitor updates';
+
+-- ----------------------------------------------------------------------------
+-- location_cluster_centroids: K-means centroids behind dim_location.location_cluster_id
+-- ----------------------------------------------------------------------------
+CREATE TABLE location_cluster_centroids (
+    cluster_id INTEGER PRIMARY KEY,  -- Matches dim_location.location_cluster_id
+    centroid_latitude DOUBLE PRECISION NOT NULL,
+    centroid_longitude DOUBLE PRECISION NOT NULL,
+    
+    -- Fit statistics (baseline for drift detection)
+    member_count INTEGER,
+    mean_sq_distance DOUBLE PRECISION,  -- Mean squared distance (degrees²) of members to the centroid
+    
+    -- Metadata
+    fitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE location_cluster_centroids IS 'ETL state: persisted location clusters, so new coordinates are assigned to stable cluster IDs without refitting';
+
 -- ============================================================================
 -- INDEXES FOR QUERY PERFORMANCE
 -- ============================================================================
@@ -517,6 +578,16 @@ LEFT JOIN fact_listing_amenities_summary a ON f.listing_key = a.listing_key;
 
 COMMENT ON VIEW view_listing_summary IS 'Denormalized view: complete listing profile for easy querying';
 
+-- ----------------------------------------------------------------------------
+-- view_latest_listing_metrics: Fact rows of the most recent snapshot only
+-- ----------------------------------------------------------------------------
+CREATE VIEW view_latest_listing_metrics AS
+SELECT f.*
+FROM fact_listing_metrics f
+WHERE f.snapshot_date = (SELECT MAX(snapshot_date) FROM fact_listing_metrics);
+
+COMMENT ON VIEW view_latest_listing_metrics IS 'Latest snapshot of fact_listing_metrics: runtime partition pruning scans only the newest partition';
+
 -- ----------------------------------------------------------------------------
 -- view_top_competitors (Materialized): Pre-filtered top 25 competitors
 -- ----------------------------------------------------------------------------
@@ -557,8 +628,9 @@ WHERE b.is_active = TRUE
   AND b.similarity_rank <= 25
 ORDER BY b.listing_key, b.similarity_rank;
 
+-- Unique index required by REFRESH MATERIALIZED VIEW CONCURRENTLY (one row per listing and rank)
+CREATE UNIQUE INDEX idx_mv_top_competitors_unique ON view_top_competitors(listing_key, similarity_rank);
 CREATE INDEX idx_mv_top_competitors_listing ON view_top_competitors(listing_key);
-CREATE INDEX idx_mv_top_competitors_rank ON view_top_competitors(listing_key, similarity_rank);
 
 COMMENT ON MATERIALIZED VIEW view_top_competitors IS 'Materialized view: pre-computed top 25 competitors with comparison metrics';
 
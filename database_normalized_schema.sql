@@ -72,6 +72,7 @@ CREATE TABLE listings (
     availability BOOLEAN DEFAULT TRUE,
     is_guest_favorite BOOLEAN DEFAULT FALSE,
     timestamp TIMESTAMP,
+    content_hash TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -227,6 +228,7 @@ CREATE INDEX idx_category_ratings_listing ON listing_category_ratings(listing_id
 
 COMMENT ON TABLE hosts IS 'Stores unique host/property manager information';
 COMMENT ON TABLE listings IS 'Main table for Airbnb property listings';
+COMMENT ON COLUMN listings.content_hash IS 'SHA-256 of the normalized listing payload; unchanged listings are skipped on re-ingest';
 COMMENT ON TABLE amenity_groups IS 'Categories for grouping amenities';
 COMMENT ON TABLE amenities IS 'Master list of all available amenities';
 COMMENT ON TABLE listing_amenities IS 'Junction table linking listings to amenities';
@@ -0,0 +1,245 @@
+"""
+Dimension Transforms
+====================
+
+Columnar (NumPy) versions of the scalar helpers ``DimensionalETL`` uses to
+derive dimension attributes: haversine distances and the host, experience,
+property size, location, quality and amenity tier classifiers. The dimension
+loaders classify whole columns at once instead of calling a method per row.
+
+Every function reproduces its scalar counterpart exactly, including NULL
+handling and the strict/non-strict comparisons at tier boundaries;
+``tests/test_dimension_transforms.py`` checks this.
+
+Functions
+---------
+float_column : Convert Decimal/int/None values into a float64 array (NaN for None)
+haversine_to_point : Distances from many coordinates to one reference point
+haversine_pairwise : Pairwise distances between two coordinate sets
+classify_host_tiers : Array version of ``classify_host_tier``
+classify_experience_levels : Array version of ``classify_experience_level``
+classify_property_size_tiers : Array version of ``classify_property_size_tier``
+classify_location_tiers : Array version of ``classify_location_tier``
+classify_quality_tiers : Array version of ``classify_quality_tier``
+classify_amenity_tiers : Array version of ``classify_amenity_tier``
+
+Example
+-------
+>>> distances = haversine_to_point(lats, lons, 51.0447, -114.0719)
+>>> classify_location_tiers(distances).tolist()
+['Urban Core', 'Neighborhood', ...]
+"""
+
+from decimal import Decimal
+from typing import Any, Sequence
+
+import numpy as np
+
+from similarity_engine import haversine_matrix
+
+# Pairwise distances share the similarity engine implementation
+haversine_pairwise = haversine_matrix
+
+
+def float_column(values: Sequence[Any]) -> np.ndarray:
+    """
+    Convert a sequence of Decimal/int/float/None values into a float64 array.
+
+    Parameters
+    ----------
+    values : sequence
+        Column values as returned by psycopg2
+
+    Returns
+    -------
+    np.ndarray
+        float64 array of the same length, NaN where the value is None
+    """
+    return np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+
+
+def _greater_than(values: np.ndarray, threshold: float, decimal_input: bool) -> np.ndarray:
+    """
+    Compare a float column against a threshold like the scalar helpers do.
+
+    The scalar helpers receive Decimal values for NUMERIC columns, and Python
+    compares ``Decimal > float`` exactly: ``Decimal('4.80') > 4.8`` is True
+    because the float 4.8 is slightly below 4.8. After conversion to float64
+    both sides are equal, so with ``decimal_input`` ties are resolved as the
+    exact comparison would. This assumes the original decimals have at most
+    15 significant digits (true for every NUMERIC column classified here).
+
+    Parameters
+    ----------
+    values : np.ndarray
+        float64 column (NaN for None)
+    threshold : float
+        Threshold of the scalar helper
+    decimal_input : bool
+        Whether ``values`` were converted from Decimal
+
+    Returns
+    -------
+    np.ndarray
+        Boolean mask, False for NaN
+    """
+    above = values > threshold
+    if decimal_input and Decimal(repr(threshold)) > Decimal(threshold):
+        above |= values == threshold
+    return above
+
+
+def haversine_to_point(lats: np.ndarray, lons: np.ndarray,
+                       ref_lat: float, ref_lon: float) -> np.ndarray:
+    """
+    Calculate haversine distances from many coordinates to one point.
+
+    Bit-identical to ``DimensionalETL.calculate_haversine_distance(lat, lon,
+    ref_lat, ref_lon)`` for every element.
+
+    Parameters
+    ----------
+    lats, lons : np.ndarray
+        Coordinates, shape (n,)
+    ref_lat, ref_lon : float
+        Reference point (e.g. downtown)
+
+    Returns
+    -------
+    np.ndarray
+        Distances in kilometers, shape (n,)
+    """
+    return haversine_matrix(
+        np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64),
+        np.array([float(ref_lat)]), np.array([float(ref_lon)])
+    )[:, 0]
+
+
+def classify_host_tiers(is_superhost: Sequence[Any], ratings: np.ndarray,
+                        decimal_input: bool = True) -> np.ndarray:
+    """
+    Classify hosts into tiers based on superhost status and rating.
+
+    Parameters
+    ----------
+    is_superhost : sequence of bool or None
+        Superhost flags
+    ratings : np.ndarray
+        Host ratings as float64 (NaN for None), see ``float_column``
+    decimal_input : bool, default=True
+        Ratings were converted from Decimal (NUMERIC column)
+
+    Returns
+    -------
+    np.ndarray
+        Host tiers: 'Elite', 'Premium', or 'Standard'
+    """
+    superhost = np.array([bool(flag) for flag in is_superhost], dtype=bool)
+    return np.select(
+        [superhost & _greater_than(ratings, 4.8, decimal_input),
+         _greater_than(ratings, 4.5, decimal_input)],
+        ['Elite', 'Premium'],
+        default='Standard'
+    ).astype(object)
+
+
+def classify_experience_levels(years_hosting: np.ndarray) -> np.ndarray:
+    """
+    Classify host experience levels based on years hosting.
+
+    Parameters
+    ----------
+    years_hosting : np.ndarray
+        Years hosting as float64 (NaN for None)
+
+    Returns
+    -------
+    np.ndarray
+        Experience levels: 'Expert', 'Experienced', or 'New'
+    """
+    return np.select(
+        [np.isnan(years_hosting) | (years_hosting <= 2), years_hosting <= 5],
+        ['New', 'Experienced'],
+        default='Expert'
+    ).astype(object)
+
+
+def classify_property_size_tiers(bedrooms: np.ndarray) -> np.ndarray:
+    """
+    Classify property sizes based on number of bedrooms.
+
+    Parameters
+    ----------
+    bedrooms : np.ndarray
+        Bedrooms as float64 (NaN for None)
+
+    Returns
+    -------
+    np.ndarray
+        Size tiers: 'Studio', 'Small', 'Medium', or 'Large'
+    """
+    return np.select(
+        [np.isnan(bedrooms) | (bedrooms == 0), bedrooms == 1,
+         (bedrooms == 2) | (bedrooms == 3)],
+        ['Studio', 'Small', 'Medium'],
+        default='Large'
+    ).astype(object)
+
+
+def classify_location_tiers(distance_km: np.ndarray) -> np.ndarray:
+    """
+    Classify location tiers based on distance to downtown.
+
+    Parameters
+    ----------
+    distance_km : np.ndarray
+        Distances to downtown in kilometers
+
+    Returns
+    -------
+    np.ndarray
+        Location tiers: 'Urban Core', 'Downtown Adjacent', 'Neighborhood',
+        or 'Suburban'
+    """
+    labels = np.array(['Urban Core', 'Downtown Adjacent', 'Neighborhood', 'Suburban'], dtype=object)
+    # bins[i-1] <= d < bins[i]; NaN sorts past the last bin like the scalar fall-through
+    return labels[np.digitize(distance_km, [1, 3, 7])]
+
+
+def classify_quality_tiers(overall_quality_score: np.ndarray) -> np.ndarray:
+    """
+    Classify quality tiers based on overall quality score.
+
+    Parameters
+    ----------
+    overall_quality_score : np.ndarray
+        Overall quality scores as float64 (NaN for None)
+
+    Returns
+    -------
+    np.ndarray
+        Quality tiers: 'Exceptional', 'Excellent', 'Good', or 'Fair'
+    """
+    labels = np.array(['Fair', 'Good', 'Excellent', 'Exceptional'], dtype=object)
+    # right=True: bins[i-1] < score <= bins[i], i.e. strict '>' at each threshold
+    tiers = labels[np.digitize(overall_quality_score, [4.0, 4.5, 4.8], right=True)]
+    tiers[np.isnan(overall_quality_score)] = 'Fair'
+    return tiers
+
+
+def classify_amenity_tiers(amenity_score: np.ndarray) -> np.ndarray:
+    """
+    Classify amenity tiers based on amenity score.
+
+    Parameters
+    ----------
+    amenity_score : np.ndarray
+        Calculated amenity scores
+
+    Returns
+    -------
+    np.ndarray
+        Amenity tiers: 'Luxury', 'Premium', 'Standard', or 'Basic'
+    """
+    labels = np.array(['Basic', 'Standard', 'Premium', 'Luxury'], dtype=object)
+    return labels[np.digitize(amenity_score, [15, 30, 50], right=True)]
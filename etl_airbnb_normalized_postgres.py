@@ -8,13 +8,21 @@ Author: Data Engineering Team
 Date: 2025-11-10
 """
 
+import argparse
+import gzip
+import hashlib
+import io
 import json
 import psycopg2
 from psycopg2.extras import execute_values
-from datetime import datetime
-from typing import Dict, List, Any, Optional
+from datetime import date, datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Tuple
 import logging
 import os
+import queue
+import threading
+import time
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -50,6 +58,111 @@ class AirbnbETL:
         Database cursor for executing queries
     """
     
+    # Column (name, type) pairs; types define the bulk-load staging tables
+    HOST_COLUMNS = [
+        ('host_id', 'TEXT'), ('name', 'TEXT'), ('image_url', 'TEXT'),
+        ('profile_url', 'TEXT'), ('rating', 'NUMERIC'), ('number_of_reviews', 'INTEGER'),
+        ('response_rate', 'INTEGER'), ('response_time', 'TEXT'), ('years_hosting', 'INTEGER'),
+        ('languages', 'TEXT'), ('my_work', 'TEXT'), ('is_superhost', 'BOOLEAN')
+    ]
+    LISTING_COLUMNS = [
+        ('property_id', 'TEXT'), ('host_id', 'TEXT'), ('name', 'TEXT'),
+        ('listing_title', 'TEXT'), ('listing_name', 'TEXT'), ('url', 'TEXT'),
+        ('category', 'TEXT'), ('description', 'TEXT'), ('city', 'TEXT'),
+        ('province', 'TEXT'), ('country', 'TEXT'), ('latitude', 'NUMERIC'),
+        ('longitude', 'NUMERIC'), ('price_per_night', 'NUMERIC'), ('currency', 'TEXT'),
+        ('rating', 'NUMERIC'), ('number_of_reviews', 'INTEGER'), ('guests', 'INTEGER'),
+        ('bedrooms', 'INTEGER'), ('beds', 'INTEGER'), ('baths', 'INTEGER'),
+        ('pets_allowed', 'BOOLEAN'), ('availability', 'BOOLEAN'),
+        ('is_guest_favorite', 'BOOLEAN'), ('timestamp', 'TIMESTAMPTZ'),
+        ('content_hash', 'TEXT')
+    ]
+    AMENITY_COLUMNS = [
+        ('group_name', 'TEXT'), ('amenity_code', 'TEXT'), ('amenity_name', 'TEXT')
+    ]
+    
+    # Child tables of listings: table -> (row builder, (name, type) columns, conflict clause)
+    CHILD_TABLES = {
+        'listing_reviews': ('review_rows', [
+            ('guest_name', 'TEXT'), ('guest_time_on_airbnb', 'TEXT'), ('review_text', 'TEXT'),
+            ('review_date', 'TIMESTAMPTZ'), ('rating', 'INTEGER'), ('stayed_for', 'TEXT'),
+            ('host_response', 'TEXT')
+        ], ''),
+        'listing_category_ratings': ('category_rating_rows', [
+            ('category_name', 'TEXT'), ('rating_value', 'NUMERIC')
+        ], 'ON CONFLICT (listing_id, category_name) DO NOTHING'),
+        'listing_house_rules': ('house_rule_rows', [('rule_text', 'TEXT')], ''),
+        'listing_highlights': ('highlight_rows', [
+            ('highlight_name', 'TEXT'), ('highlight_value', 'TEXT')
+        ], ''),
+        'listing_arrangement_details': ('arrangement_rows', [
+            ('room_name', 'TEXT'), ('arrangement_value', 'TEXT')
+        ], ''),
+        'listing_location_details': ('location_detail_rows', [
+            ('detail_title', 'TEXT'), ('detail_value', 'TEXT')
+        ], ''),
+        'listing_description_sections': ('description_section_rows', [
+            ('section_title', 'TEXT'), ('section_value', 'TEXT'), ('section_order', 'INTEGER')
+        ], ''),
+        'listing_cancellation_policies': ('cancellation_policy_rows', [
+            ('policy_name', 'TEXT'), ('policy_date', 'DATE')
+        ], ''),
+    }
+    
+    # Upserts overwrite every column covered by content_hash, so a listing whose
+    # hash changed is fully corrected (only the first-seen scrape timestamp is kept)
+    HOST_UPSERT_QUERY = """
+        INSERT INTO hosts ({columns})
+        {source}
+        ON CONFLICT (host_id) DO UPDATE SET
+            name = EXCLUDED.name,
+            image_url = EXCLUDED.image_url,
+            profile_url = EXCLUDED.profile_url,
+            rating = EXCLUDED.rating,
+            number_of_reviews = EXCLUDED.number_of_reviews,
+            response_rate = EXCLUDED.response_rate,
+            response_time = EXCLUDED.response_time,
+            years_hosting = EXCLUDED.years_hosting,
+            languages = EXCLUDED.languages,
+            my_work = EXCLUDED.my_work,
+            is_superhost = EXCLUDED.is_superhost,
+            updated_at = CURRENT_TIMESTAMP
+    """
+    LISTING_UPSERT_QUERY = """
+        INSERT INTO listings ({columns})
+        {source}
+        ON CONFLICT (property_id) DO UPDATE SET
+            host_id = EXCLUDED.host_id,
+            name = EXCLUDED.name,
+            listing_title = EXCLUDED.listing_title,
+            listing_name = EXCLUDED.listing_name,
+            url = EXCLUDED.url,
+            category = EXCLUDED.category,
+            description = EXCLUDED.description,
+            city = EXCLUDED.city,
+            province = EXCLUDED.province,
+            country = EXCLUDED.country,
+            latitude = EXCLUDED.latitude,
+            longitude = EXCLUDED.longitude,
+            price_per_night = EXCLUDED.price_per_night,
+            currency = EXCLUDED.currency,
+            rating = EXCLUDED.rating,
+            number_of_reviews = EXCLUDED.number_of_reviews,
+            guests = EXCLUDED.guests,
+            bedrooms = EXCLUDED.bedrooms,
+            beds = EXCLUDED.beds,
+            baths = EXCLUDED.baths,
+            pets_allowed = EXCLUDED.pets_allowed,
+            availability = EXCLUDED.availability,
+            is_guest_favorite = EXCLUDED.is_guest_favorite,
+            content_hash = EXCLUDED.content_hash,
+            updated_at = CURRENT_TIMESTAMP
+    """
+    
+    JSON_READ_CHUNK_SIZE = 1 << 20  # Characters read per chunk when streaming JSON
+    BULK_CHUNK_SIZE = 500  # Listings per COPY/merge batch when streaming in bulk mode
+    WORKER_QUEUE_SIZE = 100  # Listings buffered per worker in parallel mode
+    
     def __init__(self, db_config: Dict[str, str]):
         """
         Initialize ETL with database configuration.
@@ -67,6 +180,10 @@ class AirbnbETL:
         self.amenity_group_cache = {}
         self.amenity_cache = {}
         self.host_cache = set()
+        
+        # Stored content fingerprint per property_id (None for listings loaded without one)
+        self.content_hashes = {}
+        self.unchanged_count = 0
     
     def connect(self):
         """
@@ -124,6 +241,26 @@ class AirbnbETL:
             logger.error(f"Schema creation failed: {e}")
             raise
     
+    @staticmethod
+    def open_json_file(json_file: str):
+        """
+        Open a listings file for reading text, decompressing ``.gz`` files.
+        
+        Parameters
+        ----------
+        json_file : str
+            Path to JSON or NDJSON file, optionally gzip-compressed (e.g. the
+            ``.ndjson.gz`` snapshots saved by ``airbnb_listings_fetch``)
+        
+        Returns
+        -------
+        file object
+            Text stream over the (decompressed) file contents
+        """
+        if json_file.endswith('.gz'):
+            return gzip.open(json_file, 'rt', encoding='utf-8')
+        return open(json_file, 'r', encoding='utf-8')
+    
     def load_json_data(self, json_file: str) -> List[Dict[str, Any]]:
         """
         Load and parse JSON data from file.
@@ -131,7 +268,8 @@ class AirbnbETL:
         Parameters
         ----------
         json_file : str
-            Path to JSON file containing Airbnb listings
+            Path to JSON file containing Airbnb listings (``.gz`` files are
+            decompressed on the fly)
         
         Returns
         -------
@@ -146,7 +284,7 @@ class AirbnbETL:
             If JSON is malformed
         """
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
+            with self.open_json_file(json_file) as f:
                 data = json.load(f)
             logger.info(f"Loaded {len(data)} listings from {json_file}")
             return data
@@ -157,6 +295,155 @@ class AirbnbETL:
             logger.error(f"Invalid JSON format: {e}")
             raise
     
+    def stream_json_data(self, json_file: str) -> Iterator[Dict[str, Any]]:
+        """
+        Stream listings from a JSON array or NDJSON (JSON Lines) file.
+        
+        The file is read in chunks of JSON_READ_CHUNK_SIZE characters and
+        each listing is decoded as soon as it is complete, so memory holds
+        one listing (plus one chunk) regardless of snapshot size and loading
+        starts before the file has been fully parsed. A file whose first
+        non-whitespace character is ``[`` is parsed as a JSON array,
+        anything else as one JSON object per line. Files ending in ``.gz``
+        are decompressed as they are read, so the gzip NDJSON snapshots
+        written by ``airbnb_listings_fetch.stream_snapshot_listings`` load
+        directly.
+        
+        Parameters
+        ----------
+        json_file : str
+            Path to JSON or NDJSON file containing Airbnb listings, optionally
+            gzip-compressed
+        
+        Yields
+        ------
+        dict
+            One listing at a time
+        
+        Raises
+        ------
+        FileNotFoundError
+            If JSON file doesn't exist
+        json.JSONDecodeError
+            If JSON is malformed (listings before the error are still yielded)
+        """
+        decoder = json.JSONDecoder()
+        count = 0
+        
+        try:
+            with self.open_json_file(json_file) as f:
+                buffer = f.read(self.JSON_READ_CHUNK_SIZE)
+                eof = not buffer
+                pos = 0
+                
+                def skip_whitespace():
+                    # Advance past whitespace, reading more data as needed
+                    nonlocal buffer, pos, eof
+                    while True:
+                        while pos < len(buffer) and buffer[pos].isspace():
+                            pos += 1
+                        if pos < len(buffer) or eof:
+                            return
+                        buffer, pos = f.read(self.JSON_READ_CHUNK_SIZE), 0
+                        eof = not buffer
+                
+                skip_whitespace()
+                
+                if buffer[pos:pos + 1] != '[':
+                    # NDJSON: one listing per line
+                    f.seek(0)
+                    for line_number, line in enumerate(f, 1):
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            listing = json.loads(line)
+                        except json.JSONDecodeError as e:
+                            logger.error(f"Invalid JSON on line {line_number}: {e}")
+                            raise
+                        count += 1
+                        yield listing
+                    return
+                
+                pos += 1
+                skip_whitespace()
+                if buffer[pos:pos + 1] == ']':
+                    return
+                
+                while True:
+                    # Decode the next element, growing the buffer until it is complete
+                    while True:
+                        try:
+                            listing, end = decoder.raw_decode(buffer, pos)
+                            if end < len(buffer) or eof:
+                                break
+                        except json.JSONDecodeError:
+                            if eof:
+                                raise
+                        # Read at least as much as is pending so re-decoding stays linear
+                        chunk = f.read(max(self.JSON_READ_CHUNK_SIZE, len(buffer) - pos))
+                        eof = not chunk
+                        buffer, pos = buffer[pos:] + chunk, 0
+                    
+                    count += 1
+                    yield listing
+                    
+                    pos = end
+                    skip_whitespace()
+                    separator = buffer[pos:pos + 1]
+                    pos += 1
+                    if separator == ']':
+                        return
+                    if separator != ',':
+                        raise json.JSONDecodeError("Expected ',' or ']'", buffer, pos - 1)
+                    skip_whitespace()
+        except FileNotFoundError:
+            logger.error(f"JSON file not found: {json_file}")
+            raise
+        except json.JSONDecodeError as e:
+            logger.error(f"Invalid JSON format after {count} listings: {e}")
+            raise
+        finally:
+            logger.info(f"Streamed {count} listings from {json_file}")
+    
+    def host_row(self, listing: Dict[str, Any]) -> Optional[Tuple]:
+        """
+        Build the hosts row of a listing.
+        
+        Parameters
+        ----------
+        listing : dict
+            Listing data containing host_details
+        
+        Returns
+        -------
+        tuple or None
+            Row of (host_id, name, image_url, profile_url, rating,
+            number_of_reviews, response_rate, response_time, years_hosting,
+            languages, my_work, is_superhost), or None without a host_id
+        """
+        host_details = listing.get('host_details')
+        if not host_details or not host_details.get('host_id'):
+            return None
+        
+        # Extract response rate percentage
+        response_rate = listing.get('host_response_rate')
+        
+        return (
+            host_details.get('host_id'),
+            host_details.get('name'),
+            host_details.get('image'),
+            host_details.get('url'),
+            host_details.get('rating'),
+            host_details.get('reviews'),
+            response_rate,
+            host_details.get('response_time'),
+            host_details.get('years_hosting'),
+            host_details.get('languages'),
+            host_details.get('my_work'),
+            listing.get('is_supperhost', False)
+        )
+    
     def insert_host(self, listing: Dict[str, Any]) -> Optional[str]:
         """
         Insert or update host information.
@@ -171,53 +458,21 @@ class AirbnbETL:
         str or None
             Host ID if successful, None otherwise
         """
-        host_details = listing.get('host_details')
-        if not host_details or not host_details.get('host_id'):
+        values = self.host_row(listing)
+        if values is None:
             return None
         
-        host_id = host_details.get('host_id')
+        host_id = values[0]
         
         # Skip if already processed
         if host_id in self.host_cache:
             return host_id
         
         try:
-            insert_query = """
-                INSERT INTO hosts (
-                    host_id, name, image_url, profile_url, rating,
-                    number_of_reviews, response_rate, response_time,
-                    years_hosting, languages, my_work, is_superhost
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                )
-                ON CONFLICT (host_id) DO UPDATE SET
-                    name = EXCLUDED.name,
-                    rating = EXCLUDED.rating,
-                    number_of_reviews = EXCLUDED.number_of_reviews,
-                    response_rate = EXCLUDED.response_rate,
-                    years_hosting = EXCLUDED.years_hosting,
-                    updated_at = CURRENT_TIMESTAMP
-            """
-            
-            # Extract response rate percentage
-            response_rate = listing.get('host_response_rate')
-            
-            values = (
-                host_id,
-                host_details.get('name'),
-                host_details.get('image'),
-                host_details.get('url'),
-                host_details.get('rating'),
-                host_details.get('reviews'),
-                response_rate,
-                host_details.get('response_time'),
-                host_details.get('years_hosting'),
-                host_details.get('languages'),
-                host_details.get('my_work'),
-                listing.get('is_supperhost', False)
-            )
-            
-            self.cursor.execute(insert_query, values)
+            self.cursor.execute(self.HOST_UPSERT_QUERY.format(
+                columns=', '.join(name for name, _ in self.HOST_COLUMNS),
+                source=f"VALUES ({', '.join(['%s'] * len(self.HOST_COLUMNS))})"
+            ), values)
             self.host_cache.add(host_id)
             return host_id
             
@@ -225,7 +480,91 @@ class AirbnbETL:
             logger.error(f"Failed to insert host {host_id}: {e}")
             return None
     
-    def insert_listing(self, listing: Dict[str, Any], host_id: Optional[str]) -> Optional[int]:
+    def listing_row(self, listing: Dict[str, Any], host_id: Optional[str],
+                    content_hash: Optional[str] = None) -> Tuple:
+        """
+        Build the listings row of a listing.
+        
+        Parses bedroom/bed/bath counts from ``details``, splits ``location``
+        into city/province/country and converts the scrape timestamp.
+        
+        Parameters
+        ----------
+        listing : dict
+            Listing data
+        host_id : str or None
+            Associated host ID
+        content_hash : str, optional
+            Content fingerprint of the listing (see content_hash)
+        
+        Returns
+        -------
+        tuple
+            Row in LISTING_COLUMNS order
+        """
+        # Parse details to extract bedroom, bed, bath counts
+        details = listing.get('details', [])
+        bedrooms = beds = baths = None
+        
+        for detail in details:
+            if 'bedroom' in detail.lower():
+                bedrooms = int(detail.split()[0]) if detail.split()[0].isdigit() else None
+            elif 'bed' in detail.lower() and 'bedroom' not in detail.lower():
+                beds = int(detail.split()[0]) if detail.split()[0].isdigit() else None
+            elif 'bath' in detail.lower():
+                baths = int(detail.split()[0]) if detail.split()[0].isdigit() else None
+        
+        # Parse location into city, province, country
+        city = province = country = None
+        location = listing.get('location', '')
+        if location:
+            location_parts = [part.strip() for part in location.split(',')]
+            if len(location_parts) == 3:
+                city, province, country = location_parts
+            elif len(location_parts) == 2:
+                city, country = location_parts
+            elif len(location_parts) == 1:
+                city = location_parts[0]
+        
+        # Parse timestamp
+        timestamp = None
+        if listing.get('timestamp'):
+            try:
+                timestamp = datetime.fromisoformat(listing['timestamp'].replace('Z', '+00:00'))
+            except (ValueError, AttributeError):
+                pass
+        
+        return (
+            listing.get('property_id'),
+            host_id,
+            listing.get('name'),
+            listing.get('listing_title'),
+            listing.get('listing_name'),
+            listing.get('url'),
+            listing.get('category'),
+            listing.get('description'),
+            city,
+            province,
+            country,
+            listing.get('lat'),
+            listing.get('long'),
+            listing.get('price'),
+            listing.get('currency', 'CAD'),
+            listing.get('ratings'),
+            listing.get('property_number_of_reviews', 0),
+            listing.get('guests'),
+            bedrooms,
+            beds,
+            baths,
+            listing.get('pets_allowed', False),
+            listing.get('availability', 'true').lower() == 'true',
+            listing.get('is_guest_favorite', False),
+            timestamp,
+            content_hash
+        )
+    
+    def insert_listing(self, listing: Dict[str, Any], host_id: Optional[str],
+                       content_hash: Optional[str] = None) -> Optional[int]:
         """
         Insert main listing information.
         
@@ -235,6 +574,8 @@ class AirbnbETL:
             Listing data
         host_id : str or None
             Associated host ID
+        content_hash : str, optional
+            Content fingerprint stored beside property_id
         
         Returns
         -------
@@ -242,90 +583,14 @@ class AirbnbETL:
             Listing ID if successful, None otherwise
         """
         try:
-            # Parse details to extract bedroom, bed, bath counts
-            details = listing.get('details', [])
-            bedrooms = beds = baths = None
-            
-            for detail in details:
-                if 'bedroom' in detail.lower():
-                    bedrooms = int(detail.split()[0]) if detail.split()[0].isdigit() else None
-                elif 'bed' in detail.lower() and 'bedroom' not in detail.lower():
-                    beds = int(detail.split()[0]) if detail.split()[0].isdigit() else None
-                elif 'bath' in detail.lower():
-                    baths = int(detail.split()[0]) if detail.split()[0].isdigit() else None
-            
-            # Parse location into city, province, country
-            city = province = country = None
-            location = listing.get('location', '')
-            if location:
-                location_parts = [part.strip() for part in location.split(',')]
-                if len(location_parts) == 3:
-                    city, province, country = location_parts
-                elif len(location_parts) == 2:
-                    city, country = location_parts
-                elif len(location_parts) == 1:
-                    city = location_parts[0]
-            
-            # Parse timestamp
-            timestamp = None
-            if listing.get('timestamp'):
-                try:
-                    timestamp = datetime.fromisoformat(listing['timestamp'].replace('Z', '+00:00'))
-                except (ValueError, AttributeError):
-                    pass
-            
-            insert_query = """
-                INSERT INTO listings (
-                    property_id, host_id, name, listing_title, listing_name,
-                    url, category, description, city, province, country, 
-                    latitude, longitude, price_per_night, currency, 
-                    rating, number_of_reviews, guests, bedrooms, beds, baths, 
-                    pets_allowed, availability, is_guest_favorite, timestamp
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                )
-                ON CONFLICT (property_id) DO UPDATE SET
-                    price_per_night = EXCLUDED.price_per_night,
-                    rating = EXCLUDED.rating,
-                    number_of_reviews = EXCLUDED.number_of_reviews,
-                    availability = EXCLUDED.availability,
-                    updated_at = CURRENT_TIMESTAMP
-                RETURNING listing_id
-            """
+            values = self.listing_row(listing, host_id, content_hash)
             # FIX: ON CONFLICT clause handles duplicate property_id during re-runs
             # Without this, ETL would fail silently on second run due to UNIQUE constraint
-            # Now updates changed fields (price, rating, reviews) instead of failing
-            
-            values = (
-                listing.get('property_id'),
-                host_id,
-                listing.get('name'),
-                listing.get('listing_title'),
-                listing.get('listing_name'),
-                listing.get('url'),
-                listing.get('category'),
-                listing.get('description'),
-                city,
-                province,
-                country,
-                listing.get('lat'),
-                listing.get('long'),
-                listing.get('price'),
-                listing.get('currency', 'CAD'),
-                listing.get('ratings'),
-                listing.get('property_number_of_reviews', 0),
-                listing.get('guests'),
-                bedrooms,
-                beds,
-                baths,
-                listing.get('pets_allowed', False),
-                listing.get('availability', 'true').lower() == 'true',
-                listing.get('is_guest_favorite', False),
-                timestamp
-            )
-            
-            self.cursor.execute(insert_query, values)
+            # Now updates every stored field instead of failing
+            self.cursor.execute(self.LISTING_UPSERT_QUERY.format(
+                columns=', '.join(name for name, _ in self.LISTING_COLUMNS),
+                source=f"VALUES ({', '.join(['%s'] * len(self.LISTING_COLUMNS))})"
+            ) + " RETURNING listing_id", values)
             listing_id = self.cursor.fetchone()[0]
             return listing_id
             
@@ -333,10 +598,105 @@ class AirbnbETL:
             logger.error(f"Failed to insert listing '{listing.get('name', 'Unknown')}' (property_id: {listing.get('property_id', 'N/A')}): {e}")
             return None
     
+    def amenity_rows(self, listing: Dict[str, Any]) -> List[Tuple]:
+        """
+        Build the amenity rows of a listing.
+        
+        Parameters
+        ----------
+        listing : dict
+            Listing data with amenities
+        
+        Returns
+        -------
+        list of tuple
+            Rows of (group_name, amenity_code, amenity_name)
+        """
+        return [
+            (amenity_group['group_name'], item.get('value'), item['name'])
+            for amenity_group in listing.get('amenities', [])
+            if amenity_group.get('group_name')
+            for item in amenity_group.get('items', [])
+            if item.get('name')
+        ]
+    
+    def content_hash(self, listing: Dict[str, Any]) -> str:
+        """
+        Compute a stable fingerprint of everything the ETL stores for a listing.
+        
+        The hash covers the normalized rows (host, listing, amenities and every
+        child table) rather than the raw JSON, so key order and fields the ETL
+        ignores do not matter. The scrape timestamp is excluded because it
+        changes on every scrape and is never updated on conflict; every other
+        hashed host and listing column is overwritten by the upserts
+        (``tests/test_normalized_etl.py`` keeps the two in sync).
+        
+        Parameters
+        ----------
+        listing : dict
+            Listing data
+        
+        Returns
+        -------
+        str
+            Hex SHA-256 digest
+        """
+        listing_fields = dict(zip((name for name, _ in self.LISTING_COLUMNS), self.listing_row(listing, None)))
+        for name in ('host_id', 'timestamp', 'content_hash'):
+            del listing_fields[name]
+        
+        payload = {
+            'host': self.host_row(listing),
+            'listing': listing_fields,
+            'amenities': self.amenity_rows(listing),
+        }
+        for table, (builder, _, _) in self.CHILD_TABLES.items():
+            payload[table] = getattr(self, builder)(listing)
+        
+        encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+    
+    def load_content_hashes(self):
+        """
+        Load the stored content fingerprint of every listing into content_hashes.
+        """
+        # Databases created before change detection lack the column
+        self.cursor.execute("ALTER TABLE listings ADD COLUMN IF NOT EXISTS content_hash TEXT")
+        self.conn.commit()
+        
+        self.cursor.execute("SELECT property_id, content_hash FROM listings WHERE property_id IS NOT NULL")
+        self.content_hashes = dict(self.cursor.fetchall())
+        logger.info(f"Loaded content hashes for {len(self.content_hashes)} existing listings")
+    
+    def delete_child_rows(self, listing_ids_sql: str, params: Optional[Dict[str, Any]] = None):
+        """
+        Delete the amenity links and child rows of listings in one statement.
+        
+        Parameters
+        ----------
+        listing_ids_sql : str
+            SQL expression or subquery producing the listing IDs
+        params : dict, optional
+            Named parameters referenced by ``listing_ids_sql``
+        """
+        tables = ['listing_amenities', *self.CHILD_TABLES]
+        deletes = ',\n'.join(
+            f"deleted_{table} AS (DELETE FROM {table} WHERE listing_id IN ({listing_ids_sql}))"
+            for table in tables[:-1]
+        )
+        self.cursor.execute(
+            f"WITH {deletes}\nDELETE FROM {tables[-1]} WHERE listing_id IN ({listing_ids_sql})",
+            params
+        )
+    
     def insert_amenities(self, listing: Dict[str, Any], listing_id: int):
         """
         Insert amenities and link to listing.
         
+        Amenity IDs come from the preloaded dictionary (prewarm_amenity_caches);
+        only amenities missing from it are inserted here. All links of the
+        listing are written with one bulk insert.
+        
         Parameters
         ----------
         listing : dict
@@ -345,6 +705,7 @@ class AirbnbETL:
             ID of the listing
         """
         amenities_data = listing.get('amenities', [])
+        amenity_ids = {}
         
         for amenity_group in amenities_data:
             group_name = amenity_group.get('group_name')
@@ -438,34 +799,43 @@ class AirbnbETL:
                 if cache_key not in self.amenity_cache:
                     continue
                     
-                amenity_id = self.amenity_cache[cache_key]
-                
-                # Link amenity to listing
-                try:
-                    self.cursor.execute("SAVEPOINT amenity_link")
-                    self.cursor.execute(
-                        """
-                        INSERT INTO listing_amenities (listing_id, amenity_id)
-                        VALUES (%s, %s)
-                        ON CONFLICT (listing_id, amenity_id) DO NOTHING
-                        """,
-                        (listing_id, amenity_id)
-                    )
-                    self.cursor.execute("RELEASE SAVEPOINT amenity_link")
-                except psycopg2.Error as e:
-                    logger.error(f"Failed to link amenity to listing: {e}")
-                    self.cursor.execute("ROLLBACK TO SAVEPOINT amenity_link")
+                amenity_ids[self.amenity_cache[cache_key]] = None
+        
+        if not amenity_ids:
+            return
+        
+        # Link all amenities to listing in one statement
+        try:
+            self.cursor.execute("SAVEPOINT amenity_link")
+            execute_values(
+                self.cursor,
+                """
+                INSERT INTO listing_amenities (listing_id, amenity_id)
+                VALUES %s
+                ON CONFLICT (listing_id, amenity_id) DO NOTHING
+                """,
+                [(listing_id, amenity_id) for amenity_id in amenity_ids],
+                page_size=len(amenity_ids)
+            )
+            self.cursor.execute("RELEASE SAVEPOINT amenity_link")
+        except psycopg2.Error as e:
+            logger.error(f"Failed to link amenities to listing: {e}")
+            self.cursor.execute("ROLLBACK TO SAVEPOINT amenity_link")
     
-    def insert_reviews(self, listing: Dict[str, Any], listing_id: int):
+    def review_rows(self, listing: Dict[str, Any]) -> List[Tuple]:
         """
-        Insert guest reviews.
+        Build guest review rows for a listing.
         
         Parameters
         ----------
         listing : dict
             Listing data with reviews
-        listing_id : int
-            ID of the listing
+        
+        Returns
+        -------
+        list of tuple
+            Rows of (guest_name, guest_time_on_airbnb, review_text, review_date,
+            rating, stayed_for, host_response)
         """
         reviews = listing.get('reviews_details', [])
         
@@ -473,6 +843,7 @@ class AirbnbETL:
             # Handle simple review format
             reviews = [{'review': r} for r in listing['reviews']]
         
+        rows = []
         for review in reviews:
             if not review.get('review'):
                 continue
@@ -484,27 +855,208 @@ class AirbnbETL:
                 except (ValueError, AttributeError):
                     pass
             
+            rows.append((
+                review.get('guest_name'),
+                review.get('guest_time_on_airbnb'),
+                review.get('review'),
+                review_date,
+                review.get('rating'),
+                review.get('stayed_for'),
+                review.get('host_response')
+            ))
+        return rows
+    
+    def category_rating_rows(self, listing: Dict[str, Any]) -> List[Tuple]:
+        """
+        Build category rating rows for a listing.
+        
+        Parameters
+        ----------
+        listing : dict
+            Listing data with category ratings
+        
+        Returns
+        -------
+        list of tuple
+            Rows of (category_name, rating_value)
+        """
+        rows = []
+        for rating in listing.get('category_rating', []):
+            if rating.get('name') is None:
+                continue
             try:
-                self.cursor.execute(
-                    """
-                    INSERT INTO listing_reviews (
-                        listing_id, guest_name, guest_time_on_airbnb,
-                        review_text, review_date, rating, stayed_for, host_response
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                    """,
-                    (
-                        listing_id,
-                        review.get('guest_name'),
-                        review.get('guest_time_on_airbnb'),
-                        review.get('review'),
-                        review_date,
-                        review.get('rating'),
-                        review.get('stayed_for'),
-                        review.get('host_response')
-                    )
-                )
+                rows.append((rating.get('name'), float(rating.get('value', 0))))
+            except (TypeError, ValueError) as e:
+                logger.error(f"Failed to parse category rating: {e}")
+        return rows
+    
+    def house_rule_rows(self, listing: Dict[str, Any]) -> List[Tuple]:
+        """
+        Build house rule rows for a listing.
+        
+        Parameters
+        ----------
+        listing : dict
+            Listing data with house rules
+        
+        Returns
+        -------
+        list of tuple
+            Rows of (rule_text,)
+        """
+        return [(rule,) for rule in listing.get('house_rules', []) if rule is not None]
+    
+    def highlight_rows(self, listing: Dict[str, Any]) -> List[Tuple]:
+        """
+        Build highlight rows for a listing.
+        
+        Parameters
+        ----------
+        listing : dict
+            Listing data with highlights
+        
+        Returns
+        -------
+        list of tuple
+            Rows of (highlight_name, highlight_value)
+        """
+        return [
+            (highlight.get('name'), highlight.get('value'))
+            for highlight in listing.get('highlights', [])
+            if highlight.get('name') is not None
+        ]
+    
+    def arrangement_rows(self, listing: Dict[str, Any]) -> List[Tuple]:
+        """
+        Build room arrangement rows for a listing.
+        
+        Parameters
+        ----------
+        listing : dict
+            Listing data with arrangement details
+        
+        Returns
+        -------
+        list of tuple
+            Rows of (room_name, arrangement_value)
+        """
+        return [
+            (arrangement.get('name'), arrangement.get('value'))
+            for arrangement in listing.get('arrangement_details', [])
+            if arrangement.get('name') is not None and arrangement.get('value') is not None
+        ]
+    
+    def location_detail_rows(self, listing: Dict[str, Any]) -> List[Tuple]:
+        """
+        Build location detail rows for a listing.
+        
+        Parameters
+        ----------
+        listing : dict
+            Listing data with location details
+        
+        Returns
+        -------
+        list of tuple
+            Rows of (detail_title, detail_value)
+        """
+        # FIX: Skip if value is None or empty (NOT NULL constraint violation)
+        # Some listings have location_details with title but no value
+        # Error prevented: "null value in column "detail_value" violates not-null constraint"
+        return [
+            (detail.get('title'), detail.get('value'))
+            for detail in listing.get('location_details', [])
+            if detail.get('value')
+        ]
+    
+    def description_section_rows(self, listing: Dict[str, Any]) -> List[Tuple]:
+        """
+        Build structured description section rows for a listing.
+        
+        Parameters
+        ----------
+        listing : dict
+            Listing data with description sections
+        
+        Returns
+        -------
+        list of tuple
+            Rows of (section_title, section_value, section_order)
+        """
+        return [
+            (section.get('title'), section.get('value'), idx + 1)
+            for idx, section in enumerate(listing.get('description_by_sections', []))
+            if section.get('value') is not None
+        ]
+    
+    def cancellation_policy_rows(self, listing: Dict[str, Any]) -> List[Tuple]:
+        """
+        Build cancellation policy rows for a listing.
+        
+        Parameters
+        ----------
+        listing : dict
+            Listing data with cancellation policies
+        
+        Returns
+        -------
+        list of tuple
+            Rows of (policy_name, policy_date)
+        """
+        rows = []
+        for policy in listing.get('cancellation_policy', []):
+            if policy.get('cancellation_name') is None:
+                continue
+            
+            policy_date = None
+            if policy.get('cancellation_value'):
+                try:
+                    policy_date = datetime.strptime(
+                        policy['cancellation_value'], '%m/%d/%Y'
+                    ).date()
+                except (ValueError, AttributeError):
+                    pass
+            
+            rows.append((policy.get('cancellation_name'), policy_date))
+        return rows
+    
+    def _insert_child_rows(self, table: str, listing_id: int, rows: List[Tuple]):
+        """
+        Insert child table rows of one listing, one statement per row.
+        
+        Parameters
+        ----------
+        table : str
+            Child table name (key of CHILD_TABLES)
+        listing_id : int
+            ID of the listing
+        rows : list of tuple
+            Rows from the table's row builder (without listing_id)
+        """
+        _, columns, conflict = self.CHILD_TABLES[table]
+        insert_query = f"""
+            INSERT INTO {table} (listing_id, {', '.join(name for name, _ in columns)})
+            VALUES ({', '.join(['%s'] * (len(columns) + 1))})
+            {conflict}
+        """
+        for row in rows:
+            try:
+                self.cursor.execute(insert_query, (listing_id,) + row)
             except psycopg2.Error as e:
-                logger.error(f"Failed to insert review: {e}")
+                logger.error(f"Failed to insert {table} row: {e}")
+    
+    def insert_reviews(self, listing: Dict[str, Any], listing_id: int):
+        """
+        Insert guest reviews.
+        
+        Parameters
+        ----------
+        listing : dict
+            Listing data with reviews
+        listing_id : int
+            ID of the listing
+        """
+        self._insert_child_rows('listing_reviews', listing_id, self.review_rows(listing))
     
     def insert_category_ratings(self, listing: Dict[str, Any], listing_id: int):
         """
@@ -517,20 +1069,7 @@ class AirbnbETL:
         listing_id : int
             ID of the listing
         """
-        category_ratings = listing.get('category_rating', [])
-        
-        for rating in category_ratings:
-            try:
-                self.cursor.execute(
-                    """
-                    INSERT INTO listing_category_ratings (listing_id, category_name, rating_value)
-                    VALUES (%s, %s, %s)
-                    ON CONFLICT (listing_id, category_name) DO NOTHING
-                    """,
-                    (listing_id, rating.get('name'), float(rating.get('value', 0)))
-                )
-            except (psycopg2.Error, ValueError) as e:
-                logger.error(f"Failed to insert category rating: {e}")
+        self._insert_child_rows('listing_category_ratings', listing_id, self.category_rating_rows(listing))
     
     def insert_house_rules(self, listing: Dict[str, Any], listing_id: int):
         """
@@ -543,16 +1082,7 @@ class AirbnbETL:
         listing_id : int
             ID of the listing
         """
-        house_rules = listing.get('house_rules', [])
-        
-        for rule in house_rules:
-            try:
-                self.cursor.execute(
-                    "INSERT INTO listing_house_rules (listing_id, rule_text) VALUES (%s, %s)",
-                    (listing_id, rule)
-                )
-            except psycopg2.Error as e:
-                logger.error(f"Failed to insert house rule: {e}")
+        self._insert_child_rows('listing_house_rules', listing_id, self.house_rule_rows(listing))
     
     def insert_highlights(self, listing: Dict[str, Any], listing_id: int):
         """
@@ -565,19 +1095,7 @@ class AirbnbETL:
         listing_id : int
             ID of the listing
         """
-        highlights = listing.get('highlights', [])
-        
-        for highlight in highlights:
-            try:
-                self.cursor.execute(
-                    """
-                    INSERT INTO listing_highlights (listing_id, highlight_name, highlight_value)
-                    VALUES (%s, %s, %s)
-                    """,
-                    (listing_id, highlight.get('name'), highlight.get('value'))
-                )
-            except psycopg2.Error as e:
-                logger.error(f"Failed to insert highlight: {e}")
+        self._insert_child_rows('listing_highlights', listing_id, self.highlight_rows(listing))
     
     def insert_arrangement_details(self, listing: Dict[str, Any], listing_id: int):
         """
@@ -590,19 +1108,7 @@ class AirbnbETL:
         listing_id : int
             ID of the listing
         """
-        arrangements = listing.get('arrangement_details', [])
-        
-        for arrangement in arrangements:
-            try:
-                self.cursor.execute(
-                    """
-                    INSERT INTO listing_arrangement_details (listing_id, room_name, arrangement_value)
-                    VALUES (%s, %s, %s)
-                    """,
-                    (listing_id, arrangement.get('name'), arrangement.get('value'))
-                )
-            except psycopg2.Error as e:
-                logger.error(f"Failed to insert arrangement detail: {e}")
+        self._insert_child_rows('listing_arrangement_details', listing_id, self.arrangement_rows(listing))
     
     def insert_location_details(self, listing: Dict[str, Any], listing_id: int):
         """
@@ -615,25 +1121,7 @@ class AirbnbETL:
         listing_id : int
             ID of the listing
         """
-        location_details = listing.get('location_details', [])
-        
-        for detail in location_details:
-            # FIX: Skip if value is None or empty (NOT NULL constraint violation)
-            # Some listings have location_details with title but no value
-            # Error prevented: "null value in column "detail_value" violates not-null constraint"
-            if not detail.get('value'):
-                continue
-                
-            try:
-                self.cursor.execute(
-                    """
-                    INSERT INTO listing_location_details (listing_id, detail_title, detail_value)
-                    VALUES (%s, %s, %s)
-                    """,
-                    (listing_id, detail.get('title'), detail.get('value'))
-                )
-            except psycopg2.Error as e:
-                logger.error(f"Failed to insert location detail: {e}")
+        self._insert_child_rows('listing_location_details', listing_id, self.location_detail_rows(listing))
     
     def insert_description_sections(self, listing: Dict[str, Any], listing_id: int):
         """
@@ -646,20 +1134,7 @@ class AirbnbETL:
         listing_id : int
             ID of the listing
         """
-        sections = listing.get('description_by_sections', [])
-        
-        for idx, section in enumerate(sections):
-            try:
-                self.cursor.execute(
-                    """
-                    INSERT INTO listing_description_sections 
-                    (listing_id, section_title, section_value, section_order)
-                    VALUES (%s, %s, %s, %s)
-                    """,
-                    (listing_id, section.get('title'), section.get('value'), idx + 1)
-                )
-            except psycopg2.Error as e:
-                logger.error(f"Failed to insert description section: {e}")
+        self._insert_child_rows('listing_description_sections', listing_id, self.description_section_rows(listing))
     
     def insert_cancellation_policies(self, listing: Dict[str, Any], listing_id: int):
         """
@@ -672,28 +1147,7 @@ class AirbnbETL:
         listing_id : int
             ID of the listing
         """
-        policies = listing.get('cancellation_policy', [])
-        
-        for policy in policies:
-            policy_date = None
-            if policy.get('cancellation_value'):
-                try:
-                    policy_date = datetime.strptime(
-                        policy['cancellation_value'], '%m/%d/%Y'
-                    ).date()
-                except (ValueError, AttributeError):
-                    pass
-            
-            try:
-                self.cursor.execute(
-                    """
-                    INSERT INTO listing_cancellation_policies (listing_id, policy_name, policy_date)
-                    VALUES (%s, %s, %s)
-                    """,
-                    (listing_id, policy.get('cancellation_name'), policy_date)
-                )
-            except psycopg2.Error as e:
-                logger.error(f"Failed to insert cancellation policy: {e}")
+        self._insert_child_rows('listing_cancellation_policies', listing_id, self.cancellation_policy_rows(listing))
     
     def process_listing(self, listing: Dict[str, Any]) -> bool:
         """
@@ -704,12 +1158,21 @@ class AirbnbETL:
         listing : dict
             Complete listing data
         
+        Listings whose content hash matches the stored one are skipped. Changed
+        listings have their amenity links and child rows replaced.
+        
         Returns
         -------
         bool
-            True if successful, False otherwise
+            True if successful (or unchanged), False otherwise
         """
         try:
+            property_id = listing.get('property_id')
+            content_hash = self.content_hash(listing)
+            if property_id and self.content_hashes.get(property_id) == content_hash:
+                self.unchanged_count += 1
+                return True
+            
             # FIX: Create a savepoint for EACH listing (per-listing transaction isolation)
             # Previous issue: All 100 listings in one transaction - if ANY failed, ALL rolled back
             # Now: Each listing commits independently - failures don't cascade
@@ -720,12 +1183,16 @@ class AirbnbETL:
             host_id = self.insert_host(listing)
             
             # Insert main listing
-            listing_id = self.insert_listing(listing, host_id)
+            listing_id = self.insert_listing(listing, host_id, content_hash)
             if not listing_id:
                 logger.warning(f"Skipping listing: {listing.get('name', 'Unknown')}")
                 self.cursor.execute("ROLLBACK TO SAVEPOINT listing_process")
                 return False
             
+            # Changed listing: replace its child rows instead of appending duplicates
+            if property_id in self.content_hashes:
+                self.delete_child_rows("%(listing_id)s", {'listing_id': listing_id})
+            
             # Insert related data
             self.insert_amenities(listing, listing_id)
             self.insert_reviews(listing, listing_id)
@@ -743,6 +1210,8 @@ class AirbnbETL:
             self.cursor.execute("RELEASE SAVEPOINT listing_process")
             self.conn.commit()
             
+            if property_id:
+                self.content_hashes[property_id] = content_hash
             return True
             
         except Exception as e:
@@ -753,15 +1222,500 @@ class AirbnbETL:
                 self.conn.rollback()
             return False
     
-    def run_etl(self, json_file: str, schema_file: str, recreate_schema: bool = True):
+    def build_bulk_buffers(self, listings: List[Dict[str, Any]]) -> Tuple[Dict[str, List[Tuple]], List[Dict[str, Any]]]:
+        """
+        Transform a batch of listings into per-table row buffers.
+        
+        Rows reference their listing by ``property_id`` because listing IDs are
+        only assigned during the merge. Listings repeated in the batch keep
+        their last occurrence, hosts their first (as with the host cache).
+        Listings whose content hash matches the stored one are left out.
+        
+        Parameters
+        ----------
+        listings : list of dict
+            Listing data
+        
+        Returns
+        -------
+        buffers : dict of str to list of tuple
+            Rows keyed by target table ('hosts', 'listings', 'listing_amenities'
+            and every CHILD_TABLES entry)
+        row_by_row : list of dict
+            Listings without a property_id, which cannot be merged by key, and
+            listings whose rows could not be built; both are loaded through
+            process_listing instead
+        """
+        hosts = {}
+        latest = {}
+        row_by_row = []
+        
+        for listing in listings:
+            if not listing.get('property_id'):
+                row_by_row.append(listing)
+            elif not listing.get('name'):
+                logger.warning(f"Skipping listing without name (property_id: {listing['property_id']})")
+            else:
+                latest[listing['property_id']] = listing
+        
+        buffers = {table: [] for table in ['hosts', 'listings', 'listing_amenities', *self.CHILD_TABLES]}
+        for property_id, listing in latest.items():
+            # A malformed listing must not abort the batch: build all of its
+            # rows first and hand it to process_listing (which logs and skips
+            # it) if any builder fails
+            try:
+                content_hash = self.content_hash(listing)
+                if self.content_hashes.get(property_id) == content_hash:
+                    self.unchanged_count += 1
+                    continue
+                
+                host = self.host_row(listing)
+                host_id = None
+                # FIX: Hosts without a name violate NOT NULL; link the listing to no host instead
+                if host is not None and host[1] is not None:
+                    host_id = host[0]
+                
+                rows = {
+                    'listings': [self.listing_row(listing, host_id, content_hash)],
+                    'listing_amenities': [(property_id,) + row for row in self.amenity_rows(listing)],
+                }
+                for table, (builder, _, _) in self.CHILD_TABLES.items():
+                    rows[table] = [(property_id,) + row for row in getattr(self, builder)(listing)]
+            except Exception as e:
+                logger.error(f"Could not transform listing {property_id} for bulk load: {e}")
+                row_by_row.append(listing)
+                continue
+            
+            if host_id is not None:
+                hosts.setdefault(host_id, host)
+            for table, table_rows in rows.items():
+                buffers[table].extend(table_rows)
+        
+        buffers['hosts'] = list(hosts.values())
+        return buffers, row_by_row
+    
+    @staticmethod
+    def _copy_value(value: Any) -> str:
+        """
+        Format one value for COPY text format.
+        
+        Parameters
+        ----------
+        value : any
+            Python value (None, bool, number, str, date or datetime)
+        
+        Returns
+        -------
+        str
+            Escaped field (``\\N`` for NULL)
+        """
+        if value is None:
+            return '\\N'
+        if isinstance(value, bool):
+            return 't' if value else 'f'
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        return (
+            str(value)
+            .replace('\\', '\\\\')
+            .replace('\t', '\\t')
+            .replace('\n', '\\n')
+            .replace('\r', '\\r')
+        )
+    
+    def copy_rows(self, table: str, columns: List[str], rows: List[Tuple]):
+        """
+        Stream rows into a table with COPY FROM STDIN.
+        
+        Parameters
+        ----------
+        table : str
+            Target (staging) table
+        columns : list of str
+            Column names in row order
+        rows : list of tuple
+            Rows to copy
+        """
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write('\t'.join(self._copy_value(value) for value in row))
+            buffer.write('\n')
+        buffer.seek(0)
+        
+        self.cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+    
+    def _staging_tables(self) -> Dict[str, Tuple[str, List[Tuple[str, str]]]]:
+        """
+        Describe the bulk-load staging tables.
+        
+        Returns
+        -------
+        dict of str to tuple
+            Target table -> (staging table name, (name, type) columns)
+        """
+        property_id = [('property_id', 'TEXT')]
+        tables = {
+            'hosts': ('staging_hosts', self.HOST_COLUMNS),
+            'listings': ('staging_listings', self.LISTING_COLUMNS),
+            'listing_amenities': ('staging_listing_amenities', property_id + self.AMENITY_COLUMNS),
+        }
+        for table, (_, columns, _) in self.CHILD_TABLES.items():
+            tables[table] = (f'staging_{table}', property_id + columns)
+        return tables
+    
+    def merge_staging_tables(self):
+        """
+        Merge the staging tables into the normalized tables with set-based SQL.
+        
+        Hosts and listings are upserted with the same ON CONFLICT rules as the
+        row-by-row path, amenity groups and amenities are created once per
+        distinct value, and child rows are attached to listings by property_id.
+        Existing links and child rows of the staged (new or changed) listings
+        are deleted first, so changed listings are replaced, not duplicated.
+        """
+        host_columns = ', '.join(name for name, _ in self.HOST_COLUMNS)
+        self.cursor.execute(self.HOST_UPSERT_QUERY.format(
+            columns=host_columns, source=f"SELECT {host_columns} FROM staging_hosts"
+        ))
+        
+        listing_columns = ', '.join(name for name, _ in self.LISTING_COLUMNS)
+        self.cursor.execute(self.LISTING_UPSERT_QUERY.format(
+            columns=listing_columns, source=f"SELECT {listing_columns} FROM staging_listings"
+        ))
+        
+        self.delete_child_rows(
+            "SELECT l.listing_id FROM listings l JOIN staging_listings s ON s.property_id = l.property_id"
+        )
+        
+        self.cursor.execute("""
+            INSERT INTO amenity_groups (group_name)
+            SELECT DISTINCT group_name FROM staging_listing_amenities
+            ON CONFLICT (group_name) DO NOTHING
+        """)
+        
+        # NULL amenity codes never conflict on the UNIQUE constraint, so match them explicitly
+        self.cursor.execute("""
+            INSERT INTO amenities (amenity_code, amenity_name, group_id)
+            SELECT DISTINCT s.amenity_code, s.amenity_name, g.group_id
+            FROM staging_listing_amenities s
+            JOIN amenity_groups g ON g.group_name = s.group_name
+            WHERE NOT EXISTS (
+                SELECT 1 FROM amenities a
+                WHERE a.amenity_code IS NOT DISTINCT FROM s.amenity_code
+                  AND a.amenity_name = s.amenity_name
+                  AND a.group_id = g.group_id
+            )
+            ON CONFLICT (amenity_code, amenity_name, group_id) DO NOTHING
+        """)
+        
+        self.cursor.execute("""
+            INSERT INTO listing_amenities (listing_id, amenity_id)
+            SELECT DISTINCT l.listing_id, a.amenity_id
+            FROM staging_listing_amenities s
+            JOIN listings l ON l.property_id = s.property_id
+            JOIN amenity_groups g ON g.group_name = s.group_name
+            JOIN amenities a
+                ON a.amenity_code IS NOT DISTINCT FROM s.amenity_code
+                AND a.amenity_name = s.amenity_name
+                AND a.group_id = g.group_id
+            ON CONFLICT (listing_id, amenity_id) DO NOTHING
+        """)
+        
+        for table, (_, columns, conflict) in self.CHILD_TABLES.items():
+            names = ', '.join(name for name, _ in columns)
+            selected = ', '.join(f's.{name}' for name, _ in columns)
+            self.cursor.execute(f"""
+                INSERT INTO {table} (listing_id, {names})
+                SELECT l.listing_id, {selected}
+                FROM staging_{table} s
+                JOIN listings l ON l.property_id = s.property_id
+                {conflict}
+            """)
+    
+    def load_listings_bulk(self, listings: List[Dict[str, Any]]) -> int:
+        """
+        Load a batch of listings with COPY and set-based merges.
+        
+        The batch is transformed in memory into per-table buffers, copied into
+        staging tables and merged in a single transaction, so the number of
+        round trips no longer grows with the number of rows. Staging tables are
+        temporary (never WAL-logged, private to the session) and dropped at
+        commit.
+        
+        Parameters
+        ----------
+        listings : list of dict
+            Listing data
+        
+        Returns
+        -------
+        int
+            Number of listings loaded (including unchanged listings)
+        """
+        unchanged_before = self.unchanged_count
+        buffers, row_by_row = self.build_bulk_buffers(listings)
+        staging_tables = self._staging_tables()
+        
+        try:
+            for table, (staging_table, columns) in staging_tables.items():
+                definitions = ', '.join(f'{name} {sql_type}' for name, sql_type in columns)
+                self.cursor.execute(
+                    f"CREATE TEMP TABLE {staging_table} ({definitions}) ON COMMIT DROP"
+                )
+                self.copy_rows(staging_table, [name for name, _ in columns], buffers[table])
+                logger.info(f"Staged {len(buffers[table])} rows for {table}")
+            
+            self.merge_staging_tables()
+            self.conn.commit()
+            loaded = len(buffers['listings'])
+            for row in buffers['listings']:
+                self.content_hashes[row[0]] = row[-1]
+        except psycopg2.Error as e:
+            # FIX: One bad value fails the whole set-based merge
+            # Fall back to per-listing loading so the rest of the batch still persists
+            self.conn.rollback()
+            logger.error(f"Bulk load failed, falling back to row-by-row: {e}")
+            self.unchanged_count = unchanged_before
+            return sum(self.process_listing(listing) for listing in listings)
+        
+        logger.info(f"Bulk loaded {loaded} listings")
+        loaded += self.unchanged_count - unchanged_before
+        
+        for listing in row_by_row:
+            loaded += self.process_listing(listing)
+        return loaded
+    
+    def read_listings(self, json_file: str, stream: bool = True) -> Iterable[Dict[str, Any]]:
+        """
+        Open a fresh pass over the listings file.
+        
+        Parameters
+        ----------
+        json_file : str
+            Path to JSON or NDJSON file containing Airbnb listings
+        stream : bool, default=True
+            Stream listings (stream_json_data) instead of loading the whole
+            JSON array (load_json_data)
+        
+        Returns
+        -------
+        iterable of dict
+            Listings
+        """
+        if stream:
+            return self.stream_json_data(json_file)
+        return self.load_json_data(json_file)
+    
+    def load_listings(self, listings: Iterable[Dict[str, Any]], bulk: bool = False) -> Tuple[int, int]:
+        """
+        Load listings on this instance's connection.
+        
+        Parameters
+        ----------
+        listings : iterable of dict
+            Listing data
+        bulk : bool, default=False
+            Merge BULK_CHUNK_SIZE listings at a time with load_listings_bulk
+            instead of calling process_listing per listing
+        
+        Returns
+        -------
+        success_count : int
+            Number of listings loaded
+        total_count : int
+            Number of listings read
+        """
+        success_count = total_count = 0
+        if bulk:
+            listings = iter(listings)
+            while True:
+                chunk = list(islice(listings, self.BULK_CHUNK_SIZE))
+                if not chunk:
+                    break
+                success_count += self.load_listings_bulk(chunk)
+                total_count += len(chunk)
+        else:
+            for listing in listings:
+                total_count += 1
+                logger.info(f"Processing listing {total_count}")
+                if self.process_listing(listing):
+                    success_count += 1
+        return success_count, total_count
+    
+    def prewarm_amenity_caches(self, listings: Iterable[Dict[str, Any]]):
+        """
+        Preload the amenity dictionary for a run.
+        
+        Collects the distinct amenity groups and amenities of the whole input,
+        upserts them with one statement per table, then loads the complete
+        ``amenity_groups``/``amenities`` ID maps into the caches, so loading
+        listings (even re-loading identical data) never has to look up an
+        amenity again. Rows are inserted in one transaction, in sorted order,
+        before any worker starts, so concurrent workers only read the caches
+        and never race on ``INSERT ... ON CONFLICT`` into amenity_groups or
+        amenities (no deadlocks, no duplicate NULL-code amenities).
+        
+        Parameters
+        ----------
+        listings : iterable of dict
+            Listing data (only the amenities are read)
+        """
+        amenities = set()
+        for listing in listings:
+            amenities.update(self.amenity_rows(listing))
+        groups = {group_name for group_name, _, _ in amenities}
+        
+        if groups:
+            execute_values(
+                self.cursor,
+                "INSERT INTO amenity_groups (group_name) VALUES %s ON CONFLICT (group_name) DO NOTHING",
+                [(group_name,) for group_name in sorted(groups)],
+                page_size=len(groups)
+            )
+        self.cursor.execute("SELECT group_name, group_id FROM amenity_groups")
+        self.amenity_group_cache.update(self.cursor.fetchall())
+        
+        # NULL amenity codes never conflict on the UNIQUE constraint, so match them explicitly
+        if amenities:
+            execute_values(
+                self.cursor,
+                """
+                INSERT INTO amenities (amenity_code, amenity_name, group_id)
+                SELECT v.amenity_code, v.amenity_name, v.group_id
+                FROM (VALUES %s) AS v (amenity_code, amenity_name, group_id)
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM amenities a
+                    WHERE a.amenity_code IS NOT DISTINCT FROM v.amenity_code
+                      AND a.amenity_name = v.amenity_name
+                      AND a.group_id = v.group_id
+                )
+                ON CONFLICT (amenity_code, amenity_name, group_id) DO NOTHING
+                """,
+                [
+                    (code, name, self.amenity_group_cache[group_name])
+                    for group_name, code, name in sorted(amenities, key=lambda a: (a[0], a[1] or '', a[2]))
+                ],
+                template="(%s::TEXT, %s::TEXT, %s::INTEGER)",
+                page_size=len(amenities)
+            )
+        self.cursor.execute(
+            "SELECT amenity_code, amenity_name, group_id, amenity_id FROM amenities ORDER BY amenity_id"
+        )
+        for code, name, group_id, amenity_id in self.cursor.fetchall():
+            self.amenity_cache.setdefault((code, name, group_id), amenity_id)
+        
+        self.conn.commit()
+        logger.info(
+            f"Upserted {len(groups)} amenity groups and {len(amenities)} amenities; "
+            f"preloaded {len(self.amenity_group_cache)} groups and {len(self.amenity_cache)} amenities"
+        )
+    
+    def load_listings_parallel(self, listings: Iterable[Dict[str, Any]], workers: int,
+                               bulk: bool = False) -> Tuple[int, int]:
+        """
+        Load listings with a pool of worker threads, each on its own connection.
+        
+        Listings are routed by host_id (or property_id) so that one host's
+        rows are always written by the same worker, which keeps workers from
+        contending for the same hosts/listings rows. Per-worker queues are
+        bounded, so streaming input stays streaming. Amenity caches should be
+        pre-warmed (prewarm_amenity_caches); each worker gets its own copy.
+        
+        Parameters
+        ----------
+        listings : iterable of dict
+            Listing data
+        workers : int
+            Number of worker threads (database connections)
+        bulk : bool, default=False
+            Workers load with load_listings_bulk instead of process_listing
+        
+        Returns
+        -------
+        success_count : int
+            Number of listings loaded
+        total_count : int
+            Number of listings read
+        
+        Raises
+        ------
+        RuntimeError
+            If any worker failed (e.g. could not connect)
+        """
+        queues = [queue.Queue(maxsize=self.WORKER_QUEUE_SIZE) for _ in range(workers)]
+        results = [None] * workers
+        unchanged = [0] * workers
+        errors = []
+        
+        def work(worker_id: int):
+            pending = iter(queues[worker_id].get, None)
+            worker = AirbnbETL(self.db_config)
+            worker.amenity_group_cache = dict(self.amenity_group_cache)
+            worker.amenity_cache = dict(self.amenity_cache)
+            worker.content_hashes = dict(self.content_hashes)
+            start = time.perf_counter()
+            try:
+                worker.connect()
+                results[worker_id] = worker.load_listings(pending, bulk)
+            except Exception as e:
+                logger.error(f"Worker {worker_id} failed: {e}")
+                errors.append(e)
+                # Keep draining so the producer never blocks on a dead worker
+                for _ in pending:
+                    pass
+            finally:
+                worker.disconnect()
+                unchanged[worker_id] = worker.unchanged_count
+            results[worker_id] = (*(results[worker_id] or (0, 0)), time.perf_counter() - start)
+        
+        threads = [
+            threading.Thread(target=work, args=(worker_id,), name=f'etl-worker-{worker_id}')
+            for worker_id in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+        
+        start = time.perf_counter()
+        try:
+            for listing in listings:
+                route_key = (listing.get('host_details') or {}).get('host_id') or listing.get('property_id')
+                queues[hash(str(route_key)) % workers].put(listing)
+        finally:
+            for work_queue in queues:
+                work_queue.put(None)
+            for thread in threads:
+                thread.join()
+        elapsed = time.perf_counter() - start
+        self.unchanged_count += sum(unchanged)
+        
+        # Throughput report
+        success_count = sum(result[0] for result in results)
+        total_count = sum(result[1] for result in results)
+        for worker_id, (worker_success, worker_total, worker_elapsed) in enumerate(results):
+            logger.info(
+                f"Worker {worker_id}: {worker_success}/{worker_total} listings in "
+                f"{worker_elapsed:.1f}s ({worker_total / max(worker_elapsed, 1e-9):.1f} listings/sec)"
+            )
+        logger.info(
+            f"All workers: {total_count} listings in {elapsed:.1f}s "
+            f"({total_count / max(elapsed, 1e-9):.1f} listings/sec)"
+        )
+        
+        if errors:
+            raise RuntimeError(f"{len(errors)} of {workers} workers failed: {errors[0]}")
+        
+        return success_count, total_count
+    
+    def run_etl(self, json_file: str, schema_file: str, recreate_schema: bool = True,
+                bulk: bool = False, stream: bool = True, workers: int = 1):
         """
         Execute complete ETL pipeline.
         
         This orchestrates the entire ETL process:
         1. Connect to database
         2. Create/recreate schema if requested
-        3. Load JSON data
-        4. Process each listing with all related data
+        3. Preload the amenity dictionary (one pre-pass over the JSON data)
+        4. Load JSON data and process each listing with all related data
         5. Commit transaction
         6. Report statistics
         
@@ -773,6 +1727,17 @@ class AirbnbETL:
             Path to SQL schema file
         recreate_schema : bool, default=True
             Whether to drop and recreate schema
+        bulk : bool, default=False
+            Load all listings with COPY into staging tables and set-based
+            merges (see load_listings_bulk) instead of row-by-row inserts
+        stream : bool, default=True
+            Read listings incrementally (JSON array or NDJSON, see
+            stream_json_data) and load them as they are parsed; bulk mode
+            then merges BULK_CHUNK_SIZE listings at a time. False reads the
+            whole JSON array first.
+        workers : int, default=1
+            Number of parallel loaders, each with its own connection (see
+            load_listings_parallel).
         
         Example
         -------
@@ -797,20 +1762,26 @@ class AirbnbETL:
                 logger.info("Creating database schema...")
                 self.create_schema(schema_file)
             
-            # Load JSON data
-            listings = self.load_json_data(json_file)
+            # Pre-pass: upsert all amenity groups/amenities once and preload their IDs
+            self.prewarm_amenity_caches(self.read_listings(json_file, stream))
+            self.load_content_hashes()
             
-            # Process each listing
-            success_count = 0
-            for idx, listing in enumerate(listings, 1):
-                logger.info(f"Processing listing {idx}/{len(listings)}")
-                if self.process_listing(listing):
-                    success_count += 1
+            # Load JSON data (streamed listings are loaded while the file is parsed)
+            # and process each listing
+            if workers > 1:
+                success_count, total_count = self.load_listings_parallel(
+                    self.read_listings(json_file, stream), workers, bulk
+                )
+            else:
+                success_count, total_count = self.load_listings(
+                    self.read_listings(json_file, stream), bulk
+                )
             
             # FIX: No batch commit needed - each listing commits individually
             # Previous: Single commit at end caused all-or-nothing behavior
             # Now: Per-listing commits ensure successful listings persist independently
-            logger.info(f"ETL completed successfully! Processed {success_count}/{len(listings)} listings")
+            logger.info(f"ETL completed successfully! Processed {success_count}/{total_count} listings")
+            logger.info(f"Skipped {self.unchanged_count} unchanged listings (content hash match)")
             
         except Exception as e:
             if self.conn:
@@ -821,13 +1792,19 @@ class AirbnbETL:
             self.disconnect()
 
 
-def main():
+def main(args: Optional[argparse.Namespace] = None):
     """
     Main execution function.
     
     Configure database connection and run ETL pipeline.
     Loads database password from .env file using DB_PASSWORD environment variable.
     
+    Parameters
+    ----------
+    args : argparse.Namespace, optional
+        Parsed command-line arguments (see parse_arguments); defaults to
+        ETL_WORKERS from the environment
+    
     Environment Variables Required
     ------------------------------
     DB_PASSWORD : str
@@ -843,6 +1820,16 @@ def main():
         Database user
     DB_PORT : int, default=5432
         PostgreSQL port number
+    BULK_LOAD : str, default='false'
+        Set to 'true' to load with COPY and set-based merges
+    RECREATE_SCHEMA : str, default='true'
+        Set to 'false' to keep existing data; unchanged listings are then
+        skipped by content hash on re-ingest
+    ETL_WORKERS : int, default=1
+        Number of parallel loaders (overridden by ``--workers``)
+    JSON_FILE : str
+        Listings file, either a JSON array or NDJSON (one listing per line),
+        optionally gzip-compressed (``.gz``)
     
     Example .env File
     -----------------
@@ -852,6 +1839,9 @@ def main():
     DB_PASSWORD=your_secure_password
     DB_PORT=5432
     """
+    if args is None:
+        args = argparse.Namespace(workers=int(os.getenv('ETL_WORKERS', '1')))
+    
     # Database configuration - loads from environment variables
     db_config = {
         'host': os.getenv('DB_HOST', 'localhost'),
@@ -873,8 +1863,39 @@ def main():
     
     # Run ETL
     etl = AirbnbETL(db_config)
-    etl.run_etl(json_file, schema_file, recreate_schema=True)
+    bulk = os.getenv('BULK_LOAD', 'false').lower() == 'true'
+    recreate_schema = os.getenv('RECREATE_SCHEMA', 'true').lower() == 'true'
+    etl.run_etl(json_file, schema_file, recreate_schema=recreate_schema, bulk=bulk, workers=args.workers)
+
+
+def parse_arguments():
+    """
+    Parse command-line arguments.
+    
+    Returns
+    -------
+    argparse.Namespace
+        Parsed arguments with 'workers' attribute
+    """
+    parser = argparse.ArgumentParser(
+        description='Load Airbnb listings JSON into the normalized PostgreSQL database',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python etl_airbnb_normalized_postgres.py
+  python etl_airbnb_normalized_postgres.py --workers 4
+        """
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=int(os.getenv('ETL_WORKERS', '1')),
+        help='Number of parallel loaders, each with its own connection (default: 1)'
+    )
+    
+    return parser.parse_args()
 
 
 if __name__ == '__main__':
-    main()
+    main(parse_arguments())
@@ -24,15 +24,25 @@ TARGET_DB_NAME : str
 """
 
 import os
+import re
+import copy
+import hashlib
+import itertools
 import logging
 import psycopg2
 from psycopg2.extras import execute_values
-from datetime import datetime
-from typing import Dict, List, Tuple, Optional
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, Optional
 import numpy as np
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from dotenv import load_dotenv
 
+import dimension_transforms
+import pricing_engine
+import similarity_engine
+from phase_scheduler import Phase, PhaseError, PhaseScheduler
+
 # Load environment variables
 load_dotenv()
 
@@ -86,6 +96,36 @@ class DimensionalETL:
         'Fire extinguisher', 'Security cameras'
     }
     
+    # Extraction settings
+    EXTRACT_ITERSIZE = 5000  # Rows per round trip (and per transform/load chunk) for server-side cursors
+    _cursor_names = itertools.count()  # Unique server-side cursor names, shared by concurrent phase copies
+    
+    # Location clustering settings
+    LOCATION_CLUSTERS = 10
+    LOCATION_MINIBATCH_THRESHOLD = 10000  # Use MiniBatchKMeans from this many coordinates
+    LOCATION_MINIBATCH_SIZE = 1024
+    LOCATION_DRIFT_THRESHOLD = 0.25  # Refit when mean squared distance to centroids grows by >25%
+    
+    # Competitor search settings
+    COMPETITOR_TOP_K = 25
+    SIMILARITY_BLOCK_SIZE = 512
+    CANDIDATE_NEIGHBORS = 200  # Nearest listings scored per source in 'spatial' mode
+    CANDIDATE_RECALL_SAMPLE = 100  # Listings checked against exhaustive mode
+    CANDIDATE_MIN_RECALL = 1.0  # Fall back to exhaustive scoring below this
+    SIMILARITY_SHARD_SIZE = 1000  # Source listings per worker shard / loader batch
+    AMENITY_OVERLAP = False  # Score amenities by Jaccard overlap of amenity sets instead of amenity_score
+    
+    # Schema in the target database exposing the normalized tables (pushdown mode)
+    PUSHDOWN_SOURCE_SCHEMA = 'normalized_source'
+    
+    # Snapshot partition settings
+    PARTITIONED_FACTS = {
+        'fact_listing_metrics': 'snapshot_date',
+        'fact_competitor_pricing_analysis': 'analysis_date_key',
+    }  # Fact tables range-partitioned by month, and their partition key
+    PARTITION_MONTHS_AHEAD = 1  # Months of empty partitions kept ready beyond the current one
+    PARTITION_ARCHIVE_SCHEMA = 'archive'  # Detached (archived) partitions are moved here
+    
     def __init__(self, source_db_config: Dict[str, str], target_db_config: Dict[str, str]):
         """
         Initialize ETL with source and target database configurations.
@@ -143,6 +183,45 @@ class DimensionalETL:
             self.target_conn.close()
         logger.info("All database connections closed")
     
+    def stream_query(self, conn, query: str, params: Optional[Any] = None,
+                     itersize: Optional[int] = None) -> Iterator[List[Tuple]]:
+        """
+        Stream a query result in chunks through a server-side (named) cursor.
+        
+        Only one chunk is held in memory at a time, and callers can transform
+        and load each chunk before the next one is fetched. The connection
+        must stay in the same transaction until the generator is exhausted
+        (no commit while streaming).
+        
+        Parameters
+        ----------
+        conn : psycopg2.extensions.connection
+            Connection to run the query on (source or target)
+        query : str
+            SQL query
+        params : tuple or dict, optional
+            Query parameters
+        itersize : int, optional
+            Rows per chunk, defaults to EXTRACT_ITERSIZE
+        
+        Yields
+        ------
+        list of tuple
+            Up to ``itersize`` result rows
+        """
+        itersize = itersize or self.EXTRACT_ITERSIZE
+        cursor = conn.cursor(name=f"etl_extract_{next(self._cursor_names)}")
+        cursor.itersize = itersize
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(itersize)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+    
     def calculate_haversine_distance(self, lat1: float, lon1: float, 
                                     lat2: float, lon2: float) -> float:
         """
@@ -318,6 +397,29 @@ class DimensionalETL:
         else:
             return 'Basic'
     
+    def classify_amenity(self, amenity_name: Optional[str]) -> Tuple[int, int, int]:
+        """
+        Classify an amenity name against the essential/luxury/safety keyword sets.
+        
+        Parameters
+        ----------
+        amenity_name : str or None
+            Amenity name as stored in the normalized amenities table
+        
+        Returns
+        -------
+        tuple of int
+            (is_essential, is_luxury, is_safety) flags as 0/1
+        """
+        if not amenity_name:
+            return (0, 0, 0)
+        
+        return (
+            int(any(e in amenity_name for e in self.ESSENTIAL_AMENITIES)),
+            int(any(l in amenity_name for l in self.LUXURY_AMENITIES)),
+            int(any(s in amenity_name for s in self.SAFETY_AMENITIES))
+        )
+    
     # ========================================================================
     # DIMENSION LOADING METHODS
     # ========================================================================
@@ -332,18 +434,6 @@ class DimensionalETL:
         """
         logger.info("Loading dim_host...")
         
-        # Extract from source
-        self.source_cursor.execute("""
-            SELECT 
-                host_id, name, image_url, profile_url, rating,
-                number_of_reviews, response_rate, response_time,
-                years_hosting, languages, my_work, is_superhost
-            FROM hosts
-        """)
-        
-        hosts = self.source_cursor.fetchall()
-        logger.info(f"Extracted {len(hosts)} hosts from source")
-        
         # Transform and load
         insert_query = """
             INSERT INTO dim_host (
@@ -360,28 +450,44 @@ class DimensionalETL:
             RETURNING host_key, host_id
         """
         
-        values = []
-        for host in hosts:
-            host_id, name, image, url, rating, reviews, response_rate, \
-            response_time, years, languages, work, is_super = host
+        # Extract from source in chunks; classify and load each chunk
+        loaded = 0
+        for hosts in self.stream_query(self.source_conn, """
+            SELECT 
+                host_id, name, image_url, profile_url, rating,
+                number_of_reviews, response_rate, response_time,
+                years_hosting, languages, my_work, is_superhost
+            FROM hosts
+        """):
+            # Classify whole columns at once
+            columns = list(zip(*hosts))
+            host_tiers = dimension_transforms.classify_host_tiers(
+                columns[11], dimension_transforms.float_column(columns[4])
+            ).tolist()
+            experience_levels = dimension_transforms.classify_experience_levels(
+                dimension_transforms.float_column(columns[8])
+            ).tolist()
             
-            host_tier = self.classify_host_tier(is_super, rating)
-            experience = self.classify_experience_level(years)
+            values = []
+            for host, host_tier, experience in zip(hosts, host_tiers, experience_levels):
+                host_id, name, image, url, rating, reviews, response_rate, \
+                response_time, years, languages, work, is_super = host
+                
+                values.append((
+                    host_id, name, rating, reviews, response_rate,
+                    response_time, years, languages, work, image, url,
+                    is_super, host_tier, experience
+                ))
             
-            values.append((
-                host_id, name, rating, reviews, response_rate,
-                response_time, years, languages, work, image, url,
-                is_super, host_tier, experience
-            ))
-        
-        execute_values(self.target_cursor, insert_query, values)
+            execute_values(self.target_cursor, insert_query, values)
+            loaded += len(values)
         
         # Build cache for lookups
         self.target_cursor.execute("SELECT host_key, host_id FROM dim_host")
         self.host_key_cache = {host_id: host_key for host_key, host_id in self.target_cursor.fetchall()}
         
         self.target_conn.commit()
-        logger.info(f"Loaded {len(values)} hosts into dim_host")
+        logger.info(f"Loaded {loaded} hosts into dim_host")
     
     def load_dim_property(self):
         """
@@ -394,18 +500,6 @@ class DimensionalETL:
         """
         logger.info("Loading dim_property...")
         
-        # Extract from source
-        self.source_cursor.execute("""
-            SELECT 
-                property_id, name, listing_title, listing_name, category,
-                url, description,
-                guests, bedrooms, beds, baths, pets_allowed, is_guest_favorite
-            FROM listings
-        """)
-        
-        properties = self.source_cursor.fetchall()
-        logger.info(f"Extracted {len(properties)} properties from source")
-        
         # Transform and load
         insert_query = """
             INSERT INTO dim_property (
@@ -421,34 +515,190 @@ class DimensionalETL:
             RETURNING property_key, property_id
         """
         
-        values = []
-        for prop in properties:
-            prop_id, name, title, listing_name, category, url, description, \
-            guests, bedrooms, beds, baths, pets, is_fav = prop
+        # Extract from source in chunks; transform and load each chunk
+        loaded = 0
+        for properties in self.stream_query(self.source_conn, """
+            SELECT 
+                property_id, name, listing_title, listing_name, category,
+                url, description,
+                guests, bedrooms, beds, baths, pets_allowed, is_guest_favorite
+            FROM listings
+        """):
+            # Classify sizes and calculate ratios column-wise
+            # (NULL/zero guests or baths and non-positive bedrooms give NULL ratios)
+            columns = list(zip(*properties))
+            guests_col, bedrooms_col, baths_col = (
+                dimension_transforms.float_column(columns[i]) for i in (7, 8, 10)
+            )
+            size_tiers = dimension_transforms.classify_property_size_tiers(bedrooms_col).tolist()
+            has_bedrooms = bedrooms_col > 0
+            safe_bedrooms = np.where(has_bedrooms, bedrooms_col, 1.0)
+            guest_ratios = [
+                ratio if valid else None for ratio, valid in zip(
+                    (guests_col / safe_bedrooms).tolist(),
+                    (has_bedrooms & (guests_col != 0) & ~np.isnan(guests_col)).tolist()
+                )
+            ]
+            bath_ratios = [
+                ratio if valid else None for ratio, valid in zip(
+                    (baths_col / safe_bedrooms).tolist(),
+                    (has_bedrooms & (baths_col != 0) & ~np.isnan(baths_col)).tolist()
+                )
+            ]
             
-            size_tier = self.classify_property_size_tier(bedrooms)
+            values = []
+            for prop, size_tier, guest_ratio, bath_ratio in zip(properties, size_tiers, guest_ratios, bath_ratios):
+                prop_id, name, title, listing_name, category, url, description, \
+                guests, bedrooms, beds, baths, pets, is_fav = prop
             
-            # Calculate ratios (handle division by zero and None values)
-            guest_ratio = guests / bedrooms if guests and bedrooms and bedrooms > 0 else None
-            bath_ratio = baths / bedrooms if baths and bedrooms and bedrooms > 0 else None
+                values.append((
+                    prop_id, name, listing_name or name, title, category,
+                    url, description,
+                    guests, bedrooms, beds, baths, pets, is_fav,
+                    size_tier, guest_ratio, bath_ratio
+                ))
             
-            values.append((
-                prop_id, name, listing_name or name, title, category,
-                url, description,
-                guests, bedrooms, beds, baths, pets, is_fav,
-                size_tier, guest_ratio, bath_ratio
-            ))
-        
-        execute_values(self.target_cursor, insert_query, values)
+            execute_values(self.target_cursor, insert_query, values)
+            loaded += len(values)
         
         # Build cache
         self.target_cursor.execute("SELECT property_key, property_id FROM dim_property")
         self.property_key_cache = {prop_id: prop_key for prop_key, prop_id in self.target_cursor.fetchall()}
         
         self.target_conn.commit()
-        logger.info(f"Loaded {len(values)} properties into dim_property")
+        logger.info(f"Loaded {loaded} properties into dim_property")
+    
+    def load_location_centroids(self) -> Optional[Tuple[np.ndarray, float]]:
+        """
+        Read the cluster centroids persisted by the previous run.
+        
+        Returns
+        -------
+        tuple of (np.ndarray, float) or None
+            Centroids of shape (k, 2) ordered by cluster_id, and the mean
+            squared member distance at fit time; None if nothing is stored
+        """
+        # State tables created before persisted clustering lack this table
+        self.target_cursor.execute("""
+            CREATE TABLE IF NOT EXISTS location_cluster_centroids (
+                cluster_id INTEGER PRIMARY KEY,
+                centroid_latitude DOUBLE PRECISION NOT NULL,
+                centroid_longitude DOUBLE PRECISION NOT NULL,
+                member_count INTEGER,
+                mean_sq_distance DOUBLE PRECISION,
+                fitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        self.target_cursor.execute("""
+            SELECT cluster_id, centroid_latitude, centroid_longitude, member_count, mean_sq_distance
+            FROM location_cluster_centroids
+            ORDER BY cluster_id
+        """)
+        rows = self.target_cursor.fetchall()
+        
+        # IDs must be 0..k-1 to index the centroid array
+        if not rows or [row[0] for row in rows] != list(range(len(rows))):
+            return None
+        
+        centroids = np.array([(row[1], row[2]) for row in rows], dtype=np.float64)
+        counts = np.array([row[3] or 0 for row in rows], dtype=np.float64)
+        mean_sq = np.array([row[4] or 0.0 for row in rows], dtype=np.float64)
+        fit_mean_sq = float((counts * mean_sq).sum() / counts.sum()) if counts.sum() > 0 else 0.0
+        
+        return centroids, fit_mean_sq
+    
+    def save_location_centroids(self, centroids: np.ndarray, labels: np.ndarray,
+                                sq_distances: np.ndarray):
+        """
+        Persist cluster centroids and their fit statistics.
+        
+        Parameters
+        ----------
+        centroids : np.ndarray
+            Centroids of shape (k, 2), row i is cluster_id i
+        labels : np.ndarray
+            Cluster assignment of every coordinate
+        sq_distances : np.ndarray
+            Squared distance of every coordinate to its centroid
+        """
+        values = []
+        for cluster_id, (lat, lon) in enumerate(centroids.tolist()):
+            members = labels == cluster_id
+            count = int(members.sum())
+            mean_sq = float(sq_distances[members].mean()) if count else 0.0
+            values.append((cluster_id, lat, lon, count, mean_sq))
+        
+        self.target_cursor.execute("DELETE FROM location_cluster_centroids")
+        execute_values(self.target_cursor, """
+            INSERT INTO location_cluster_centroids (
+                cluster_id, centroid_latitude, centroid_longitude, member_count, mean_sq_distance
+            ) VALUES %s
+        """, values)
+    
+    def fit_location_clusters(self, coords: np.ndarray, n_clusters: int,
+                              init: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Fit K-means centroids, warm-starting from previous centroids if given.
+        
+        Markets with at least LOCATION_MINIBATCH_THRESHOLD coordinates use
+        MiniBatchKMeans. Seeding with the previous centroids keeps cluster i
+        near its old position, so refits do not renumber clusters.
+        
+        Parameters
+        ----------
+        coords : np.ndarray
+            (latitude, longitude) pairs, shape (n, 2)
+        n_clusters : int
+            Number of clusters
+        init : np.ndarray, optional
+            Previous centroids of shape (n_clusters, 2)
+        
+        Returns
+        -------
+        np.ndarray
+            Fitted centroids, shape (n_clusters, 2)
+        """
+        if len(coords) >= self.LOCATION_MINIBATCH_THRESHOLD:
+            model = MiniBatchKMeans(
+                n_clusters=n_clusters, random_state=42,
+                batch_size=self.LOCATION_MINIBATCH_SIZE,
+                init=init if init is not None else 'k-means++',
+                n_init=1 if init is not None else 3
+            )
+        else:
+            model = KMeans(
+                n_clusters=n_clusters, random_state=42,
+                init=init if init is not None else 'k-means++',
+                n_init=1 if init is not None else 10
+            )
+        
+        model.fit(coords)
+        return model.cluster_centers_
+    
+    @staticmethod
+    def assign_location_clusters(coords: np.ndarray, centroids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Assign coordinates to their nearest centroid (same metric as K-means).
+        
+        Parameters
+        ----------
+        coords : np.ndarray
+            (latitude, longitude) pairs, shape (n, 2)
+        centroids : np.ndarray
+            Centroids, shape (k, 2)
+        
+        Returns
+        -------
+        labels : np.ndarray
+            Cluster index per coordinate, shape (n,)
+        sq_distances : np.ndarray
+            Squared distance to the assigned centroid, shape (n,)
+        """
+        sq = ((coords[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+        labels = sq.argmin(axis=1)
+        return labels, sq[np.arange(len(coords)), labels]
     
-    def load_dim_location(self):
+    def load_dim_location(self, refit: bool = False):
         """
         Load dim_location dimension with geographic clustering.
         
@@ -456,18 +706,32 @@ class DimensionalETL:
         - location_cluster_id (K-means cluster assignment)
         - distance_to_downtown_km
         - location_tier (Urban Core/Downtown Adjacent/Neighborhood/Suburban)
+        
+        Centroids are persisted in location_cluster_centroids. Later runs
+        assign coordinates to the stored centroids without refitting, so
+        cluster IDs stay stable; they refit (warm-started from the stored
+        centroids) only when requested or when the mean squared distance to
+        the centroids has drifted by more than LOCATION_DRIFT_THRESHOLD.
+        
+        Parameters
+        ----------
+        refit : bool, default=False
+            Refit the clusters even if the stored centroids have not drifted
         """
         logger.info("Loading dim_location...")
         
-        # Extract unique locations from source
-        self.source_cursor.execute("""
-            SELECT DISTINCT
-                city, province, country, latitude, longitude
-            FROM listings
-            WHERE latitude IS NOT NULL AND longitude IS NOT NULL
-        """)
-        
-        locations = self.source_cursor.fetchall()
+        # Extract unique locations from source (clustering needs every
+        # coordinate, so the chunks are collected rather than loaded one by one)
+        locations = [
+            location
+            for chunk in self.stream_query(self.source_conn, """
+                SELECT DISTINCT
+                    city, province, country, latitude, longitude
+                FROM listings
+                WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+            """)
+            for location in chunk
+        ]
         logger.info(f"Extracted {len(locations)} unique locations from source")
         
         if len(locations) == 0:
@@ -475,18 +739,45 @@ class DimensionalETL:
             return
         
         # Prepare coordinates for clustering
-        coords = np.array([(lat, lon) for _, _, _, lat, lon in locations])
+        coords = np.array([(float(lat), float(lon)) for _, _, _, lat, lon in locations], dtype=np.float64)
         
-        # Perform K-means clustering (use min of 10 clusters or number of locations)
-        n_clusters = min(10, len(locations))
+        # Perform K-means clustering (use min of LOCATION_CLUSTERS or number of locations)
+        n_clusters = min(self.LOCATION_CLUSTERS, len(locations))
         if len(locations) >= 3:
-            kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
-            cluster_labels = kmeans.fit_predict(coords)
+            stored = self.load_location_centroids()
+            init = stored[0] if stored is not None and len(stored[0]) == n_clusters else None
+            
+            if init is not None and not refit:
+                # Assign to the stored clusters; refit only if they have drifted
+                cluster_labels, sq_distances = self.assign_location_clusters(coords, init)
+                fit_mean_sq = stored[1]
+                current_mean_sq = float(sq_distances.mean())
+                drift = (current_mean_sq / fit_mean_sq - 1) if fit_mean_sq > 0 else (
+                    np.inf if current_mean_sq > 0 else 0.0
+                )
+                
+                if drift <= self.LOCATION_DRIFT_THRESHOLD:
+                    logger.info(
+                        f"Assigned locations to {n_clusters} stored clusters "
+                        f"(drift {drift:.1%}, no refit)"
+                    )
+                else:
+                    logger.info(f"Cluster drift {drift:.1%} exceeds threshold, refitting")
+                    refit = True
+            else:
+                refit = True
+            
+            if refit:
+                centroids = self.fit_location_clusters(coords, n_clusters, init=init)
+                cluster_labels, sq_distances = self.assign_location_clusters(coords, centroids)
+                self.save_location_centroids(centroids, cluster_labels, sq_distances)
+                logger.info(
+                    f"Performed K-means clustering with {n_clusters} clusters "
+                    f"({'warm start' if init is not None else 'cold start'})"
+                )
         else:
             cluster_labels = [0] * len(locations)
         
-        logger.info(f"Performed K-means clustering with {n_clusters} clusters")
-        
         # Transform and load
         insert_query = """
             INSERT INTO dim_location (
@@ -501,22 +792,22 @@ class DimensionalETL:
             RETURNING location_key, latitude, longitude
         """
         
+        # Calculate distance to downtown and tiers for all locations at once
+        distances = dimension_transforms.haversine_to_point(
+            coords[:, 0], coords[:, 1],
+            self.CALGARY_DOWNTOWN_LAT, self.CALGARY_DOWNTOWN_LONG
+        )
+        location_tiers = dimension_transforms.classify_location_tiers(distances).tolist()
+        rounded_distances = np.round(distances, 2).tolist()
+        
         values = []
         for i, loc in enumerate(locations):
             city, province, country, lat, lon = loc
             cluster_id = int(cluster_labels[i])
             
-            # Calculate distance to downtown
-            distance = self.calculate_haversine_distance(
-                lat, lon,
-                self.CALGARY_DOWNTOWN_LAT, self.CALGARY_DOWNTOWN_LONG
-            )
-            
-            location_tier = self.classify_location_tier(distance)
-            
             values.append((
                 city, province, country, lat, lon,
-                cluster_id, float(round(distance, 2)), location_tier
+                cluster_id, rounded_distances[i], location_tiers[i]
             ))
         
         execute_values(self.target_cursor, insert_query, values)
@@ -531,6 +822,21 @@ class DimensionalETL:
         self.target_conn.commit()
         logger.info(f"Loaded {len(values)} locations into dim_location")
     
+    def ensure_rating_natural_key(self):
+        """
+        Add the property_id natural key to dim_category_ratings if missing.
+        
+        Tables created before rating rows were upserted lack the column; their
+        existing rows keep a NULL property_id and are never reused.
+        """
+        self.target_cursor.execute("""
+            ALTER TABLE dim_category_ratings ADD COLUMN IF NOT EXISTS property_id TEXT
+        """)
+        self.target_cursor.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_dim_category_ratings_property_id
+            ON dim_category_ratings(property_id)
+        """)
+    
     def load_dim_category_ratings(self):
         """
         Load dim_category_ratings dimension from listing_category_ratings.
@@ -539,101 +845,113 @@ class DimensionalETL:
         - overall_quality_score (weighted average of all ratings)
         - quality_tier (Exceptional/Excellent/Good/Fair)
         - value_index (value_rating / overall_quality_score)
+        
+        Rows are upserted on property_id, so re-runs update each property's
+        rating row instead of appending a new set.
         """
         logger.info("Loading dim_category_ratings...")
         
-        # Extract category ratings from source (pivot from rows to columns)
-        self.source_cursor.execute("""
-            SELECT 
-                listing_id,
-                MAX(CASE WHEN category_name ILIKE '%clean%' THEN rating_value END) as cleanliness,
-                MAX(CASE WHEN category_name ILIKE '%accura%' THEN rating_value END) as accuracy,
-                MAX(CASE WHEN category_name ILIKE '%check%' THEN rating_value END) as checkin,
-                MAX(CASE WHEN category_name ILIKE '%commun%' THEN rating_value END) as communication,
-                MAX(CASE WHEN category_name ILIKE '%locat%' THEN rating_value END) as location,
-                MAX(CASE WHEN category_name ILIKE '%value%' THEN rating_value END) as value
-            FROM listing_category_ratings
-            GROUP BY listing_id
-        """)
-        
-        ratings = self.source_cursor.fetchall()
-        logger.info(f"Extracted {len(ratings)} rating sets from source")
-        
-        if len(ratings) == 0:
-            logger.warning("No category ratings found")
-            return
+        self.ensure_rating_natural_key()
         
         # Transform and load
         insert_query = """
             INSERT INTO dim_category_ratings (
-                cleanliness_rating, accuracy_rating, checkin_rating,
+                property_id, cleanliness_rating, accuracy_rating, checkin_rating,
                 communication_rating, location_rating, value_rating,
                 overall_quality_score, quality_tier, value_index
             ) VALUES %s
-            RETURNING rating_key
+            ON CONFLICT (property_id) DO UPDATE SET
+                cleanliness_rating = EXCLUDED.cleanliness_rating,
+                accuracy_rating = EXCLUDED.accuracy_rating,
+                checkin_rating = EXCLUDED.checkin_rating,
+                communication_rating = EXCLUDED.communication_rating,
+                location_rating = EXCLUDED.location_rating,
+                value_rating = EXCLUDED.value_rating,
+                overall_quality_score = EXCLUDED.overall_quality_score,
+                quality_tier = EXCLUDED.quality_tier,
+                value_index = EXCLUDED.value_index,
+                updated_at = CURRENT_TIMESTAMP
+            RETURNING rating_key, property_id
         """
         
-        values = []
-        listing_rating_map = {}
-        
-        for rating in ratings:
-            listing_id, clean, accuracy, checkin, comm, location, value = rating
-            
-            # Convert Decimal to float for calculations
-            clean = float(clean) if clean is not None else None
-            accuracy = float(accuracy) if accuracy is not None else None
-            checkin = float(checkin) if checkin is not None else None
-            comm = float(comm) if comm is not None else None
-            location = float(location) if location is not None else None
-            value = float(value) if value is not None else None
-            
-            # Calculate overall quality score (weighted average)
-            scores = []
-            weights = []
-            
-            if clean: scores.append(clean); weights.append(0.25)
-            if accuracy: scores.append(accuracy); weights.append(0.15)
-            if checkin: scores.append(checkin); weights.append(0.10)
-            if comm: scores.append(comm); weights.append(0.15)
-            if location: scores.append(location); weights.append(0.15)
-            if value: scores.append(value); weights.append(0.20)
-            
-            if scores:
-                # Normalize weights
-                total_weight = sum(weights)
-                overall = sum(s * w for s, w in zip(scores, weights)) / total_weight
-            else:
-                overall = None
-            
-            quality_tier = self.classify_quality_tier(overall)
-            value_index = (value / overall) if overall and value else None
+        # Extract category ratings from source (pivot from rows to columns)
+        # in chunks; transform and load each chunk
+        loaded = 0
+        for ratings in self.stream_query(self.source_conn, """
+            SELECT 
+                cr.listing_id,
+                l.property_id,
+                MAX(CASE WHEN category_name ILIKE '%clean%' THEN rating_value END) as cleanliness,
+                MAX(CASE WHEN category_name ILIKE '%accura%' THEN rating_value END) as accuracy,
+                MAX(CASE WHEN category_name ILIKE '%check%' THEN rating_value END) as checkin,
+                MAX(CASE WHEN category_name ILIKE '%commun%' THEN rating_value END) as communication,
+                MAX(CASE WHEN category_name ILIKE '%locat%' THEN rating_value END) as location,
+                MAX(CASE WHEN category_name ILIKE '%value%' THEN rating_value END) as value
+            FROM listing_category_ratings cr
+            JOIN listings l ON cr.listing_id = l.listing_id
+            WHERE l.property_id IS NOT NULL
+            GROUP BY cr.listing_id, l.property_id
+        """):
+            values = []
+            listing_ids = {}
             
-            values.append((
-                clean, accuracy, checkin, comm, location, value,
-                overall, quality_tier, value_index
-            ))
+            for rating in ratings:
+                listing_id, prop_id, clean, accuracy, checkin, comm, location, value = rating
+                
+                # Convert Decimal to float for calculations
+                clean = float(clean) if clean is not None else None
+                accuracy = float(accuracy) if accuracy is not None else None
+                checkin = float(checkin) if checkin is not None else None
+                comm = float(comm) if comm is not None else None
+                location = float(location) if location is not None else None
+                value = float(value) if value is not None else None
+                
+                # Calculate overall quality score (weighted average)
+                scores = []
+                weights = []
+                
+                if clean: scores.append(clean); weights.append(0.25)
+                if accuracy: scores.append(accuracy); weights.append(0.15)
+                if checkin: scores.append(checkin); weights.append(0.10)
+                if comm: scores.append(comm); weights.append(0.15)
+                if location: scores.append(location); weights.append(0.15)
+                if value: scores.append(value); weights.append(0.20)
+                
+                if scores:
+                    # Normalize weights
+                    total_weight = sum(weights)
+                    overall = sum(s * w for s, w in zip(scores, weights)) / total_weight
+                else:
+                    overall = None
+                
+                value_index = (value / overall) if overall and value else None
+                
+                values.append([
+                    prop_id, clean, accuracy, checkin, comm, location, value,
+                    overall, None, value_index
+                ])
+                listing_ids[prop_id] = listing_id
+                
+            # Classify quality tiers for the whole batch
+            quality_tiers = dimension_transforms.classify_quality_tiers(
+                dimension_transforms.float_column([row[7] for row in values])
+            ).tolist()
+            for row, quality_tier in zip(values, quality_tiers):
+                row[8] = quality_tier
+            values = [tuple(row) for row in values]
             
-            # Map listing_id to position for later lookup
-            listing_rating_map[listing_id] = len(values) - 1
-        
-        execute_values(self.target_cursor, insert_query, values)
-        
-        # Get generated keys and build cache
-        self.target_cursor.execute("""
-            SELECT rating_key FROM dim_category_ratings 
-            ORDER BY rating_key DESC LIMIT %s
-        """, (len(values),))
+            # Map listing_id to rating_key from the returned natural keys
+            returned = execute_values(self.target_cursor, insert_query, values, fetch=True)
+            for rating_key, prop_id in returned:
+                self.rating_key_cache[listing_ids[prop_id]] = rating_key
+            loaded += len(values)
         
-        rating_keys = [row[0] for row in self.target_cursor.fetchall()]
-        rating_keys.reverse()  # Match insertion order
-        
-        # Map listing_id to rating_key
-        for listing_id, idx in listing_rating_map.items():
-            if idx < len(rating_keys):
-                self.rating_key_cache[listing_id] = rating_keys[idx]
+        if loaded == 0:
+            logger.warning("No category ratings found")
+            return
         
         self.target_conn.commit()
-        logger.info(f"Loaded {len(values)} rating sets into dim_category_ratings")
+        logger.info(f"Loaded {loaded} rating sets into dim_category_ratings")
     
     # ========================================================================
     # FACT TABLE LOADING
@@ -652,8 +970,27 @@ class DimensionalETL:
         """
         logger.info("Loading fact_listing_metrics...")
         
-        # Extract from source with all necessary data
-        self.source_cursor.execute("""
+        # Calculate today's date_key
+        today = datetime.now()
+        date_key = int(today.strftime('%Y%m%d'))
+        
+        # Transform and load
+        insert_query = """
+            INSERT INTO fact_listing_metrics (
+                property_id, host_key, property_key, location_key, rating_key,
+                date_key, price_per_night, currency, listing_rating, number_of_reviews,
+                is_available, price_per_guest, price_per_bedroom, price_per_bed,
+                review_velocity, competitiveness_score, value_score, popularity_index,
+                data_scraped_at, snapshot_date
+            ) VALUES %s
+            RETURNING listing_key, property_id
+        """
+        
+        # Extract from source with all necessary data in chunks; transform
+        # and load each chunk
+        loaded = 0
+        skipped = 0
+        for listings in self.stream_query(self.source_conn, """
             SELECT 
                 l.listing_id,
                 l.property_id,
@@ -673,92 +1010,386 @@ class DimensionalETL:
                 l.timestamp
             FROM listings l
             WHERE l.property_id IS NOT NULL
-        """)
+        """):
+            values = []
+            
+            for listing in listings:
+                listing_id, prop_id, host_id, price, currency, rating, reviews, \
+                guests, bedrooms, beds, baths, avail, is_fav, lat, lon, timestamp = listing
+                
+                # Convert Decimal types to float for calculations
+                price = float(price) if price is not None else None
+                rating = float(rating) if rating is not None else None
+                lat = float(lat) if lat is not None else None
+                lon = float(lon) if lon is not None else None
+                
+                # Lookup dimension keys
+                host_key = self.host_key_cache.get(host_id)
+                property_key = self.property_key_cache.get(prop_id)
+                location_key = self.location_key_cache.get((lat, lon)) if lat and lon else None
+                rating_key = self.rating_key_cache.get(listing_id)
+                
+                if not all([host_key, property_key, location_key]):
+                    skipped += 1
+                    continue
+                
+                # Calculate derived measures
+                price_per_guest = price / guests if price and guests and guests > 0 else None
+                price_per_bedroom = price / bedrooms if price and bedrooms and bedrooms > 0 else None
+                price_per_bed = price / beds if price and beds and beds > 0 else None
+                
+                # Review velocity (reviews per day since creation)
+                if timestamp:
+                    days_since = (datetime.now() - timestamp).days
+                    review_velocity = reviews / days_since if days_since > 0 else 0
+                else:
+                    review_velocity = None
+                
+                # Competitiveness score (simplified - will be enhanced with amenities)
+                comp_score = 0
+                if rating: comp_score += (rating / 5.0) * 30
+                if reviews: comp_score += min(reviews / 100, 1.0) * 25
+                if is_fav: comp_score += 10
+                # Will add host and amenity components later
+                
+                # Value score (quality vs price) - placeholder
+                value_score = None
+                if rating and price and price > 0:
+                    value_score = (rating / 5.0) / (price / 200) * 100
+                    value_score = min(value_score, 100)
+                
+                # Popularity index - placeholder
+                popularity_index = None
+                if rating and reviews:
+                    popularity_index = (reviews * rating) / 10  # Simplified
+                
+                values.append((
+                    prop_id, host_key, property_key, location_key, rating_key,
+                    date_key, price, currency or 'CAD', rating, reviews, avail,
+                    price_per_guest, price_per_bedroom, price_per_bed,
+                    review_velocity, comp_score, value_score, popularity_index,
+                    timestamp, today.date()
+                ))
+            
+            execute_values(self.target_cursor, insert_query, values)
+            loaded += len(values)
         
-        listings = self.source_cursor.fetchall()
-        logger.info(f"Extracted {len(listings)} listings from source")
+        self.target_conn.commit()
+        logger.info(f"Loaded {loaded} listings into fact_listing_metrics (skipped {skipped})")
+    
+    # ========================================================================
+    # PUSHDOWN (SET-BASED) LOADING
+    # ========================================================================
+    
+    @staticmethod
+    def _float_literal(value: float) -> str:
+        """
+        Render a float threshold as the exact NUMERIC literal of its binary value.
         
-        # Calculate today's date_key
-        today = datetime.now()
-        date_key = int(today.strftime('%Y%m%d'))
+        The Python classifiers compare Decimal columns against float constants,
+        which Python does exactly (``Decimal('4.80') > 4.8`` is True because the
+        float 4.8 is slightly below 4.8). Comparing the NUMERIC column against
+        the float's exact expansion reproduces that behaviour in SQL.
         
-        # Transform and load
-        insert_query = """
-            INSERT INTO fact_listing_metrics (
-                property_id, host_key, property_key, location_key, rating_key,
-                date_key, price_per_night, currency, listing_rating, number_of_reviews,
-                is_available, price_per_guest, price_per_bedroom, price_per_bed,
-                review_velocity, competitiveness_score, value_score, popularity_index,
-                data_scraped_at, snapshot_date
-            ) VALUES %s
-            RETURNING listing_key, property_id
+        Parameters
+        ----------
+        value : float
+            Threshold used by a classify_* helper
+        
+        Returns
+        -------
+        str
+            Exact decimal expansion of ``value``
+        """
+        return str(Decimal(value))
+    
+    def attach_source_schema(self):
         """
+        Make the normalized tables queryable from the target database.
         
-        values = []
-        skipped = 0
+        If schema PUSHDOWN_SOURCE_SCHEMA already exists in the target database
+        (both models in one database, or a foreign schema set up by an
+        administrator) it is used as-is. Otherwise it is created with
+        postgres_fdw pointing at the source database, importing only the tables
+        the pushdown loaders read.
+        """
+        schema = self.PUSHDOWN_SOURCE_SCHEMA
+        self.target_cursor.execute(
+            "SELECT 1 FROM information_schema.schemata WHERE schema_name = %s", (schema,)
+        )
+        if self.target_cursor.fetchone():
+            logger.info(f"Using existing source schema '{schema}' for pushdown")
+            return
         
-        for listing in listings:
-            listing_id, prop_id, host_id, price, currency, rating, reviews, \
-            guests, bedrooms, beds, baths, avail, is_fav, lat, lon, timestamp = listing
-            
-            # Convert Decimal types to float for calculations
-            price = float(price) if price is not None else None
-            rating = float(rating) if rating is not None else None
-            lat = float(lat) if lat is not None else None
-            lon = float(lon) if lon is not None else None
-            
-            # Lookup dimension keys
-            host_key = self.host_key_cache.get(host_id)
-            property_key = self.property_key_cache.get(prop_id)
-            location_key = self.location_key_cache.get((lat, lon)) if lat and lon else None
-            rating_key = self.rating_key_cache.get(listing_id)
-            
-            if not all([host_key, property_key, location_key]):
-                skipped += 1
-                continue
-            
-            # Calculate derived measures
-            price_per_guest = price / guests if price and guests and guests > 0 else None
-            price_per_bedroom = price / bedrooms if price and bedrooms and bedrooms > 0 else None
-            price_per_bed = price / beds if price and beds and beds > 0 else None
-            
-            # Review velocity (reviews per day since creation)
-            if timestamp:
-                days_since = (datetime.now() - timestamp).days
-                review_velocity = reviews / days_since if days_since > 0 else 0
-            else:
-                review_velocity = None
-            
-            # Competitiveness score (simplified - will be enhanced with amenities)
-            comp_score = 0
-            if rating: comp_score += (rating / 5.0) * 30
-            if reviews: comp_score += min(reviews / 100, 1.0) * 25
-            if is_fav: comp_score += 10
-            # Will add host and amenity components later
-            
-            # Value score (quality vs price) - placeholder
-            value_score = None
-            if rating and price and price > 0:
-                value_score = (rating / 5.0) / (price / 200) * 100
-                value_score = min(value_score, 100)
-            
-            # Popularity index - placeholder
-            popularity_index = None
-            if rating and reviews:
-                popularity_index = (reviews * rating) / 10  # Simplified
-            
-            values.append((
-                prop_id, host_key, property_key, location_key, rating_key,
-                date_key, price, currency or 'CAD', rating, reviews, avail,
-                price_per_guest, price_per_bedroom, price_per_bed,
-                review_velocity, comp_score, value_score, popularity_index,
-                timestamp, today.date()
-            ))
+        logger.info(f"Creating foreign schema '{schema}' for pushdown (postgres_fdw)")
+        self.target_cursor.execute("CREATE EXTENSION IF NOT EXISTS postgres_fdw")
+        self.target_cursor.execute(
+            f"""
+            CREATE SERVER IF NOT EXISTS {schema}_server FOREIGN DATA WRAPPER postgres_fdw
+            OPTIONS (host %s, port %s, dbname %s)
+            """,
+            (self.source_db_config['host'], str(self.source_db_config['port']),
+             self.source_db_config['database'])
+        )
+        self.target_cursor.execute(
+            f"""
+            CREATE USER MAPPING IF NOT EXISTS FOR CURRENT_USER SERVER {schema}_server
+            OPTIONS (user %s, password %s)
+            """,
+            (self.source_db_config['user'], self.source_db_config['password'])
+        )
+        self.target_cursor.execute(f"CREATE SCHEMA {schema}")
+        self.target_cursor.execute(f"""
+            IMPORT FOREIGN SCHEMA public
+            LIMIT TO (hosts, listings, listing_category_ratings)
+            FROM SERVER {schema}_server INTO {schema}
+        """)
+        self.target_conn.commit()
+    
+    def load_dim_host_pushdown(self):
+        """
+        Load dim_host server-side with INSERT ... SELECT.
         
-        execute_values(self.target_cursor, insert_query, values)
+        Equivalent to load_dim_host; host_tier and experience_level are CASE
+        expressions mirroring classify_host_tier and classify_experience_level.
+        """
+        logger.info("Loading dim_host (pushdown)...")
+        
+        self.target_cursor.execute(f"""
+            INSERT INTO dim_host (
+                host_id, host_name, host_rating, host_number_of_reviews,
+                host_response_rate, host_response_time, host_years_hosting,
+                languages, my_work, image_url, profile_url, is_superhost,
+                host_tier, experience_level
+            )
+            SELECT
+                h.host_id, h.name, h.rating, h.number_of_reviews,
+                h.response_rate, h.response_time, h.years_hosting,
+                h.languages, h.my_work, h.image_url, h.profile_url, h.is_superhost,
+                CASE
+                    WHEN h.rating IS NULL THEN 'Standard'
+                    WHEN h.is_superhost AND h.rating > {self._float_literal(4.8)} THEN 'Elite'
+                    WHEN h.rating > {self._float_literal(4.5)} THEN 'Premium'
+                    ELSE 'Standard'
+                END,
+                CASE
+                    WHEN h.years_hosting IS NULL OR h.years_hosting <= 2 THEN 'New'
+                    WHEN h.years_hosting <= 5 THEN 'Experienced'
+                    ELSE 'Expert'
+                END
+            FROM {self.PUSHDOWN_SOURCE_SCHEMA}.hosts h
+            ON CONFLICT (host_id) DO UPDATE SET
+                host_rating = EXCLUDED.host_rating,
+                host_number_of_reviews = EXCLUDED.host_number_of_reviews,
+                host_tier = EXCLUDED.host_tier,
+                updated_at = CURRENT_TIMESTAMP
+        """)
+        loaded = self.target_cursor.rowcount
+        
+        self.target_conn.commit()
+        logger.info(f"Loaded {loaded} hosts into dim_host")
+    
+    def load_dim_property_pushdown(self):
+        """
+        Load dim_property server-side with INSERT ... SELECT.
+        
+        Equivalent to load_dim_property; property_size_tier mirrors
+        classify_property_size_tier and the ratios use the same guards.
+        """
+        logger.info("Loading dim_property (pushdown)...")
+        
+        self.target_cursor.execute(f"""
+            INSERT INTO dim_property (
+                property_id, name, listing_name, listing_title, category,
+                url, description,
+                guests_capacity, bedrooms, beds, baths, pets_allowed,
+                is_guest_favorite, property_size_tier,
+                guest_per_bedroom_ratio, bath_to_bedroom_ratio
+            )
+            SELECT
+                l.property_id, l.name, COALESCE(NULLIF(l.listing_name, ''), l.name),
+                l.listing_title, l.category, l.url, l.description,
+                l.guests, l.bedrooms, l.beds, l.baths, l.pets_allowed, l.is_guest_favorite,
+                CASE
+                    WHEN l.bedrooms IS NULL OR l.bedrooms = 0 THEN 'Studio'
+                    WHEN l.bedrooms = 1 THEN 'Small'
+                    WHEN l.bedrooms IN (2, 3) THEN 'Medium'
+                    ELSE 'Large'
+                END,
+                CASE WHEN l.guests <> 0 AND l.bedrooms > 0 THEN l.guests::float8 / l.bedrooms END,
+                CASE WHEN l.baths <> 0 AND l.bedrooms > 0 THEN l.baths::float8 / l.bedrooms END
+            FROM {self.PUSHDOWN_SOURCE_SCHEMA}.listings l
+            ON CONFLICT (property_id) DO UPDATE SET
+                listing_name = EXCLUDED.listing_name,
+                updated_at = CURRENT_TIMESTAMP
+        """)
+        loaded = self.target_cursor.rowcount
+        
+        self.target_conn.commit()
+        logger.info(f"Loaded {loaded} properties into dim_property")
+    
+    def load_dim_category_ratings_pushdown(self):
+        """
+        Load dim_category_ratings server-side with INSERT ... SELECT.
+        
+        Equivalent to load_dim_category_ratings: the weighted average skips
+        missing (or zero) categories and renormalizes the weights, in float8
+        like the Python path, and quality_tier mirrors classify_quality_tier.
+        Rows are upserted on property_id.
+        """
+        logger.info("Loading dim_category_ratings (pushdown)...")
+        
+        self.ensure_rating_natural_key()
+        
+        weights = [
+            ('cleanliness', 0.25), ('accuracy', 0.15), ('checkin', 0.10),
+            ('communication', 0.15), ('location', 0.15), ('value', 0.20)
+        ]
+        weighted_sum = ' + '.join(
+            f"CASE WHEN {name} <> 0 THEN {name}::float8 * {weight} ELSE 0 END" for name, weight in weights
+        )
+        total_weight = ' + '.join(
+            f"CASE WHEN {name} <> 0 THEN {weight}::float8 ELSE 0 END" for name, weight in weights
+        )
+        
+        self.target_cursor.execute(f"""
+            CREATE TEMP TABLE tmp_listing_ratings ON COMMIT DROP AS
+            WITH pivot AS (
+                SELECT
+                    cr.listing_id,
+                    l.property_id,
+                    MAX(CASE WHEN category_name ILIKE '%%clean%%' THEN rating_value END) as cleanliness,
+                    MAX(CASE WHEN category_name ILIKE '%%accura%%' THEN rating_value END) as accuracy,
+                    MAX(CASE WHEN category_name ILIKE '%%check%%' THEN rating_value END) as checkin,
+                    MAX(CASE WHEN category_name ILIKE '%%commun%%' THEN rating_value END) as communication,
+                    MAX(CASE WHEN category_name ILIKE '%%locat%%' THEN rating_value END) as location,
+                    MAX(CASE WHEN category_name ILIKE '%%value%%' THEN rating_value END) as value
+                FROM {self.PUSHDOWN_SOURCE_SCHEMA}.listing_category_ratings cr
+                JOIN {self.PUSHDOWN_SOURCE_SCHEMA}.listings l ON cr.listing_id = l.listing_id
+                WHERE l.property_id IS NOT NULL
+                GROUP BY cr.listing_id, l.property_id
+            ),
+            scored AS (
+                SELECT p.*,
+                    CASE WHEN ({total_weight}) > 0
+                        THEN ({weighted_sum}) / ({total_weight})
+                    END AS overall
+                FROM pivot p
+            )
+            SELECT
+                listing_id, property_id,
+                cleanliness, accuracy, checkin, communication, location, value, overall,
+                CASE
+                    WHEN overall IS NULL THEN 'Fair'
+                    WHEN overall > 4.8 THEN 'Exceptional'
+                    WHEN overall > 4.5 THEN 'Excellent'
+                    WHEN overall > 4.0 THEN 'Good'
+                    ELSE 'Fair'
+                END AS quality_tier,
+                CASE WHEN overall <> 0 AND value <> 0 THEN value::float8 / overall END AS value_index
+            FROM scored
+        """)
+        
+        self.target_cursor.execute("""
+            INSERT INTO dim_category_ratings (
+                property_id, cleanliness_rating, accuracy_rating, checkin_rating,
+                communication_rating, location_rating, value_rating,
+                overall_quality_score, quality_tier, value_index
+            )
+            SELECT
+                property_id, cleanliness, accuracy, checkin,
+                communication, location, value,
+                overall, quality_tier, value_index
+            FROM tmp_listing_ratings
+            ON CONFLICT (property_id) DO UPDATE SET
+                cleanliness_rating = EXCLUDED.cleanliness_rating,
+                accuracy_rating = EXCLUDED.accuracy_rating,
+                checkin_rating = EXCLUDED.checkin_rating,
+                communication_rating = EXCLUDED.communication_rating,
+                location_rating = EXCLUDED.location_rating,
+                value_rating = EXCLUDED.value_rating,
+                overall_quality_score = EXCLUDED.overall_quality_score,
+                quality_tier = EXCLUDED.quality_tier,
+                value_index = EXCLUDED.value_index,
+                updated_at = CURRENT_TIMESTAMP
+        """)
+        loaded = self.target_cursor.rowcount
         
         self.target_conn.commit()
-        logger.info(f"Loaded {len(values)} listings into fact_listing_metrics (skipped {skipped})")
+        logger.info(f"Loaded {loaded} rating sets into dim_category_ratings")
+    
+    def load_fact_listing_metrics_pushdown(self):
+        """
+        Load fact_listing_metrics server-side with INSERT ... SELECT.
+        
+        Equivalent to load_fact_listing_metrics: dimension keys come from joins
+        instead of Python caches (listings without a host, property or location
+        key are skipped by the inner joins) and every derived measure uses the
+        same guards and float arithmetic. Like rating_key_cache, only listings
+        with category ratings in the source get a rating_key.
+        """
+        logger.info("Loading fact_listing_metrics (pushdown)...")
+        
+        today = datetime.now()
+        
+        self.target_cursor.execute(f"""
+            INSERT INTO fact_listing_metrics (
+                property_id, host_key, property_key, location_key, rating_key,
+                date_key, price_per_night, currency, listing_rating, number_of_reviews,
+                is_available, price_per_guest, price_per_bedroom, price_per_bed,
+                review_velocity, competitiveness_score, value_score, popularity_index,
+                data_scraped_at, snapshot_date
+            )
+            SELECT
+                l.property_id, h.host_key, p.property_key, loc.location_key, r.rating_key,
+                %(date_key)s, l.price_per_night, COALESCE(NULLIF(l.currency, ''), 'CAD'),
+                l.rating, l.number_of_reviews, l.availability,
+                CASE WHEN l.price_per_night <> 0 AND l.guests > 0
+                    THEN l.price_per_night::float8 / l.guests END,
+                CASE WHEN l.price_per_night <> 0 AND l.bedrooms > 0
+                    THEN l.price_per_night::float8 / l.bedrooms END,
+                CASE WHEN l.price_per_night <> 0 AND l.beds > 0
+                    THEN l.price_per_night::float8 / l.beds END,
+                CASE
+                    WHEN l.timestamp IS NULL THEN NULL
+                    WHEN age.days_since > 0 THEN l.number_of_reviews::float8 / age.days_since
+                    ELSE 0
+                END,
+                CASE WHEN l.rating <> 0 THEN (l.rating::float8 / 5.0) * 30 ELSE 0 END
+                    + CASE WHEN l.number_of_reviews <> 0
+                        THEN LEAST(l.number_of_reviews::float8 / 100, 1.0) * 25 ELSE 0 END
+                    + CASE WHEN l.is_guest_favorite THEN 10 ELSE 0 END,
+                CASE WHEN l.rating <> 0 AND l.price_per_night > 0
+                    THEN LEAST((l.rating::float8 / 5.0) / (l.price_per_night::float8 / 200) * 100, 100)
+                END,
+                CASE WHEN l.rating <> 0 AND l.number_of_reviews <> 0
+                    THEN (l.number_of_reviews * l.rating::float8) / 10
+                END,
+                l.timestamp, %(snapshot_date)s
+            FROM {self.PUSHDOWN_SOURCE_SCHEMA}.listings l
+            JOIN dim_host h ON h.host_id = l.host_id
+            JOIN dim_property p ON p.property_id = l.property_id
+            JOIN dim_location loc ON loc.latitude = l.latitude AND loc.longitude = l.longitude
+            LEFT JOIN dim_category_ratings r ON r.property_id = l.property_id
+                AND EXISTS (
+                    SELECT 1 FROM {self.PUSHDOWN_SOURCE_SCHEMA}.listing_category_ratings cr
+                    WHERE cr.listing_id = l.listing_id
+                )
+            CROSS JOIN LATERAL (
+                -- Whole days elapsed, like timedelta.days
+                SELECT FLOOR(EXTRACT(EPOCH FROM (%(now)s::timestamp - l.timestamp)) / 86400) AS days_since
+            ) age
+            WHERE l.property_id IS NOT NULL
+              AND l.latitude <> 0 AND l.longitude <> 0
+        """, {
+            'date_key': int(today.strftime('%Y%m%d')),
+            'snapshot_date': today.date(),
+            'now': today
+        })
+        loaded = self.target_cursor.rowcount
+        
+        self.target_conn.commit()
+        logger.info(f"Loaded {loaded} listings into fact_listing_metrics")
     
     def load_fact_listing_amenities_summary(self):
         """
@@ -777,33 +1408,43 @@ class DimensionalETL:
         """)
         listing_key_map = {prop_id: listing_key for listing_key, prop_id in self.target_cursor.fetchall()}
         
-        # Get property_id to listing_id mapping from source
+        # Get listing_id to property_id mapping from source (inverted so each
+        # listing resolves in O(1); one listing per property_id, last wins)
         self.source_cursor.execute("""
             SELECT listing_id, property_id FROM listings
         """)
         prop_to_listing = {prop_id: listing_id for listing_id, prop_id in self.source_cursor.fetchall()}
+        listing_to_prop = {listing_id: prop_id for prop_id, listing_id in prop_to_listing.items()}
         
-        # Extract amenities per listing
+        # Classify each distinct amenity once: amenity_id -> (essential, luxury, safety)
         self.source_cursor.execute("""
-            SELECT 
-                la.listing_id,
-                a.amenity_name,
-                ag.group_name
-            FROM listing_amenities la
-            JOIN amenities a ON la.amenity_id = a.amenity_id
-            LEFT JOIN amenity_groups ag ON a.group_id = ag.group_id
+            SELECT amenity_id, amenity_name FROM amenities
         """)
+        amenity_classes = {
+            amenity_id: self.classify_amenity(amenity_name)
+            for amenity_id, amenity_name in self.source_cursor.fetchall()
+        }
+        logger.info(f"Classified {len(amenity_classes)} distinct amenities")
+        
+        # Count amenities per listing with integer lookups, streaming the
+        # link table in chunks: listing_id -> [total, essential, luxury, safety]
+        listing_counts = {}
+        for chunk in self.stream_query(self.source_conn, """
+            SELECT listing_id, amenity_id FROM listing_amenities
+        """):
+            for listing_id, amenity_id in chunk:
+                classes = amenity_classes.get(amenity_id)
+                if classes is None:
+                    continue
+                counts = listing_counts.get(listing_id)
+                if counts is None:
+                    counts = listing_counts[listing_id] = [0, 0, 0, 0]
+                counts[0] += 1
+                counts[1] += classes[0]
+                counts[2] += classes[1]
+                counts[3] += classes[2]
         
-        amenities_raw = self.source_cursor.fetchall()
-        
-        # Group by listing
-        listing_amenities = {}
-        for listing_id, amenity_name, group_name in amenities_raw:
-            if listing_id not in listing_amenities:
-                listing_amenities[listing_id] = []
-            listing_amenities[listing_id].append(amenity_name)
-        
-        logger.info(f"Extracted amenities for {len(listing_amenities)} listings")
+        logger.info(f"Extracted amenities for {len(listing_counts)} listings")
         
         # Transform and load
         insert_query = """
@@ -819,9 +1460,9 @@ class DimensionalETL:
         """
         
         values = []
-        for listing_id, amenity_list in listing_amenities.items():
+        for listing_id, (total_count, essential_count, luxury_count, safety_count) in listing_counts.items():
             # Find corresponding property_id and listing_key
-            prop_id = next((k for k, v in prop_to_listing.items() if v == listing_id), None)
+            prop_id = listing_to_prop.get(listing_id)
             if not prop_id:
                 continue
             
@@ -829,21 +1470,20 @@ class DimensionalETL:
             if not listing_key:
                 continue
             
-            # Classify amenities
-            essential_count = sum(1 for a in amenity_list if any(e in a for e in self.ESSENTIAL_AMENITIES))
-            luxury_count = sum(1 for a in amenity_list if any(l in a for l in self.LUXURY_AMENITIES))
-            safety_count = sum(1 for a in amenity_list if any(s in a for s in self.SAFETY_AMENITIES))
-            
             # Calculate amenity score
             amenity_score = essential_count * 2 + luxury_count * 3 + safety_count * 1
             
-            amenity_tier = self.classify_amenity_tier(amenity_score)
-            
             values.append((
-                listing_key, len(amenity_list), essential_count,
-                luxury_count, safety_count, amenity_score, amenity_tier
+                listing_key, total_count, essential_count,
+                luxury_count, safety_count, amenity_score
             ))
         
+        # Classify amenity tiers for the whole batch
+        amenity_tiers = dimension_transforms.classify_amenity_tiers(
+            np.array([row[5] for row in values], dtype=np.int64)
+        ).tolist()
+        values = [row + (tier,) for row, tier in zip(values, amenity_tiers)]
+        
         execute_values(self.target_cursor, insert_query, values)
         
         self.target_conn.commit()
@@ -853,22 +1493,31 @@ class DimensionalETL:
     # COMPETITOR ANALYSIS
     # ========================================================================
     
-    def calculate_competitor_similarity(self):
+    def extract_similarity_features(self, latest_only: bool = False) -> List[Tuple]:
         """
-        Calculate similarity scores and identify top 25 competitors for each listing.
+        Extract the per-listing attributes used for competitor similarity.
         
-        Uses multi-dimensional similarity:
-        - Location (35%): geographic distance and cluster
-        - Property (25%): bedrooms, beds, baths, capacity
-        - Quality (20%): ratings alignment
-        - Amenity (10%): shared amenities
-        - Price (10%): price range overlap
-        """
-        logger.info("Calculating competitor similarities...")
+        Parameters
+        ----------
+        latest_only : bool, default=False
+            Only keep the most recent fact row per property_id, ordered by
+            property_id so positions stay stable between incremental runs
         
-        # Get all listings with their attributes for comparison
-        self.target_cursor.execute("""
-            SELECT 
+        Returns
+        -------
+        list of tuple
+            Rows of (listing_key, property_id, price_per_night, listing_rating,
+            bedrooms, beds, baths, guests_capacity, latitude, longitude,
+            location_cluster_id, overall_quality_score, amenity_score)
+        """
+        distinct_clause = "DISTINCT ON (f.property_id)" if latest_only else ""
+        order_clause = (
+            "ORDER BY f.property_id, f.snapshot_date DESC, f.listing_key DESC"
+            if latest_only else ""
+        )
+        
+        features = self.stream_query(self.target_conn, f"""
+            SELECT {distinct_clause}
                 f.listing_key,
                 f.property_id,
                 f.price_per_night,
@@ -887,11 +1536,431 @@ class DimensionalETL:
             JOIN dim_location l ON f.location_key = l.location_key
             LEFT JOIN dim_category_ratings r ON f.rating_key = r.rating_key
             LEFT JOIN fact_listing_amenities_summary a ON f.listing_key = a.listing_key
+            {order_clause}
         """)
         
-        listings = self.target_cursor.fetchall()
-        logger.info(f"Calculating similarities for {len(listings)} listings")
+        return [row for chunk in features for row in chunk]
+    
+    def extract_amenity_bitsets(self, listings: List[Tuple]) -> Tuple[np.ndarray, List[str]]:
+        """
+        Build packed amenity bitsets aligned with the similarity feature rows.
+        
+        Each fact row gets the amenity set of the latest source listing
+        (highest listing_id) with the same property_id.
+        
+        Parameters
+        ----------
+        listings : list of tuple
+            Rows from extract_similarity_features
+        
+        Returns
+        -------
+        bits : np.ndarray
+            uint64 bitsets, shape (len(listings), n_words)
+            (see similarity_engine.build_amenity_bitsets)
+        set_hashes : list of str
+            Per-row hash of the sorted amenity_ids, used to detect amenity
+            changes in incremental runs
+        """
+        amenity_sets = {}
+        for chunk in self.stream_query(self.source_conn, """
+            SELECT l.property_id, la.amenity_id
+            FROM listing_amenities la
+            JOIN (
+                SELECT DISTINCT ON (property_id) listing_id, property_id
+                FROM listings
+                WHERE property_id IS NOT NULL
+                ORDER BY property_id, listing_id DESC
+            ) l ON la.listing_id = l.listing_id
+        """):
+            for prop_id, amenity_id in chunk:
+                amenity_sets.setdefault(prop_id, set()).add(amenity_id)
+        
+        pairs = [
+            (i, amenity_id)
+            for i, row in enumerate(listings)
+            for amenity_id in amenity_sets.get(row[1], ())
+        ]
+        bits = similarity_engine.build_amenity_bitsets(len(listings), pairs)
+        
+        set_hashes = [
+            hashlib.sha1(
+                ','.join(map(str, sorted(amenity_sets.get(row[1], ())))).encode()
+            ).hexdigest()
+            for row in listings
+        ]
+        
+        logger.info(f"Built amenity bitsets: {bits.shape[1] * 64} bits x {len(listings)} listings")
+        return bits, set_hashes
+    
+    def ensure_similarity_feature_state(self):
+        """
+        Create similarity_feature_state if the target database predates it.
+        
+        Databases built before incremental similarity updates have no state
+        table, and those built before amenity overlap scoring lack its
+        amenity_set_hash column; both are added here (see the schema file).
+        """
+        self.target_cursor.execute("""
+            CREATE TABLE IF NOT EXISTS similarity_feature_state (
+                property_id TEXT PRIMARY KEY,
+                listing_key INTEGER,
+                price_per_night DECIMAL(10, 2),
+                listing_rating DECIMAL(3, 2),
+                bedrooms INTEGER,
+                beds INTEGER,
+                baths INTEGER,
+                guests_capacity INTEGER,
+                latitude DECIMAL(10, 7),
+                longitude DECIMAL(10, 7),
+                location_cluster_id INTEGER,
+                amenity_score INTEGER,
+                amenity_set_hash TEXT,
+                computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        self.target_cursor.execute("""
+            ALTER TABLE similarity_feature_state ADD COLUMN IF NOT EXISTS amenity_set_hash TEXT
+        """)
+    
+    def calculate_competitor_similarity(self, method: str = 'vectorized', workers: int = 1):
+        """
+        Calculate similarity scores and identify top 25 competitors for each listing.
+        
+        Uses multi-dimensional similarity:
+        - Location (35%): geographic distance and cluster
+        - Property (25%): bedrooms, beds, baths, capacity
+        - Quality (20%): ratings alignment
+        - Amenity (10%): shared amenities (amenity_score gap, or Jaccard
+          overlap of the amenity sets with AMENITY_OVERLAP)
+        - Price (10%): price range overlap
+        
+        Parameters
+        ----------
+        method : str, default='vectorized'
+            'vectorized' scores blocks of listings with NumPy (see
+            similarity_engine); 'spatial' only scores each listing's nearest
+            CANDIDATE_NEIGHBORS listings plus its location cluster;
+            'loop' uses the original pairwise loop. 'vectorized' and 'loop'
+            produce identical ranks, weights and component scores.
+        workers : int, default=1
+            Number of worker processes for 'vectorized'/'spatial'. With more
+            than one, source listings are sharded across a process pool and
+            each shard's rows are loaded as soon as it finishes.
+        """
+        logger.info("Calculating competitor similarities...")
+        
+        # Get all listings with their attributes for comparison
+        listings = self.extract_similarity_features()
+        logger.info(f"Calculating similarities for {len(listings)} listings ({method})")
+        
+        if method not in ('vectorized', 'spatial', 'loop'):
+            raise ValueError(f"Invalid similarity method: {method}. Must be 'vectorized', 'spatial' or 'loop'")
+        if method == 'loop' and workers > 1:
+            raise ValueError("The 'loop' similarity method does not support multiple workers")
+        if method == 'loop' and self.AMENITY_OVERLAP:
+            raise ValueError("The 'loop' similarity method does not support AMENITY_OVERLAP")
+        
+        # Full recomputation invalidates incremental state (next incremental run rebuilds it)
+        self.ensure_similarity_feature_state()
+        self.target_cursor.execute("DELETE FROM similarity_feature_state")
+        
+        # Replace every competitor list; upserting over old rows would leave
+        # competitors that dropped out of a top 25 holding a duplicate rank.
+        # Committed together with the new rows by load_bridge_values
+        self.target_cursor.execute("DELETE FROM bridge_listing_competitors")
+        
+        if method == 'loop':
+            similarities = self._score_competitors_loop(listings)
+            logger.info(f"Calculated {len(similarities)} competitor relationships")
+            self.load_bridge_listing_competitors(similarities)
+            return
+        
+        amenity_bits = self.extract_amenity_bitsets(listings)[0] if self.AMENITY_OVERLAP else None
+        features = similarity_engine.build_feature_arrays(listings, amenity_bits=amenity_bits)
+        candidate_index = self.build_candidate_index(features) if method == 'spatial' else None
+        
+        # Stream rows into the bridge table block by block (or shard by shard)
+        if workers > 1:
+            logger.info(f"Sharding similarity across {workers} worker processes")
+            batches = similarity_engine.iter_parallel_bridge_values(
+                features,
+                top_k=self.COMPETITOR_TOP_K,
+                block_size=self.SIMILARITY_BLOCK_SIZE,
+                workers=workers,
+                shard_size=self.SIMILARITY_SHARD_SIZE,
+                n_neighbors=candidate_index.n_neighbors if candidate_index else None
+            )
+        else:
+            blocks = similarity_engine.iter_competitor_blocks(
+                features,
+                top_k=self.COMPETITOR_TOP_K,
+                block_size=self.SIMILARITY_BLOCK_SIZE,
+                candidate_index=candidate_index
+            )
+            batches = (similarity_engine.block_to_bridge_values(features, block) for block in blocks)
+        
+        self.load_bridge_values(batches)
+    
+    def update_competitor_similarity(self, method: str = 'vectorized') -> List[int]:
+        """
+        Incrementally refresh competitor lists for listings affected by changes.
+        
+        Compares the latest fact row per property_id with the similarity inputs
+        stored in similarity_feature_state (price, rating, bedrooms, beds, baths,
+        guests, coordinates, cluster, amenity_score and, with AMENITY_OVERLAP,
+        the amenity set hash) and classifies listings as
+        new, removed, changed, or re-keyed (new snapshot row, same inputs).
+        
+        Only these listings are rescored:
+        - New and changed listings
+        - Listings whose current top 25 contains a changed or removed listing
+        - Listings where a new or changed listing scores at least their current
+          25th competitor (found by scoring all listings against the delta only)
+        
+        Bridge rows of re-keyed listings are remapped in SQL without rescoring.
+        Without any stored state, every listing is recomputed.
+        
+        Parameters
+        ----------
+        method : str, default='vectorized'
+            'vectorized' (exhaustive) or 'spatial' candidate scoring
+        
+        Returns
+        -------
+        list of int
+            listing_keys whose competitor lists were rewritten or re-keyed
+            (their pricing analysis needs refreshing)
+        """
+        if method not in ('vectorized', 'spatial'):
+            raise ValueError(f"Invalid incremental similarity method: {method}. Must be 'vectorized' or 'spatial'")
+        
+        logger.info("Updating competitor similarities incrementally...")
         
+        listings = self.extract_similarity_features(latest_only=True)
+        if self.AMENITY_OVERLAP:
+            amenity_bits, set_hashes = self.extract_amenity_bitsets(listings)
+        else:
+            amenity_bits, set_hashes = None, [None] * len(listings)
+        features = similarity_engine.build_feature_arrays(listings, amenity_bits=amenity_bits)
+        listing_keys = features['listing_key']
+        key_positions = {int(key): i for i, key in enumerate(listing_keys)}
+        n = len(listings)
+        
+        self.ensure_similarity_feature_state()
+        self.target_cursor.execute("""
+            SELECT 
+                property_id, listing_key,
+                price_per_night, listing_rating, bedrooms, beds, baths,
+                guests_capacity, latitude, longitude, location_cluster_id, amenity_score,
+                amenity_set_hash
+            FROM similarity_feature_state
+        """)
+        previous = {row[0]: (row[1], tuple(row[2:])) for row in self.target_cursor.fetchall()}
+        
+        # Classify listings against the stored state
+        new_idx, changed_idx, rekeyed = [], [], []
+        stale_keys = []  # listing_keys whose bridge rows are no longer valid
+        current_props = set()
+        
+        for i, row in enumerate(listings):
+            listing_key, prop_id = row[0], row[1]
+            inputs = tuple(row[2:11]) + (row[12], set_hashes[i])
+            current_props.add(prop_id)
+            
+            if prop_id not in previous:
+                new_idx.append(i)
+                continue
+            
+            old_key, old_inputs = previous[prop_id]
+            if old_inputs != inputs:
+                changed_idx.append(i)
+                stale_keys.append(old_key)
+            elif old_key != listing_key:
+                rekeyed.append((old_key, listing_key))
+        
+        removed = [(prop_id, old_key) for prop_id, (old_key, _) in previous.items()
+                   if prop_id not in current_props]
+        stale_keys.extend(old_key for _, old_key in removed)
+        
+        logger.info(
+            f"Similarity delta: {len(new_idx)} new, {len(changed_idx)} changed, "
+            f"{len(removed)} removed, {len(rekeyed)} re-keyed, "
+            f"{n - len(new_idx) - len(changed_idx) - len(rekeyed)} unchanged"
+        )
+        
+        if not previous:
+            # No state yet: rebuild every list
+            self.target_cursor.execute("DELETE FROM bridge_listing_competitors")
+            affected = np.ones(n, dtype=bool)
+        else:
+            # Remap bridge rows of re-keyed listings (same inputs, new fact row)
+            if rekeyed:
+                self.target_cursor.execute("""
+                    CREATE TEMP TABLE tmp_listing_rekey (
+                        old_key INTEGER PRIMARY KEY,
+                        new_key INTEGER NOT NULL
+                    ) ON COMMIT DROP
+                """)
+                execute_values(
+                    self.target_cursor,
+                    "INSERT INTO tmp_listing_rekey (old_key, new_key) VALUES %s",
+                    rekeyed
+                )
+                self.target_cursor.execute("""
+                    UPDATE bridge_listing_competitors b SET listing_key = m.new_key
+                    FROM tmp_listing_rekey m WHERE b.listing_key = m.old_key
+                """)
+                self.target_cursor.execute("""
+                    UPDATE bridge_listing_competitors b SET competitor_listing_key = m.new_key
+                    FROM tmp_listing_rekey m WHERE b.competitor_listing_key = m.old_key
+                """)
+            
+            affected = np.zeros(n, dtype=bool)
+            affected[new_idx + changed_idx] = True
+            
+            # Listings that currently rank a changed/removed listing
+            self.target_cursor.execute("""
+                SELECT DISTINCT listing_key FROM bridge_listing_competitors
+                WHERE competitor_listing_key = ANY(%s)
+            """, (stale_keys,))
+            for (listing_key,) in self.target_cursor.fetchall():
+                if listing_key in key_positions:
+                    affected[key_positions[listing_key]] = True
+            
+            # Listings a new/changed listing could now enter (stored scores are
+            # rounded to 2 decimals, so compare against a slightly lower bar)
+            k = min(self.COMPETITOR_TOP_K, n - 1)
+            thresholds = np.full(n, -np.inf)
+            self.target_cursor.execute("""
+                SELECT listing_key, COUNT(*), MIN(overall_similarity_score)
+                FROM bridge_listing_competitors
+                WHERE listing_key = ANY(%s)
+                GROUP BY listing_key
+            """, (listing_keys.tolist(),))
+            for listing_key, count, min_score in self.target_cursor.fetchall():
+                if count >= k:
+                    thresholds[key_positions[listing_key]] = float(min_score) - 0.01
+            
+            affected |= similarity_engine.find_affected_sources(
+                features, np.array(new_idx + changed_idx, dtype=np.int64),
+                thresholds, block_size=self.SIMILARITY_BLOCK_SIZE
+            )
+        
+        src_idx = np.flatnonzero(affected)
+        affected_keys = listing_keys[src_idx].tolist()
+        logger.info(f"Rescoring {len(src_idx)}/{n} listings")
+        
+        candidate_index = self.build_candidate_index(features) if method == 'spatial' else None
+        blocks = similarity_engine.iter_competitor_blocks(
+            features,
+            top_k=self.COMPETITOR_TOP_K,
+            block_size=self.SIMILARITY_BLOCK_SIZE,
+            candidate_index=candidate_index,
+            src_idx=src_idx
+        )
+        similarities = similarity_engine.blocks_to_records(features, blocks)
+        
+        # Replace affected lists and drop rows of changed/removed fact rows
+        self.target_cursor.execute("""
+            DELETE FROM bridge_listing_competitors WHERE listing_key = ANY(%s)
+        """, (affected_keys + stale_keys,))
+        
+        # Record the inputs the bridge rows now reflect
+        state_keys = {int(listing_keys[i]) for i in new_idx + changed_idx}
+        state_keys.update(new_key for _, new_key in rekeyed)
+        state_values = [
+            (row[1], row[0]) + tuple(row[2:11]) + (row[12], set_hash)
+            for row, set_hash in zip(listings, set_hashes) if row[0] in state_keys
+        ]
+        if state_values:
+            execute_values(self.target_cursor, """
+                INSERT INTO similarity_feature_state (
+                    property_id, listing_key,
+                    price_per_night, listing_rating, bedrooms, beds, baths,
+                    guests_capacity, latitude, longitude, location_cluster_id, amenity_score,
+                    amenity_set_hash
+                ) VALUES %s
+                ON CONFLICT (property_id) DO UPDATE SET
+                    listing_key = EXCLUDED.listing_key,
+                    price_per_night = EXCLUDED.price_per_night,
+                    listing_rating = EXCLUDED.listing_rating,
+                    bedrooms = EXCLUDED.bedrooms,
+                    beds = EXCLUDED.beds,
+                    baths = EXCLUDED.baths,
+                    guests_capacity = EXCLUDED.guests_capacity,
+                    latitude = EXCLUDED.latitude,
+                    longitude = EXCLUDED.longitude,
+                    location_cluster_id = EXCLUDED.location_cluster_id,
+                    amenity_score = EXCLUDED.amenity_score,
+                    amenity_set_hash = EXCLUDED.amenity_set_hash,
+                    computed_at = CURRENT_TIMESTAMP
+            """, state_values)
+        if removed:
+            self.target_cursor.execute(
+                "DELETE FROM similarity_feature_state WHERE property_id = ANY(%s)",
+                ([prop_id for prop_id, _ in removed],)
+            )
+        
+        # Commits the whole refresh atomically
+        self.load_bridge_listing_competitors(similarities)
+        
+        return sorted(set(affected_keys) | {new_key for _, new_key in rekeyed})
+    
+    def build_candidate_index(self, features: Dict[str, np.ndarray]) -> Optional[similarity_engine.CandidateIndex]:
+        """
+        Build the spatial candidate index and verify it against exhaustive mode.
+        
+        A random sample of CANDIDATE_RECALL_SAMPLE listings is scored both ways.
+        If the share of reproduced (competitor, rank) pairs falls below
+        CANDIDATE_MIN_RECALL, pruning is disabled for this run.
+        
+        Parameters
+        ----------
+        features : dict of str to np.ndarray
+            Output of similarity_engine.build_feature_arrays
+        
+        Returns
+        -------
+        similarity_engine.CandidateIndex or None
+            Candidate index, or None to fall back to exhaustive scoring
+        """
+        # Each source needs at least top_k candidates besides itself
+        n_neighbors = max(self.CANDIDATE_NEIGHBORS, self.COMPETITOR_TOP_K + 1)
+        candidate_index = similarity_engine.CandidateIndex(features, n_neighbors=n_neighbors)
+        
+        recall = similarity_engine.check_candidate_recall(
+            features, candidate_index,
+            top_k=self.COMPETITOR_TOP_K,
+            sample_size=self.CANDIDATE_RECALL_SAMPLE
+        )
+        logger.info(f"Candidate recall vs exhaustive top-{self.COMPETITOR_TOP_K}: {recall:.2%}")
+        
+        if recall < self.CANDIDATE_MIN_RECALL:
+            logger.warning(
+                f"Candidate recall {recall:.2%} below {self.CANDIDATE_MIN_RECALL:.2%}, "
+                "falling back to exhaustive scoring"
+            )
+            return None
+        
+        return candidate_index
+    
+    def _score_competitors_loop(self, listings: List[Tuple]) -> List[Dict]:
+        """
+        Score every listing pair with the original pure-Python loop.
+        
+        Kept as the reference implementation for the vectorized engine.
+        
+        Parameters
+        ----------
+        listings : list of tuple
+            Rows from extract_similarity_features
+        
+        Returns
+        -------
+        list of dict
+            Top competitors per listing with rank, weight and component scores
+        """
         # Build similarity matrix
         similarities = []
         
@@ -994,10 +2063,7 @@ class DimensionalETL:
             if (i + 1) % 10 == 0:
                 logger.info(f"Processed {i + 1}/{len(listings)} listings")
         
-        logger.info(f"Calculated {len(similarities)} competitor relationships")
-        
-        # Load into bridge table
-        self.load_bridge_listing_competitors(similarities)
+        return similarities
     
     def load_bridge_listing_competitors(self, similarities: List[Dict]):
         """
@@ -1008,6 +2074,40 @@ class DimensionalETL:
         similarities : list of dict
             List of competitor relationships with similarity scores
         """
+        values = [
+            (
+                s['listing_key'], s['competitor_key'], s['rank'],
+                round(s['overall_similarity'], 2),
+                round(s['location_similarity'], 2),
+                round(s['property_similarity'], 2),
+                round(s['quality_similarity'], 2),
+                round(s['amenity_similarity'], 2),
+                round(s['price_similarity'], 2),
+                round(s['weight'], 4)
+            )
+            for s in similarities
+        ]
+        
+        self.load_bridge_values([values])
+    
+    def load_bridge_values(self, batches: Iterable[List[Tuple]]) -> int:
+        """
+        Stream batches of competitor rows into the bridge table.
+        
+        Each batch is sent with one execute_values call as soon as it arrives,
+        so rows never accumulate in memory; everything commits at the end.
+        
+        Parameters
+        ----------
+        batches : iterable of list of tuple
+            Rows of (listing_key, competitor_listing_key, similarity_rank,
+            overall, location, property, quality, amenity, price, weight)
+        
+        Returns
+        -------
+        int
+            Number of rows loaded
+        """
         logger.info("Loading bridge_listing_competitors...")
         
         insert_query = """
@@ -1019,44 +2119,92 @@ class DimensionalETL:
             ON CONFLICT (listing_key, competitor_listing_key) DO UPDATE SET
                 similarity_rank = EXCLUDED.similarity_rank,
                 overall_similarity_score = EXCLUDED.overall_similarity_score,
+                location_similarity = EXCLUDED.location_similarity,
+                property_similarity = EXCLUDED.property_similarity,
+                quality_similarity = EXCLUDED.quality_similarity,
+                amenity_similarity = EXCLUDED.amenity_similarity,
+                price_similarity = EXCLUDED.price_similarity,
+                weight = EXCLUDED.weight,
+                is_active = TRUE,
                 last_updated = CURRENT_TIMESTAMP
         """
         
-        values = [
-            (
-                s['listing_key'], s['competitor_key'], s['rank'],
-                round(s['overall_similarity'], 2),
-                round(s['location_similarity'], 2),
-                round(s['property_similarity'], 2),
-                round(s['quality_similarity'], 2),
-                round(s['amenity_similarity'], 2),
-                round(s['price_similarity'], 2),
-                round(s['weight'], 4)
-            )
-            for s in similarities
-        ]
+        total = 0
+        for values in batches:
+            execute_values(self.target_cursor, insert_query, values)
+            total += len(values)
+            logger.info(f"Loaded {total} competitor relationships so far")
         
-        execute_values(self.target_cursor, insert_query, values)
         self.target_conn.commit()
-        logger.info(f"Loaded {len(values)} competitor relationships")
+        logger.info(f"Loaded {total} competitor relationships")
+        return total
     
-    def load_fact_competitor_pricing_analysis(self):
+    def compute_pricing_stats(self, listing_keys: Optional[List[int]] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
         """
-        Load competitor pricing analysis fact table.
+        Compute competitor pricing statistics in NumPy from the bridge rows.
         
-        Aggregates competitor prices and calculates:
-        - Statistical measures (avg, median, percentiles)
-        - Weighted average price
-        - Price recommendations (optimal, lower, upper bounds)
+        Fetches each listing's active competitor prices and weights as plain
+        rows (no aggregation in the database) and computes every statistic
+        for all listings at once (see pricing_engine).
+        
+        Parameters
+        ----------
+        listing_keys : list of int, optional
+            Only these source listings (all listings if not provided)
+        
+        Returns
+        -------
+        keys : np.ndarray
+            Source listing_keys in ascending order
+        stats : dict of str to np.ndarray
+            Output of pricing_engine.competitor_price_stats
         """
-        logger.info("Loading fact_competitor_pricing_analysis...")
+        listing_filter = "AND b.listing_key = ANY(%(listing_keys)s)" if listing_keys is not None else ""
         
-        # Get today's date_key
-        today = datetime.now()
-        date_key = int(today.strftime('%Y%m%d'))
+        rows = [
+            row
+            for chunk in self.stream_query(self.target_conn, f"""
+                SELECT 
+                    b.listing_key,
+                    (f.price_per_night * {pricing_engine.CENTS})::bigint,
+                    (b.weight * {pricing_engine.WEIGHT_SCALE})::integer
+                FROM bridge_listing_competitors b
+                JOIN fact_listing_metrics f ON b.competitor_listing_key = f.listing_key
+                WHERE b.is_active = TRUE
+                {listing_filter}
+            """, {'listing_keys': listing_keys})
+            for row in chunk
+        ]
+        columns = list(zip(*rows)) if rows else [(), (), ()]
+        keys, prices, weights, counts = pricing_engine.build_price_matrix(
+            np.array(columns[0], dtype=np.int64),
+            dimension_transforms.float_column(columns[1]),
+            dimension_transforms.float_column(columns[2])
+        )
+        return keys, pricing_engine.competitor_price_stats(prices, weights, counts)
+    
+    def compute_pricing_stats_sql(self, listing_keys: Optional[List[int]] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Compute competitor pricing statistics with SQL aggregates.
         
-        # Calculate pricing statistics per listing
-        self.target_cursor.execute("""
+        Reference implementation for compute_pricing_stats, with the same
+        return format (``tests/test_pricing_engine.py`` checks both agree).
+        
+        Parameters
+        ----------
+        listing_keys : list of int, optional
+            Only these source listings (all listings if not provided)
+        
+        Returns
+        -------
+        keys : np.ndarray
+            Source listing_keys in ascending order
+        stats : dict of str to np.ndarray
+            Same keys as pricing_engine.competitor_price_stats
+        """
+        listing_filter = "AND b.listing_key = ANY(%(listing_keys)s)" if listing_keys is not None else ""
+        
+        self.target_cursor.execute(f"""
             WITH competitor_prices AS (
                 SELECT 
                     b.listing_key,
@@ -1066,6 +2214,7 @@ class DimensionalETL:
                 FROM bridge_listing_competitors b
                 JOIN fact_listing_metrics f ON b.competitor_listing_key = f.listing_key
                 WHERE b.is_active = TRUE
+                {listing_filter}
             )
             SELECT 
                 listing_key,
@@ -1079,17 +2228,73 @@ class DimensionalETL:
                 SUM(competitor_price * weight) as weighted_avg_price
             FROM competitor_prices
             GROUP BY listing_key
-        """)
+            ORDER BY listing_key
+        """, {'listing_keys': listing_keys})
+        
+        rows = self.target_cursor.fetchall()
+        columns = list(zip(*rows)) if rows else [()] * 9
+        stats = {
+            name: dimension_transforms.float_column(column)
+            for name, column in zip(
+                ('avg_price', 'min_price', 'max_price', 'median_price',
+                 'p25_price', 'p75_price', 'weighted_avg_price'),
+                columns[2:]
+            )
+        }
+        stats['competitor_count'] = np.array(columns[1], dtype=np.int64)
+        return np.array(columns[0], dtype=np.int64), stats
+    
+    def load_fact_competitor_pricing_analysis(self, listing_keys: Optional[List[int]] = None,
+                                              method: str = 'numpy'):
+        """
+        Load competitor pricing analysis fact table.
+        
+        Aggregates competitor prices and calculates:
+        - Statistical measures (avg, median, percentiles)
+        - Weighted average price
+        - Price recommendations (optimal, lower, upper bounds)
+        
+        Parameters
+        ----------
+        listing_keys : list of int, optional
+            Only refresh the analysis for these listings (incremental mode).
+            All listings are refreshed if not provided.
+        method : str, default='numpy'
+            'numpy' computes the statistics in process from a (listings x
+            top_k) price matrix; 'sql' aggregates in the database
+        """
+        if method not in ('numpy', 'sql'):
+            raise ValueError(f"Invalid pricing method: {method}. Must be 'numpy' or 'sql'")
+        
+        logger.info("Loading fact_competitor_pricing_analysis...")
         
-        pricing_stats = self.target_cursor.fetchall()
-        logger.info(f"Calculated pricing stats for {len(pricing_stats)} listings")
+        if listing_keys is not None and not listing_keys:
+            logger.info("No listings to refresh")
+            return
+        
+        # Get today's date_key
+        today = datetime.now()
+        date_key = int(today.strftime('%Y%m%d'))
+        
+        # Calculate pricing statistics per listing
+        if method == 'numpy':
+            keys, stats = self.compute_pricing_stats(listing_keys)
+        else:
+            keys, stats = self.compute_pricing_stats_sql(listing_keys)
+        logger.info(f"Calculated pricing stats for {len(keys)} listings ({method})")
         
         # Get current prices for comparison
         self.target_cursor.execute("""
             SELECT listing_key, price_per_night, listing_rating
             FROM fact_listing_metrics
-        """)
+            WHERE listing_key = ANY(%s)
+        """, (keys.tolist(),))
         current_prices = {key: (price, rating) for key, price, rating in self.target_cursor.fetchall()}
+        current_price = dimension_transforms.float_column([current_prices.get(key, (None, None))[0] for key in keys.tolist()])
+        rating = dimension_transforms.float_column([current_prices.get(key, (None, None))[1] for key in keys.tolist()])
+        
+        # Premium/discount and recommendations for all listings at once
+        recommendations = pricing_engine.price_recommendations(stats, current_price, rating)
         
         # Transform and load
         insert_query = """
@@ -1107,122 +2312,470 @@ class DimensionalETL:
                 updated_at = CURRENT_TIMESTAMP
         """
         
-        values = []
-        for stats in pricing_stats:
-            listing_key, count, avg, min_p, max_p, median, p25, p75, weighted = stats
-            
-            # Convert Decimal types to float for calculations
-            avg = float(avg) if avg is not None else None
-            min_p = float(min_p) if min_p is not None else None
-            max_p = float(max_p) if max_p is not None else None
-            median = float(median) if median is not None else None
-            p25 = float(p25) if p25 is not None else None
-            p75 = float(p75) if p75 is not None else None
-            weighted = float(weighted) if weighted is not None else None
-            
-            current_price, rating = current_prices.get(listing_key, (None, None))
-            current_price = float(current_price) if current_price is not None else None
-            rating = float(rating) if rating is not None else None
-            
-            # Calculate premium/discount
-            premium = None
-            if current_price and weighted and weighted > 0:
-                premium = ((current_price - weighted) / weighted) * 100
-            
-            # Calculate recommendations
-            lower_bound = p25 * 0.95 if p25 else None
-            upper_bound = p75 * 1.05 if p75 else None
-            
-            # Optimal price with quality adjustment
-            optimal = weighted
-            if optimal and rating:
-                quality_factor = min(max(rating / 4.5, 0.85), 1.15)  # ±15% adjustment
-                optimal = optimal * quality_factor
-            
-            values.append((
-                listing_key, date_key, count,
-                round(avg, 2) if avg else None,
-                round(min_p, 2) if min_p else None,
-                round(max_p, 2) if max_p else None,
-                round(median, 2) if median else None,
-                round(p25, 2) if p25 else None,
-                round(p75, 2) if p75 else None,
-                round(weighted, 2) if weighted else None,
-                round(premium, 2) if premium else None,
-                round(lower_bound, 2) if lower_bound else None,
-                round(upper_bound, 2) if upper_bound else None,
-                round(optimal, 2) if optimal else None
-            ))
+        # Rounded to cents; zero and NULL (NaN) are stored as NULL
+        money_columns = [
+            [round(v, 2) if v and v == v else None for v in values.tolist()]
+            for values in (
+                stats['avg_price'], stats['min_price'], stats['max_price'],
+                stats['median_price'], stats['p25_price'], stats['p75_price'],
+                stats['weighted_avg_price'],
+                recommendations['price_premium_discount'],
+                recommendations['recommended_price_lower'],
+                recommendations['recommended_price_upper'],
+                recommendations['recommended_optimal_price'],
+            )
+        ]
+        values = [
+            (listing_key, date_key, count) + tuple(money)
+            for listing_key, count, *money in zip(
+                keys.tolist(), stats['competitor_count'].tolist(), *money_columns
+            )
+        ]
         
-        execute_values(self.target_cursor, insert_query, values)
+        execute_values(self.target_cursor, insert_query, values, page_size=1000)
         self.target_conn.commit()
         logger.info(f"Loaded {len(values)} pricing analyses")
     
-    def refresh_materialized_views(self):
-        """Refresh all materialized views in the target database."""
+    def refresh_materialized_views(self, changed_keys: Optional[List[int]] = None):
+        """
+        Refresh all materialized views in the target database.
+        
+        view_top_competitors is refreshed CONCURRENTLY, so dashboard reads
+        keep seeing the previous contents instead of waiting for the
+        refresh. This needs a unique index on the view (created here for
+        databases built before it was added to the schema) and a populated
+        view; the very first population is a plain refresh.
+        
+        Parameters
+        ----------
+        changed_keys : list of int, optional
+            listing_keys whose bridge rows changed in this run (incremental
+            mode). The refresh is skipped when it is empty; None always
+            refreshes.
+        """
+        if changed_keys is not None and not changed_keys:
+            logger.info("No competitor changes, materialized views are current")
+            return
+        
         logger.info("Refreshing materialized views...")
         
-        self.target_cursor.execute("REFRESH MATERIALIZED VIEW view_top_competitors")
+        self.target_cursor.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_top_competitors_unique
+            ON view_top_competitors(listing_key, similarity_rank)
+        """)
+        self.target_cursor.execute("""
+            SELECT ispopulated FROM pg_matviews WHERE matviewname = 'view_top_competitors'
+        """)
+        populated = self.target_cursor.fetchone()[0]
+        self.target_conn.commit()
+        
+        concurrently = "CONCURRENTLY " if populated else ""
+        self.target_cursor.execute(f"REFRESH MATERIALIZED VIEW {concurrently}view_top_competitors")
         self.target_conn.commit()
         
-        logger.info("Materialized views refreshed")
+        logger.info(f"Materialized views refreshed{' concurrently' if populated else ''}")
+    
+    # ========================================================================
+    # SNAPSHOT PARTITIONS
+    # ========================================================================
+    
+    @staticmethod
+    def _add_months(month_start: date, months: int) -> date:
+        """
+        Shift the first day of a month by a number of months.
+        
+        Parameters
+        ----------
+        month_start : date
+            First day of a month
+        months : int
+            Months to add (negative to go back)
+        
+        Returns
+        -------
+        date
+            First day of the resulting month
+        """
+        index = month_start.year * 12 + month_start.month - 1 + months
+        return date(index // 12, index % 12 + 1, 1)
+    
+    def is_partitioned(self, table: str) -> bool:
+        """
+        Check whether a target table is a partitioned table.
+        
+        Parameters
+        ----------
+        table : str
+            Table name
+        
+        Returns
+        -------
+        bool
+            True if the table exists and is partitioned
+        """
+        self.target_cursor.execute("""
+            SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)
+        """, (table,))
+        return self.target_cursor.fetchone() is not None
+    
+    def ensure_snapshot_partitions(self, snapshot_date: Optional[date] = None):
+        """
+        Create the monthly partitions the snapshot loads write into.
+        
+        For every table in PARTITIONED_FACTS, creates the partition holding
+        ``snapshot_date`` and the next PARTITION_MONTHS_AHEAD months (named
+        ``<table>_pYYYYMM``) if they do not exist yet, and (re)creates
+        view_latest_listing_metrics. Tables created before partitioning was
+        introduced are left as they are (with a warning); rebuild them from
+        database_modelling_schema.sql to partition them.
+        
+        Parameters
+        ----------
+        snapshot_date : date, optional
+            Snapshot being loaded, defaults to today
+        """
+        first = (snapshot_date or datetime.now().date()).replace(day=1)
+        
+        for table, column in self.PARTITIONED_FACTS.items():
+            if not self.is_partitioned(table):
+                logger.warning(f"{table} is not partitioned; snapshots go to a single heap table")
+                continue
+            
+            for offset in range(self.PARTITION_MONTHS_AHEAD + 1):
+                start = self._add_months(first, offset)
+                end = self._add_months(start, 1)
+                if column.endswith('date_key'):
+                    bounds = (int(start.strftime('%Y%m%d')), int(end.strftime('%Y%m%d')))
+                else:
+                    bounds = (start, end)
+                self.target_cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {table}_p{start:%Y%m}
+                    PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)
+                """, bounds)
+        
+        # Runtime partition pruning keeps this on the newest partition
+        self.target_cursor.execute("""
+            CREATE OR REPLACE VIEW view_latest_listing_metrics AS
+            SELECT f.*
+            FROM fact_listing_metrics f
+            WHERE f.snapshot_date = (SELECT MAX(snapshot_date) FROM fact_listing_metrics)
+        """)
+        
+        self.target_conn.commit()
+        logger.info(
+            f"Snapshot partitions ready through "
+            f"{self._add_months(first, self.PARTITION_MONTHS_AHEAD):%Y-%m}"
+        )
+    
+    def archive_snapshot_partitions(self, retain_months: int) -> List[str]:
+        """
+        Detach snapshot partitions older than the retention window.
+        
+        Partitions of PARTITIONED_FACTS whose month is more than
+        ``retain_months - 1`` months before the current month are detached
+        and moved to PARTITION_ARCHIVE_SCHEMA, where they stay queryable
+        (or can be dumped and dropped). Bridge, amenity summary and
+        similarity state rows pointing at detached fact rows are deleted,
+        as ON DELETE CASCADE did before listing_key was partitioned.
+        
+        Parameters
+        ----------
+        retain_months : int
+            Months kept attached, including the current month
+        
+        Returns
+        -------
+        list of str
+            Archived partitions
+        
+        Raises
+        ------
+        ValueError
+            If retain_months is less than 1
+        """
+        if retain_months < 1:
+            raise ValueError(f"retain_months must be at least 1, got {retain_months}")
+        
+        cutoff = self._add_months(datetime.now().date().replace(day=1), 1 - retain_months)
+        logger.info(f"Archiving snapshot partitions before {cutoff:%Y-%m}...")
+        
+        self.target_cursor.execute("""
+            SELECT parent.relname, child.relname
+            FROM pg_inherits i
+            JOIN pg_class parent ON parent.oid = i.inhparent
+            JOIN pg_class child ON child.oid = i.inhrelid
+            WHERE i.inhparent = ANY(ARRAY(SELECT to_regclass(t) FROM unnest(%s::text[]) t))
+            ORDER BY child.relname
+        """, (list(self.PARTITIONED_FACTS),))
+        
+        expired = []
+        for parent, child in self.target_cursor.fetchall():
+            match = re.fullmatch(rf"{parent}_p(\d{{6}})", child)
+            if match and match.group(1) < f"{cutoff:%Y%m}":
+                expired.append((parent, child))
+        
+        if not expired:
+            logger.info("No snapshot partitions to archive")
+            return []
+        
+        self.target_cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {self.PARTITION_ARCHIVE_SCHEMA}")
+        self.ensure_similarity_feature_state()
+        for parent, child in expired:
+            if parent == 'fact_listing_metrics':
+                for dependent, columns in (
+                    ('bridge_listing_competitors', ('listing_key', 'competitor_listing_key')),
+                    ('fact_listing_amenities_summary', ('listing_key',)),
+                    ('similarity_feature_state', ('listing_key',)),
+                ):
+                    condition = ' OR '.join(
+                        f"{column} IN (SELECT listing_key FROM {child})" for column in columns
+                    )
+                    self.target_cursor.execute(f"DELETE FROM {dependent} WHERE {condition}")
+            
+            self.target_cursor.execute(f"ALTER TABLE {parent} DETACH PARTITION {child}")
+            self.target_cursor.execute(f"ALTER TABLE {child} SET SCHEMA {self.PARTITION_ARCHIVE_SCHEMA}")
+        
+        self.target_conn.commit()
+        archived = [child for _, child in expired]
+        logger.info(f"Archived {len(archived)} partitions to {self.PARTITION_ARCHIVE_SCHEMA}: {', '.join(archived)}")
+        return archived
     
     # ========================================================================
     # ORCHESTRATION
     # ========================================================================
     
-    def run_full_etl(self):
+    def restore_key_caches(self):
+        """
+        Rebuild the dimension key caches from the target database.
+        
+        Used when the fact load resumes after the dimension phases ran in an
+        earlier (failed) run.
+        """
+        self.target_cursor.execute("SELECT host_key, host_id FROM dim_host")
+        self.host_key_cache = {host_id: host_key for host_key, host_id in self.target_cursor.fetchall()}
+        
+        self.target_cursor.execute("SELECT property_key, property_id FROM dim_property")
+        self.property_key_cache = {prop_id: prop_key for prop_key, prop_id in self.target_cursor.fetchall()}
+        
+        self.target_cursor.execute("SELECT location_key, latitude, longitude FROM dim_location")
+        self.location_key_cache = {
+            (float(lat), float(lon)): loc_key
+            for loc_key, lat, lon in self.target_cursor.fetchall()
+        }
+        
+        self.target_cursor.execute("""
+            SELECT property_id, rating_key FROM dim_category_ratings WHERE property_id IS NOT NULL
+        """)
+        rating_keys = dict(self.target_cursor.fetchall())
+        self.source_cursor.execute("""
+            SELECT DISTINCT cr.listing_id, l.property_id
+            FROM listing_category_ratings cr
+            JOIN listings l ON cr.listing_id = l.listing_id
+            WHERE l.property_id IS NOT NULL
+        """)
+        self.rating_key_cache = {
+            listing_id: rating_keys[prop_id]
+            for listing_id, prop_id in self.source_cursor.fetchall()
+            if prop_id in rating_keys
+        }
+        
+        logger.info(
+            f"Restored key caches: {len(self.host_key_cache)} hosts, "
+            f"{len(self.property_key_cache)} properties, {len(self.location_key_cache)} locations, "
+            f"{len(self.rating_key_cache)} rating sets"
+        )
+    
+    def run_on_own_connection(self, action: Callable[['DimensionalETL'], Any],
+                              outputs: Tuple[str, ...] = ()) -> Any:
+        """
+        Run a phase on a copy of this ETL with its own database connections.
+        
+        Parameters
+        ----------
+        action : callable
+            Called with the copy, e.g. ``lambda etl: etl.load_dim_host()``
+        outputs : tuple of str, default=()
+            Attributes (key caches) the phase builds, copied back afterwards
+        
+        Returns
+        -------
+        Any
+            Return value of ``action``
+        """
+        worker = copy.copy(self)
+        worker.source_conn = worker.target_conn = None
+        worker.source_cursor = worker.target_cursor = None
+        
+        try:
+            worker.connect()
+            result = action(worker)
+        except Exception:
+            if worker.target_conn:
+                worker.target_conn.rollback()
+            raise
+        finally:
+            worker.disconnect()
+        
+        for name in outputs:
+            setattr(self, name, getattr(worker, name))
+        return result
+    
+    def run_full_etl(self, incremental: bool = False, similarity_workers: int = 1,
+                     similarity_method: str = 'vectorized', pushdown: bool = False, refit_clusters: bool = False,
+                     phase_workers: int = 1, resume_from: Optional[str] = None,
+                     snapshot_retention_months: Optional[int] = None) -> Dict[str, float]:
         """
         Execute complete ETL pipeline from normalized to dimensional model.
         
         Steps:
-        1. Load all dimension tables
+        1. Load all dimension tables (and create the snapshot partitions)
         2. Load central fact table
         3. Load aggregate fact tables
         4. Calculate competitor similarities
         5. Load competitor pricing analysis
         6. Refresh materialized views
+        7. Archive expired snapshot partitions (optional)
+        
+        Parameters
+        ----------
+        incremental : bool, default=False
+            Only rescore listings affected by changes since the last run and
+            refresh their pricing analysis (see update_competitor_similarity)
+        similarity_workers : int, default=1
+            Worker processes for a full competitor similarity run
+        similarity_method : str, default='vectorized'
+            Competitor scoring for full and incremental runs: 'vectorized'
+            (exhaustive) or 'spatial' (nearest CANDIDATE_NEIGHBORS
+            candidates, O(n·k)); full runs also accept 'loop'
+        pushdown : bool, default=False
+            Load dim_host, dim_property, dim_category_ratings and
+            fact_listing_metrics with server-side INSERT ... SELECT against
+            PUSHDOWN_SOURCE_SCHEMA (see attach_source_schema) instead of
+            round-tripping rows through Python
+        refit_clusters : bool, default=False
+            Refit the location clusters even if the stored centroids have
+            not drifted (see load_dim_location)
+        phase_workers : int, default=1
+            Phases run at the same time. With more than one, independent
+            phases (the four dimension loads) run concurrently, each on its
+            own source/target connections.
+        resume_from : str, optional
+            Resume a failed run from this phase; its upstream phases are
+            skipped. Phases: source_schema (pushdown only), snapshot_partitions,
+            dim_host, dim_property, dim_location, dim_category_ratings,
+            fact_listing_metrics, fact_listing_amenities_summary,
+            competitor_similarity, pricing_analysis, refresh_views,
+            archive_partitions (with snapshot_retention_months)
+        snapshot_retention_months : int, optional
+            Archive snapshot partitions older than this many months
+            (including the current one) after the run, see
+            archive_snapshot_partitions
+        
+        Returns
+        -------
+        dict of str to float
+            Wall time in seconds per phase that ran
         """
         start_time = datetime.now()
         logger.info("="*70)
         logger.info("Starting ETL: Normalized → Dimensional")
         logger.info("="*70)
         
-        try:
-            self.connect()
-            
-            # Step 1: Load Dimensions
-            logger.info("\n--- PHASE 1: Loading Dimensions ---")
-            self.load_dim_host()
-            self.load_dim_property()
-            self.load_dim_location()
-            self.load_dim_category_ratings()
-            
-            # Step 2: Load Central Fact
-            logger.info("\n--- PHASE 2: Loading Central Fact ---")
-            self.load_fact_listing_metrics()
-            
-            # Step 3: Load Aggregate Facts
-            logger.info("\n--- PHASE 3: Loading Aggregate Facts ---")
-            self.load_fact_listing_amenities_summary()
-            
-            # Step 4: Competitor Analysis
-            logger.info("\n--- PHASE 4: Competitor Analysis ---")
-            self.calculate_competitor_similarity()
+        results = {'refreshed_keys': None}
+        
+        def step(action, outputs: Tuple[str, ...] = ()) -> Callable[[], Any]:
+            # action: method name, or a function taking the ETL instance
+            if isinstance(action, str):
+                method_name = action
+                action = lambda etl: getattr(etl, method_name)()
+            if phase_workers > 1:
+                return lambda: self.run_on_own_connection(action, outputs)
+            return lambda: action(self)
+        
+        def load_dim_location(etl):
+            etl.load_dim_location(refit=refit_clusters)
+        
+        def load_fact_listing_metrics(etl):
+            if pushdown:
+                etl.load_fact_listing_metrics_pushdown()
+                return
+            if not etl.host_key_cache:
+                # Dimensions were loaded by the run being resumed
+                etl.restore_key_caches()
+            etl.load_fact_listing_metrics()
+        
+        def competitor_similarity(etl):
+            if incremental:
+                results['refreshed_keys'] = etl.update_competitor_similarity(method=similarity_method)
+            else:
+                etl.calculate_competitor_similarity(method=similarity_method, workers=similarity_workers)
+        
+        def pricing_analysis(etl):
+            # After a resume the refreshed set is unknown: refresh every listing
+            etl.load_fact_competitor_pricing_analysis(listing_keys=results['refreshed_keys'])
+        
+        def refresh_views(etl):
+            etl.refresh_materialized_views(changed_keys=results['refreshed_keys'])
+        
+        # Dimensions only depend on the source; facts need every dimension
+        phases = []
+        dimension_deps = ()
+        if pushdown:
+            phases.append(Phase('source_schema', step('attach_source_schema')))
+            dimension_deps = ('source_schema',)
+        phases += [
+            Phase('snapshot_partitions', step('ensure_snapshot_partitions')),
+            Phase('dim_host', step(
+                'load_dim_host_pushdown' if pushdown else 'load_dim_host', ('host_key_cache',)
+            ), dimension_deps),
+            Phase('dim_property', step(
+                'load_dim_property_pushdown' if pushdown else 'load_dim_property', ('property_key_cache',)
+            ), dimension_deps),
+            Phase('dim_location', step(load_dim_location, ('location_key_cache',)), dimension_deps),
+            Phase('dim_category_ratings', step(
+                'load_dim_category_ratings_pushdown' if pushdown else 'load_dim_category_ratings',
+                ('rating_key_cache',)
+            ), dimension_deps),
+            Phase('fact_listing_metrics', step(load_fact_listing_metrics), (
+                'snapshot_partitions', 'dim_host', 'dim_property', 'dim_location',
+                'dim_category_ratings'
+            )),
+            Phase('fact_listing_amenities_summary',
+                  step('load_fact_listing_amenities_summary'),
+                  ('fact_listing_metrics',)),
+            Phase('competitor_similarity', step(competitor_similarity),
+                  ('fact_listing_metrics', 'fact_listing_amenities_summary')),
+            Phase('pricing_analysis', step(pricing_analysis), ('competitor_similarity',)),
+            Phase('refresh_views', step(refresh_views), ('pricing_analysis',)),
+        ]
+        if snapshot_retention_months is not None:
+            def archive_partitions(etl):
+                etl.archive_snapshot_partitions(snapshot_retention_months)
             
-            # Step 5: Pricing Analysis
-            logger.info("\n--- PHASE 5: Pricing Analysis ---")
-            self.load_fact_competitor_pricing_analysis()
+            phases.append(Phase('archive_partitions', step(archive_partitions), ('refresh_views',)))
+        scheduler = PhaseScheduler(phases, max_workers=phase_workers)
+        
+        try:
+            if phase_workers == 1:
+                self.connect()
             
-            # Step 6: Refresh Views
-            logger.info("\n--- PHASE 6: Finalizing ---")
-            self.refresh_materialized_views()
+            timings = scheduler.run(resume_from=resume_from)
             
             elapsed = datetime.now() - start_time
             logger.info("="*70)
             logger.info(f"ETL completed successfully in {elapsed}")
+            for name, seconds in timings.items():
+                logger.info(f"  {name:<32} {seconds:>9.2f}s")
             logger.info("="*70)
             
+            return timings
+            
+        except PhaseError as e:
+            logger.error(f"ETL failed: {e}")
+            logger.error(f"Fix the cause and rerun with resume_from='{e.phase}'")
+            if self.target_conn:
+                self.target_conn.rollback()
+            raise
         except Exception as e:
             logger.error(f"ETL failed: {e}")
             if self.target_conn:
@@ -1231,7 +2784,6 @@ class DimensionalETL:
         finally:
             self.disconnect()
 
-
 def main():
     """
     Main execution function.
@@ -1244,6 +2796,18 @@ def main():
     DB_PORT : PostgreSQL port
     SOURCE_DB_NAME : Source database (normalized schema)
     TARGET_DB_NAME : Target database (dimensional schema)
+    
+    Optional Environment Variables
+    ------------------------------
+    ETL_INCREMENTAL : Set to 'true' to rescore only listings affected by changes (daily refresh)
+    SIMILARITY_WORKERS : Worker processes for competitor similarity (default 1)
+    SIMILARITY_METHOD : Competitor scoring, 'vectorized' (default) or 'spatial' candidate pruning
+    ETL_PUSHDOWN : Set to 'true' to run dimension/fact transforms server-side
+    REFIT_LOCATION_CLUSTERS : Set to 'true' to refit location clusters from the stored centroids
+    ETL_PHASE_WORKERS : Phases run concurrently, each on its own connections (default 1)
+    ETL_RESUME_FROM : Phase to resume a failed run from (e.g. competitor_similarity)
+    ETL_EXTRACT_ITERSIZE : Rows per server-side cursor chunk (default 5000)
+    SNAPSHOT_RETENTION_MONTHS : Archive snapshot partitions older than this many months
     """
     # Source database configuration (normalized schema)
     source_db_config = {
@@ -1271,7 +2835,20 @@ def main():
     
     # Run ETL
     etl = DimensionalETL(source_db_config, target_db_config)
-    etl.run_full_etl()
+    etl.EXTRACT_ITERSIZE = int(os.getenv('ETL_EXTRACT_ITERSIZE', str(DimensionalETL.EXTRACT_ITERSIZE)))
+    etl.run_full_etl(
+        incremental=os.getenv('ETL_INCREMENTAL', 'false').lower() == 'true',
+        similarity_workers=int(os.getenv('SIMILARITY_WORKERS', '1')),
+        similarity_method=os.getenv('SIMILARITY_METHOD', 'vectorized'),
+        pushdown=os.getenv('ETL_PUSHDOWN', 'false').lower() == 'true',
+        refit_clusters=os.getenv('REFIT_LOCATION_CLUSTERS', 'false').lower() == 'true',
+        phase_workers=int(os.getenv('ETL_PHASE_WORKERS', '1')),
+        resume_from=os.getenv('ETL_RESUME_FROM') or None,
+        snapshot_retention_months=(
+            int(os.environ['SNAPSHOT_RETENTION_MONTHS'])
+            if os.getenv('SNAPSHOT_RETENTION_MONTHS') else None
+        )
+    )
 
 
 if __name__ == '__main__':
@@ -0,0 +1,226 @@
+"""
+Phase Scheduler
+===============
+
+Small dependency-aware scheduler for ETL phases. Phases form a DAG; every
+phase whose dependencies have finished is started, up to ``max_workers`` at
+a time, so independent phases (e.g. the four dimension loads) overlap while
+joins (the fact load waits for every dimension) are respected.
+
+The scheduler only orders and times callables. Whatever a phase needs to run
+concurrently (its own database connection, for instance) is up to the
+callable.
+
+Classes
+-------
+Phase : Named unit of work with dependencies
+PhaseScheduler : Run phases in dependency order, optionally concurrently
+
+Example
+-------
+>>> scheduler = PhaseScheduler([
+...     Phase('dim_host', load_hosts),
+...     Phase('dim_property', load_properties),
+...     Phase('fact', load_facts, depends_on=('dim_host', 'dim_property')),
+... ], max_workers=2)
+>>> timings = scheduler.run()
+>>> timings = scheduler.run(resume_from='fact')  # skip the dimension loads
+"""
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class Phase:
+    """
+    Named ETL phase.
+
+    Parameters
+    ----------
+    name : str
+        Unique phase name (used for dependencies and resume_from)
+    run : callable
+        Zero-argument callable doing the work
+    depends_on : iterable of str, default=()
+        Names of the phases that must finish first
+    """
+
+    def __init__(self, name: str, run: Callable[[], object], depends_on: Iterable[str] = ()):
+        self.name = name
+        self.run = run
+        self.depends_on = tuple(depends_on)
+
+
+class PhaseError(RuntimeError):
+    """
+    Raised when a phase fails; names the phase to resume from.
+
+    Parameters
+    ----------
+    phase : str
+        Name of the failed phase
+    error : Exception
+        Original exception
+    """
+
+    def __init__(self, phase: str, error: Exception):
+        super().__init__(f"Phase '{phase}' failed: {error}")
+        self.phase = phase
+        self.error = error
+
+
+class PhaseScheduler:
+    """
+    Run phases in dependency order, overlapping independent phases.
+
+    Parameters
+    ----------
+    phases : list of Phase
+        Phases in a valid topological order (used as start order when
+        several phases are ready)
+    max_workers : int, default=1
+        Phases run at the same time; 1 runs them one after another in the
+        calling thread
+
+    Attributes
+    ----------
+    timings : dict of str to float
+        Wall time in seconds of every phase that finished in the last run
+    """
+
+    def __init__(self, phases: List[Phase], max_workers: int = 1):
+        self.phases = {phase.name: phase for phase in phases}
+        self.order = [phase.name for phase in phases]
+        self.max_workers = max(1, max_workers)
+        self.timings: Dict[str, float] = {}
+
+        if len(self.phases) != len(phases):
+            raise ValueError("Phase names must be unique")
+        seen = set()
+        for phase in phases:
+            unknown = [dep for dep in phase.depends_on if dep not in self.phases]
+            if unknown:
+                raise ValueError(f"Phase '{phase.name}' depends on unknown phases: {unknown}")
+            if not set(phase.depends_on) <= seen:
+                raise ValueError(f"Phase '{phase.name}' is listed before its dependencies")
+            seen.add(phase.name)
+
+    def ancestors(self, name: str) -> Set[str]:
+        """
+        Collect every phase a phase depends on, directly or transitively.
+
+        Parameters
+        ----------
+        name : str
+            Phase name
+
+        Returns
+        -------
+        set of str
+            Names of the upstream phases
+        """
+        found = set()
+        stack = list(self.phases[name].depends_on)
+        while stack:
+            dep = stack.pop()
+            if dep not in found:
+                found.add(dep)
+                stack.extend(self.phases[dep].depends_on)
+        return found
+
+    def run(self, resume_from: Optional[str] = None) -> Dict[str, float]:
+        """
+        Run all phases, or resume from a named phase.
+
+        When resuming, the upstream phases of ``resume_from`` are treated as
+        already done (their results are in the database from the failed
+        run); the named phase and everything else runs.
+
+        Parameters
+        ----------
+        resume_from : str, optional
+            Phase to resume from
+
+        Returns
+        -------
+        dict of str to float
+            Wall time in seconds per phase that ran
+
+        Raises
+        ------
+        ValueError
+            If resume_from is not a known phase
+        PhaseError
+            If a phase fails (after the phases already running have finished)
+        """
+        if resume_from is not None and resume_from not in self.phases:
+            raise ValueError(f"Unknown phase to resume from: {resume_from}. Must be one of {self.order}")
+
+        done = self.ancestors(resume_from) if resume_from else set()
+        if done:
+            logger.info(f"Resuming from '{resume_from}', skipping: {', '.join(n for n in self.order if n in done)}")
+
+        self.timings = {}
+        pending = [name for name in self.order if name not in done]
+
+        def ready() -> List[str]:
+            return [name for name in pending if set(self.phases[name].depends_on) <= done]
+
+        if self.max_workers == 1:
+            for name in pending:
+                self._run_phase(name)
+            return self.timings
+
+        failure = None
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='etl-phase') as pool:
+            running = {}
+            while pending or running:
+                if failure is None:
+                    for name in ready():
+                        if len(running) >= self.max_workers:
+                            break
+                        pending.remove(name)
+                        running[pool.submit(self._run_phase, name)] = name
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        future.result()
+                        done.add(name)
+                    except PhaseError as e:
+                        failure = failure or e
+
+        if failure is not None:
+            raise failure
+        return self.timings
+
+    def _run_phase(self, name: str):
+        """
+        Run and time one phase.
+
+        Parameters
+        ----------
+        name : str
+            Phase name
+
+        Raises
+        ------
+        PhaseError
+            Wrapping any exception raised by the phase
+        """
+        logger.info(f"--- Phase '{name}' started ---")
+        start = time.perf_counter()
+        try:
+            self.phases[name].run()
+        except Exception as e:
+            logger.error(f"Phase '{name}' failed after {time.perf_counter() - start:.2f}s: {e}")
+            raise PhaseError(name, e) from e
+        self.timings[name] = time.perf_counter() - start
+        logger.info(f"--- Phase '{name}' finished in {self.timings[name]:.2f}s ---")
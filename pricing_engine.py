@@ -0,0 +1,222 @@
+"""
+Competitor Pricing Engine
+=========================
+
+NumPy implementation of the competitor pricing statistics behind
+``DimensionalETL.load_fact_competitor_pricing_analysis``. Instead of one
+ordered-set aggregate query per statistic, every listing's competitor prices
+are laid out as a row of a (listings x top_k) matrix and all statistics,
+premiums and recommended prices are computed column-wise.
+
+The results match the SQL path (``AVG``, ``MIN``, ``MAX``,
+``PERCENTILE_CONT`` and ``SUM(price * weight)`` over the bridge rows):
+
+- Prices (DECIMAL(10, 2)) and weights (DECIMAL(4, 3)) are carried as whole
+  cents and thousandths, so sums are exact like NUMERIC arithmetic and each
+  value is rounded to float once, at the end.
+- Percentiles use PostgreSQL's ``percentile_cont`` interpolation
+  (``lo + (hi - lo) * fraction`` on float8 values) rather than
+  ``np.percentile``, whose interpolation differs in the last bit for
+  fractions of 0.5 and above.
+- NULL prices are ignored by every statistic but still counted in
+  ``competitor_count`` (``COUNT(*)``); NULL statistics are NaN.
+
+Functions
+---------
+build_price_matrix : Lay out bridge rows as per-listing price and weight rows
+percentile_cont : PostgreSQL ``PERCENTILE_CONT`` over each matrix row
+competitor_price_stats : Count, avg, min, max, median, quartiles, weighted avg
+price_recommendations : Premium/discount and recommended price range
+
+Example
+-------
+>>> keys, prices, weights, counts = build_price_matrix(listing_keys, price_cents, weight_milli)
+>>> stats = competitor_price_stats(prices, weights, counts)
+>>> recs = price_recommendations(stats, current_price, rating)
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+
+CENTS = 100  # Price scale of DECIMAL(10, 2)
+WEIGHT_SCALE = 1000  # Weight scale of DECIMAL(4, 3)
+
+
+def build_price_matrix(listing_keys: np.ndarray, price_cents: np.ndarray,
+                       weight_milli: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Group bridge rows into one padded row per source listing.
+
+    Parameters
+    ----------
+    listing_keys : np.ndarray
+        Source listing_key of every bridge row, shape (m,)
+    price_cents : np.ndarray
+        Competitor price in cents (float64, NaN for NULL), shape (m,)
+    weight_milli : np.ndarray
+        Competitor weight in thousandths (float64, NaN for NULL), shape (m,)
+
+    Returns
+    -------
+    keys : np.ndarray
+        Distinct source listing_keys in ascending order, shape (n,)
+    prices : np.ndarray
+        Competitor prices in cents, shape (n, k), NaN-padded
+    weights : np.ndarray
+        Competitor weights in thousandths, shape (n, k), NaN-padded
+    counts : np.ndarray
+        Bridge rows per listing (including NULL prices), shape (n,)
+    """
+    listing_keys = np.asarray(listing_keys, dtype=np.int64)
+    order = np.argsort(listing_keys, kind='stable')
+    keys, starts, counts = np.unique(listing_keys[order], return_index=True, return_counts=True)
+
+    n = len(keys)
+    k = int(counts.max()) if n else 0
+    rows = np.repeat(np.arange(n), counts)
+    cols = np.arange(len(order)) - np.repeat(starts, counts)
+
+    prices = np.full((n, k), np.nan)
+    weights = np.full((n, k), np.nan)
+    prices[rows, cols] = np.asarray(price_cents, dtype=np.float64)[order]
+    weights[rows, cols] = np.asarray(weight_milli, dtype=np.float64)[order]
+    return keys, prices, weights, counts
+
+
+def percentile_cont(sorted_values: np.ndarray, n_valid: np.ndarray, fraction: float) -> np.ndarray:
+    """
+    Compute PostgreSQL's ``PERCENTILE_CONT(fraction)`` for every row.
+
+    Parameters
+    ----------
+    sorted_values : np.ndarray
+        Values sorted ascending per row with NaN (NULL) last, shape (n, k)
+    n_valid : np.ndarray
+        Non-NaN values per row, shape (n,)
+    fraction : float
+        Percentile between 0 and 1
+
+    Returns
+    -------
+    np.ndarray
+        Interpolated percentile per row, NaN for rows without values
+    """
+    position = fraction * (np.maximum(n_valid, 1) - 1)
+    first = np.floor(position).astype(np.int64)
+    second = np.ceil(position).astype(np.int64)
+
+    rows = np.arange(len(sorted_values))
+    lo = sorted_values[rows, first] if sorted_values.size else np.full(len(n_valid), np.nan)
+    hi = sorted_values[rows, second] if sorted_values.size else lo
+    result = np.where(first == second, lo, lo + (hi - lo) * (position - first))
+    return np.where(n_valid > 0, result, np.nan)
+
+
+def competitor_price_stats(prices: np.ndarray, weights: np.ndarray,
+                           counts: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Compute the competitor price statistics of every listing at once.
+
+    Parameters
+    ----------
+    prices : np.ndarray
+        Competitor prices in cents, shape (n, k), NaN for NULL/padding
+    weights : np.ndarray
+        Competitor weights in thousandths, shape (n, k)
+    counts : np.ndarray
+        Bridge rows per listing, see ``build_price_matrix``
+
+    Returns
+    -------
+    dict of str to np.ndarray
+        competitor_count, avg_price, min_price, max_price, median_price,
+        p25_price, p75_price and weighted_avg_price (currency units,
+        NaN where SQL returns NULL), each shape (n,)
+    """
+    valid = ~np.isnan(prices)
+    n_valid = valid.sum(axis=1)
+    has_prices = n_valid > 0
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        total_cents = np.where(valid, prices, 0).sum(axis=1)
+        avg = np.where(has_prices, total_cents / (np.maximum(n_valid, 1) * CENTS), np.nan)
+
+        # SUM skips rows where price or weight is NULL; NULL if all are
+        products = prices * weights
+        has_products = (~np.isnan(products)).any(axis=1)
+        weighted = np.where(
+            has_products,
+            np.where(np.isnan(products), 0, products).sum(axis=1) / (CENTS * WEIGHT_SCALE),
+            np.nan
+        )
+
+        sorted_prices = np.sort(prices, axis=1) / CENTS
+        min_price = np.where(has_prices, sorted_prices[:, 0] if prices.size else np.nan, np.nan)
+        max_price = np.where(
+            has_prices,
+            sorted_prices[np.arange(len(prices)), np.maximum(n_valid, 1) - 1] if prices.size else np.nan,
+            np.nan
+        )
+
+    return {
+        'competitor_count': np.asarray(counts, dtype=np.int64),
+        'avg_price': avg,
+        'min_price': min_price,
+        'max_price': max_price,
+        'median_price': percentile_cont(sorted_prices, n_valid, 0.5),
+        'p25_price': percentile_cont(sorted_prices, n_valid, 0.25),
+        'p75_price': percentile_cont(sorted_prices, n_valid, 0.75),
+        'weighted_avg_price': weighted,
+    }
+
+
+def price_recommendations(stats: Dict[str, np.ndarray], current_price: np.ndarray,
+                          rating: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Compute price premium/discount and recommended prices per listing.
+
+    Zero and NaN inputs are treated as missing, like the truthiness checks
+    of the original row-by-row code.
+
+    Parameters
+    ----------
+    stats : dict of str to np.ndarray
+        Output of ``competitor_price_stats``
+    current_price : np.ndarray
+        Listing's own price per night (NaN if unknown), shape (n,)
+    rating : np.ndarray
+        Listing's rating (NaN if unknown), shape (n,)
+
+    Returns
+    -------
+    dict of str to np.ndarray
+        price_premium_discount (% vs weighted average),
+        recommended_price_lower (p25 - 5%), recommended_price_upper
+        (p75 + 5%) and recommended_optimal_price (weighted average with a
+        +/-15% quality adjustment), NaN where not defined
+    """
+    weighted = stats['weighted_avg_price']
+    p25 = stats['p25_price']
+    p75 = stats['p75_price']
+
+    def present(values: np.ndarray) -> np.ndarray:
+        return ~np.isnan(values) & (values != 0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        premium = np.where(
+            present(current_price) & (weighted > 0),
+            ((current_price - weighted) / weighted) * 100,
+            np.nan
+        )
+        quality_factor = np.minimum(np.maximum(rating / 4.5, 0.85), 1.15)  # +/-15% adjustment
+        optimal = np.where(
+            present(weighted) & present(rating), weighted * quality_factor, weighted
+        )
+
+    return {
+        'price_premium_discount': premium,
+        'recommended_price_lower': np.where(present(p25), p25 * 0.95, np.nan),
+        'recommended_price_upper': np.where(present(p75), p75 * 1.05, np.nan),
+        'recommended_optimal_price': optimal,
+    }
@@ -0,0 +1,863 @@
+"""
+Competitor Similarity Engine
+============================
+
+Vectorized NumPy implementation of the competitor similarity model used by
+``DimensionalETL.calculate_competitor_similarity``. Instead of scoring one
+listing pair at a time, whole blocks of source listings are scored against
+every candidate at once with broadcast arithmetic, and the top competitors
+are selected with ``np.argpartition``.
+
+The scoring rules mirror the original pairwise loop exactly (same component
+formulas, same evaluation order, same tie-breaking), so the ranks, weights
+and component scores written into ``bridge_listing_competitors`` are
+unchanged.
+
+Functions
+---------
+build_feature_arrays : Convert similarity feature rows into NumPy columns
+build_amenity_bitsets : Pack per-listing amenity sets into uint64 bitsets
+popcount : Number of set bits per uint64 word
+haversine_matrix : Pairwise haversine distances between two coordinate sets
+score_block : Component and overall similarity scores for a block of listings
+select_top_k : Top-k competitor indices per row, in loop tie-break order
+CandidateIndex : BallTree/cluster candidate generation for pruned scoring
+iter_competitor_blocks : Score all listings block by block
+check_candidate_recall : Compare pruned top-k lists against exhaustive scoring
+find_affected_sources : Listings whose top-k lists a changed listing can enter
+blocks_to_records : Convert scored blocks into bridge-table records
+block_to_bridge_values : Convert one scored block into bridge-table row tuples
+iter_parallel_bridge_values : Score shards across worker processes, streaming rows
+
+Example
+-------
+>>> features = build_feature_arrays(rows)
+>>> blocks = iter_competitor_blocks(features, top_k=25, block_size=512)
+>>> similarities = blocks_to_records(features, blocks)
+
+>>> # Spatially pruned: nearest 200 listings plus same-cluster listings
+>>> index = CandidateIndex(features, n_neighbors=200)
+>>> check_candidate_recall(features, index, top_k=25, sample_size=100)
+1.0
+>>> blocks = iter_competitor_blocks(features, candidate_index=index)
+
+>>> # Amenity component as Jaccard overlap of amenity sets
+>>> bits = build_amenity_bitsets(len(rows), [(row_position, amenity_id), ...])
+>>> features = build_feature_arrays(rows, amenity_bits=bits)
+"""
+
+import os
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sklearn.neighbors import BallTree
+
+EARTH_RADIUS_KM = 6371.0
+
+# Component weights of overall_similarity_score
+LOCATION_WEIGHT = 0.35
+PROPERTY_WEIGHT = 0.25
+QUALITY_WEIGHT = 0.20
+AMENITY_WEIGHT = 0.10
+PRICE_WEIGHT = 0.10
+
+# Sentinels for NULL integer attributes (never valid values in the data)
+NULL_CLUSTER = -1
+NULL_BEDROOMS = -1
+
+
+def _float_column(values: Sequence[Any], fill: float = 0.0) -> np.ndarray:
+    """
+    Convert a sequence of Decimal/int/None values into a float64 array.
+
+    Parameters
+    ----------
+    values : sequence
+        Column values as returned by psycopg2
+    fill : float, default=0.0
+        Value substituted for None
+
+    Returns
+    -------
+    np.ndarray
+        float64 array of the same length
+    """
+    return np.array([fill if v is None else float(v) for v in values], dtype=np.float64)
+
+
+def build_feature_arrays(rows: Sequence[Sequence[Any]],
+                         amenity_bits: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Convert similarity feature rows into NumPy columns.
+
+    NULL handling reproduces the truthiness checks of the pairwise loop:
+    missing ratings, amenity scores and prices become 0.0 (and are masked
+    out by the scoring rules), missing beds/baths/guests count as 0, and
+    missing bedrooms/clusters get a sentinel so that two NULLs still compare
+    equal while never matching a real value.
+
+    Parameters
+    ----------
+    rows : sequence of tuple
+        Rows of (listing_key, property_id, price_per_night, listing_rating,
+        bedrooms, beds, baths, guests_capacity, latitude, longitude,
+        location_cluster_id, overall_quality_score, amenity_score)
+    amenity_bits : np.ndarray, optional
+        Output of ``build_amenity_bitsets`` aligned with ``rows``. When
+        given, ``score_block`` scores amenities by Jaccard overlap of the
+        amenity sets instead of the ``amenity_score`` gap.
+
+    Returns
+    -------
+    dict of str to np.ndarray
+        Feature columns keyed by name, plus ``price_is_null`` to restore
+        NULL competitor prices (and ``amenity_bits``/``amenity_count`` if
+        amenity sets were given)
+    """
+    columns = list(zip(*rows)) if rows else [()] * 13
+    (keys, _, prices, ratings, bedrooms, beds, baths, guests,
+     lats, lons, clusters, _, amenities) = columns
+
+    features = {
+        'listing_key': np.array(keys, dtype=np.int64),
+        'price': _float_column(prices),
+        'price_is_null': np.array([p is None for p in prices], dtype=bool),
+        'rating': _float_column(ratings),
+        'bedrooms': np.array(
+            [NULL_BEDROOMS if b is None else b for b in bedrooms], dtype=np.int64
+        ),
+        'beds': _float_column(beds),
+        'baths': _float_column(baths),
+        'guests': _float_column(guests),
+        'latitude': _float_column(lats),
+        'longitude': _float_column(lons),
+        'cluster': np.array(
+            [NULL_CLUSTER if c is None else c for c in clusters], dtype=np.int64
+        ),
+        'amenity': _float_column(amenities),
+    }
+
+    if amenity_bits is not None:
+        features['amenity_bits'] = amenity_bits
+        features['amenity_count'] = popcount(amenity_bits).sum(axis=1)
+
+    return features
+
+
+def build_amenity_bitsets(n_rows: int, pairs: Iterable[Tuple[int, int]]) -> np.ndarray:
+    """
+    Pack per-listing amenity sets into uint64 bitsets.
+
+    Each distinct amenity_id gets one bit (in ascending id order), so a
+    listing's amenity set is a row of ``ceil(n_amenities / 64)`` words and
+    set overlap reduces to AND + popcount.
+
+    Parameters
+    ----------
+    n_rows : int
+        Number of listings (rows of the feature arrays)
+    pairs : iterable of tuple
+        (row_position, amenity_id) pairs; duplicates are harmless
+
+    Returns
+    -------
+    np.ndarray
+        uint64 array of shape (n_rows, n_words), at least one word wide
+    """
+    pairs = np.array(list(pairs), dtype=np.int64).reshape(-1, 2)
+    amenity_ids, bit = np.unique(pairs[:, 1], return_inverse=True)
+    n_words = max((len(amenity_ids) + 63) // 64, 1)
+
+    bits = np.zeros((n_rows, n_words), dtype=np.uint64)
+    np.bitwise_or.at(
+        bits, (pairs[:, 0], bit // 64),
+        np.left_shift(np.uint64(1), (bit % 64).astype(np.uint64))
+    )
+    return bits
+
+
+# Set bits per byte value, for NumPy versions without np.bitwise_count
+_BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def popcount(words: np.ndarray) -> np.ndarray:
+    """
+    Count set bits in each uint64 word.
+
+    Parameters
+    ----------
+    words : np.ndarray
+        uint64 array of any shape
+
+    Returns
+    -------
+    np.ndarray
+        int64 array of the same shape
+    """
+    words = np.ascontiguousarray(words, dtype=np.uint64)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).astype(np.int64)
+    per_byte = _BYTE_POPCOUNT[words.view(np.uint8)].reshape(words.shape + (8,))
+    return per_byte.sum(axis=-1, dtype=np.int64)
+
+
+def haversine_matrix(lat1: np.ndarray, lon1: np.ndarray,
+                     lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """
+    Calculate pairwise haversine distances between two coordinate sets.
+
+    Uses the same operation order as
+    ``DimensionalETL.calculate_haversine_distance`` so results are
+    bit-identical to the scalar version.
+
+    Parameters
+    ----------
+    lat1, lon1 : np.ndarray
+        Source coordinates, shape (m,)
+    lat2, lon2 : np.ndarray
+        Candidate coordinates, shape (n,) shared by every source or (m, n)
+        with one candidate row per source
+
+    Returns
+    -------
+    np.ndarray
+        Distance matrix in kilometers, shape (m, n)
+    """
+    lat1 = np.asarray(lat1, dtype=np.float64)[:, None]
+    lon1 = np.asarray(lon1, dtype=np.float64)[:, None]
+    lat2 = np.asarray(lat2, dtype=np.float64)
+    lon2 = np.asarray(lon2, dtype=np.float64)
+    if lat2.ndim == 1:
+        lat2, lon2 = lat2[None, :], lon2[None, :]
+
+    lat1_rad = np.radians(lat1)
+    lat2_rad = np.radians(lat2)
+    dlat = np.radians(lat2 - lat1)
+    dlon = np.radians(lon2 - lon1)
+
+    # float_power goes through libm pow() like the scalar ``x**2`` does;
+    # array ``**2`` is a plain square and can differ in the last bit
+    a = (np.float_power(np.sin(dlat/2), 2) +
+         np.cos(lat1_rad) * np.cos(lat2_rad) * np.float_power(np.sin(dlon/2), 2))
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
+
+    return EARTH_RADIUS_KM * c
+
+
+def score_block(features: Dict[str, np.ndarray], src_idx: np.ndarray,
+                cand_idx: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Calculate component and overall similarity for a block of listings.
+
+    Parameters
+    ----------
+    features : dict of str to np.ndarray
+        Output of ``build_feature_arrays``
+    src_idx : np.ndarray
+        Row positions of the source listings, shape (m,)
+    cand_idx : np.ndarray, optional
+        Row positions of the candidate listings, shape (n,) shared by every
+        source or (m, n) with one candidate row per source. Defaults to
+        every listing.
+
+    Returns
+    -------
+    dict of str to np.ndarray
+        ``location``, ``property``, ``quality``, ``amenity``, ``price`` and
+        ``overall`` score matrices, each of shape (m, n) on a 0-100 scale
+    """
+    if cand_idx is None:
+        cand_idx = np.arange(len(features['listing_key']))
+
+    def pair_column(column):
+        candidates = column[cand_idx]
+        if candidates.ndim == 1:
+            candidates = candidates[None, :]
+        return column[src_idx][:, None], candidates
+
+    def pair(name):
+        return pair_column(features[name])
+
+    # 1. Location Similarity (0-100)
+    cluster1, cluster2 = pair('cluster')
+    same_cluster_bonus = np.where(cluster1 == cluster2, 50, 0)
+    distance = haversine_matrix(
+        features['latitude'][src_idx], features['longitude'][src_idx],
+        features['latitude'][cand_idx], features['longitude'][cand_idx]
+    )
+    distance_score = 100 * np.exp(-distance / 2)
+    location_sim = np.minimum(same_cluster_bonus + distance_score, 100)
+
+    # 2. Property Similarity (0-100)
+    bed1, bed2 = pair('bedrooms')
+    guests1, guests2 = pair('guests')
+    beds1, beds2 = pair('beds')
+    bath1, bath2 = pair('baths')
+    bedroom_match = np.where(bed1 == bed2, 40, 0)
+    guest_diff = np.abs(guests1 - guests2)
+    guest_score = np.where(guest_diff <= 2, 30, np.maximum(0, 30 - guest_diff * 5))
+    bed_bath_diff = np.abs(beds1 - beds2) + np.abs(bath1 - bath2)
+    bed_bath_score = np.maximum(0, 30 - bed_bath_diff * 5)
+    property_sim = bedroom_match + guest_score + bed_bath_score
+
+    # 3. Quality Similarity (0-100), neutral if ratings missing
+    rating1, rating2 = pair('rating')
+    quality_sim = np.where(
+        (rating1 != 0) & (rating2 != 0),
+        np.maximum(0, 100 - np.abs(rating1 - rating2) * 20),
+        50.0
+    )
+
+    # 4. Amenity Similarity (0-100), neutral if scores/sets missing
+    if 'amenity_bits' in features:
+        # Jaccard overlap of the amenity sets, one bitset word at a time
+        count1, count2 = pair('amenity_count')
+        bits = features['amenity_bits']
+        shared = 0
+        for word in range(bits.shape[1]):
+            word1, word2 = pair_column(bits[:, word])
+            shared = shared + popcount(word1 & word2)
+        union = np.maximum(count1 + count2 - shared, 1)
+        amenity_sim = np.where(
+            (count1 != 0) & (count2 != 0),
+            shared / union * 100,
+            50.0
+        )
+    else:
+        amenity1, amenity2 = pair('amenity')
+        amenity_sim = np.where(
+            (amenity1 != 0) & (amenity2 != 0),
+            np.maximum(0, 100 - np.abs(amenity1 - amenity2) * 2),
+            50.0
+        )
+
+    # 5. Price Similarity (0-100), neutral if prices missing
+    price1, price2 = pair('price')
+    has_price = (price1 > 0) & (price2 != 0)
+    safe_price1 = np.where(price1 > 0, price1, 1.0)
+    price_diff_pct = np.abs(price1 - price2) / safe_price1 * 100
+    price_sim = np.where(has_price, np.maximum(0, 100 - price_diff_pct * 2), 50.0)
+
+    overall_sim = (
+        location_sim * LOCATION_WEIGHT +
+        property_sim * PROPERTY_WEIGHT +
+        quality_sim * QUALITY_WEIGHT +
+        amenity_sim * AMENITY_WEIGHT +
+        price_sim * PRICE_WEIGHT
+    )
+
+    return {
+        'location': location_sim.astype(np.float64),
+        'property': property_sim.astype(np.float64),
+        'quality': quality_sim.astype(np.float64),
+        'amenity': amenity_sim.astype(np.float64),
+        'price': price_sim.astype(np.float64),
+        'overall': overall_sim.astype(np.float64),
+    }
+
+
+def select_top_k(overall: np.ndarray, k: int) -> np.ndarray:
+    """
+    Select the top-k columns per row, ordered like a stable descending sort.
+
+    ``np.argpartition`` does the O(n) selection; rows where ties straddle
+    the k-th score fall back to a stable sort so the chosen competitors
+    match ``list.sort(reverse=True)`` (ties keep their original order).
+    Excluded pairs (e.g. self-comparisons) must be set to ``-np.inf``.
+
+    Parameters
+    ----------
+    overall : np.ndarray
+        Overall similarity matrix, shape (m, n)
+    k : int
+        Number of competitors to keep (must be <= n)
+
+    Returns
+    -------
+    np.ndarray
+        Column positions of the top-k competitors, shape (m, k), best first
+    """
+    m, n = overall.shape
+    if k <= 0 or m == 0:
+        return np.empty((m, 0), dtype=np.int64)
+
+    if k < n:
+        top = np.argpartition(-overall, k - 1, axis=1)[:, :k]
+    else:
+        top = np.tile(np.arange(n), (m, 1))
+    top_scores = np.take_along_axis(overall, top, axis=1)
+
+    # Rows with more candidates tied at the k-th score than slots left
+    kth_score = top_scores.min(axis=1)
+    tied = (overall >= kth_score[:, None]).sum(axis=1) > k
+    for row in np.flatnonzero(tied):
+        top[row] = np.argsort(-overall[row], kind='stable')[:k]
+    top_scores = np.take_along_axis(overall, top, axis=1)
+
+    # Order by score descending, then by original position
+    order = np.lexsort((top, -top_scores), axis=-1)
+    return np.take_along_axis(top, order, axis=1)
+
+
+class CandidateIndex:
+    """
+    Candidate generation stage for spatially pruned competitor search.
+
+    Location carries 35% of the overall score and ``100 * exp(-d/2)`` is
+    negligible beyond ~10 km, so a listing's competitors are drawn from its
+    nearest neighbours. Listings in the same ``location_cluster_id`` earn a
+    flat 50-point location bonus regardless of distance, so they are always
+    kept as candidates too.
+
+    Parameters
+    ----------
+    features : dict of str to np.ndarray
+        Output of ``build_feature_arrays``
+    n_neighbors : int, default=200
+        Number of nearest listings (haversine BallTree) per source
+
+    Attributes
+    ----------
+    tree : sklearn.neighbors.BallTree or None
+        Haversine ball tree over listing coordinates (radians), None
+        without listings
+    cluster_members : dict of int to np.ndarray
+        Sorted row positions of the listings in each location cluster
+    """
+
+    def __init__(self, features: Dict[str, np.ndarray], n_neighbors: int = 200):
+        self.features = features
+        self.n_listings = len(features['listing_key'])
+        self.n_neighbors = min(n_neighbors, self.n_listings)
+
+        self.coords = np.radians(
+            np.column_stack([features['latitude'], features['longitude']])
+        )
+        # BallTree rejects empty input; without listings there are no candidates
+        self.tree = BallTree(self.coords, metric='haversine') if self.n_listings else None
+
+        clusters = features['cluster']
+        self.cluster_members = {
+            int(cluster_id): np.flatnonzero(clusters == cluster_id)
+            for cluster_id in np.unique(clusters)
+        }
+
+    def candidates(self, src_idx: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Build the padded candidate matrix for a block of source listings.
+
+        Parameters
+        ----------
+        src_idx : np.ndarray
+            Row positions of the source listings, shape (m,)
+
+        Returns
+        -------
+        cand_idx : np.ndarray
+            Candidate row positions, shape (m, w), ascending per row so
+            column order matches the exhaustive tie-break order
+        valid : np.ndarray
+            Boolean mask of real candidates (False for padding), shape (m, w)
+        """
+        if len(src_idx) == 0 or self.n_neighbors == 0:
+            empty = np.empty((len(src_idx), 0), dtype=np.int64)
+            return empty, empty.astype(bool)
+
+        _, neighbors = self.tree.query(self.coords[src_idx], k=self.n_neighbors)
+
+        rows = []
+        for source, nearest in zip(src_idx, neighbors):
+            members = self.cluster_members[int(self.features['cluster'][source])]
+            row = np.union1d(nearest, members)
+            rows.append(row[row != source])
+
+        width = max(len(row) for row in rows)
+        cand_idx = np.zeros((len(rows), width), dtype=np.int64)
+        valid = np.zeros((len(rows), width), dtype=bool)
+        for i, row in enumerate(rows):
+            cand_idx[i, :len(row)] = row
+            valid[i, :len(row)] = True
+
+        return cand_idx, valid
+
+
+def iter_competitor_blocks(features: Dict[str, np.ndarray], top_k: int = 25,
+                           block_size: int = 512,
+                           candidate_index: Optional[CandidateIndex] = None,
+                           src_idx: Optional[np.ndarray] = None) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Score all listings against each other, one block of sources at a time.
+
+    Memory is bounded by ``block_size × n_listings`` per score matrix, or
+    ``block_size × n_candidates`` when a candidate index is used.
+
+    Parameters
+    ----------
+    features : dict of str to np.ndarray
+        Output of ``build_feature_arrays``
+    top_k : int, default=25
+        Number of competitors per listing
+    block_size : int, default=512
+        Number of source listings scored per block
+    candidate_index : CandidateIndex, optional
+        Restrict exact scoring to each source's spatial candidates. Scores
+        every listing (exhaustive mode) if not provided.
+    src_idx : np.ndarray, optional
+        Row positions of the source listings to score. Defaults to all.
+
+    Yields
+    ------
+    dict of str to np.ndarray
+        ``source`` (m,), ``competitor`` (m, k) row positions, the component
+        and overall scores of the selected pairs (m, k) and ``weight``
+        (m, k), the overall score normalized by the per-listing total
+    """
+    n = len(features['listing_key'])
+    k = max(min(top_k, n - 1), 0)
+    if src_idx is None:
+        src_idx = np.arange(n)
+
+    for start in range(0, len(src_idx), block_size):
+        block_idx = src_idx[start:start + block_size]
+
+        if candidate_index is None:
+            cand_idx = np.arange(n)
+            scores = score_block(features, block_idx)
+            # Skip self-comparison
+            scores['overall'][np.arange(len(block_idx)), block_idx] = -np.inf
+        else:
+            cand_idx, valid = candidate_index.candidates(block_idx)
+            scores = score_block(features, block_idx, cand_idx)
+            scores['overall'][~valid] = -np.inf
+
+        top = select_top_k(scores['overall'], k)
+        if cand_idx.ndim == 1:
+            competitor = cand_idx[top]
+        else:
+            competitor = np.take_along_axis(cand_idx, top, axis=1)
+
+        block = {'source': block_idx, 'competitor': competitor}
+        for name, matrix in scores.items():
+            block[name] = np.take_along_axis(matrix, top, axis=1)
+
+        # Python's sum() in rank order, so weights round exactly like the loop
+        # (CPython >= 3.12 uses compensated summation for floats)
+        total_similarity = np.array(
+            [sum(row) for row in block['overall'].tolist()], dtype=np.float64
+        )
+
+        safe_total = np.where(total_similarity > 0, total_similarity, 1.0)
+        block['weight'] = np.where(
+            (total_similarity > 0)[:, None],
+            block['overall'] / safe_total[:, None],
+            1 / 25
+        )
+        yield block
+
+
+def check_candidate_recall(features: Dict[str, np.ndarray],
+                           candidate_index: CandidateIndex, top_k: int = 25,
+                           sample_size: int = 100, seed: int = 42) -> float:
+    """
+    Measure how many exhaustive top-k competitors the pruned search keeps.
+
+    Scores a random sample of listings both exhaustively and through the
+    candidate index and compares the resulting (competitor, rank) lists.
+
+    Parameters
+    ----------
+    features : dict of str to np.ndarray
+        Output of ``build_feature_arrays``
+    candidate_index : CandidateIndex
+        Candidate generation stage under test
+    top_k : int, default=25
+        Number of competitors per listing
+    sample_size : int, default=100
+        Number of source listings to check (all listings if larger)
+    seed : int, default=42
+        Random seed for the sample
+
+    Returns
+    -------
+    float
+        Fraction of exhaustive (competitor, rank) pairs reproduced by the
+        pruned search; 1.0 means the sampled top-k lists are unchanged
+    """
+    n = len(features['listing_key'])
+    if n <= 1 or sample_size <= 0:
+        return 1.0
+
+    rng = np.random.default_rng(seed)
+    sample = np.sort(rng.choice(n, size=min(sample_size, n), replace=False))
+
+    exhaustive = np.concatenate([
+        block['competitor'] for block in
+        iter_competitor_blocks(features, top_k, src_idx=sample)
+    ])
+    pruned = np.concatenate([
+        block['competitor'] for block in
+        iter_competitor_blocks(features, top_k, candidate_index=candidate_index,
+                               src_idx=sample)
+    ])
+
+    return float((exhaustive == pruned).mean())
+
+
+def find_affected_sources(features: Dict[str, np.ndarray], delta_idx: np.ndarray,
+                          thresholds: np.ndarray, block_size: int = 512) -> np.ndarray:
+    """
+    Find listings whose current top-k list a new or changed listing can enter.
+
+    Every listing is scored against the delta listings only (n × |delta|),
+    and flagged when any delta listing scores at least its current k-th
+    competitor score.
+
+    Parameters
+    ----------
+    features : dict of str to np.ndarray
+        Output of ``build_feature_arrays``
+    delta_idx : np.ndarray
+        Row positions of the new or changed listings
+    thresholds : np.ndarray
+        Lowest overall score in each listing's current top-k list, shape (n,);
+        ``-np.inf`` for listings whose list has fewer than k competitors
+    block_size : int, default=512
+        Number of source listings scored per block
+
+    Returns
+    -------
+    np.ndarray
+        Boolean mask of affected listings, shape (n,)
+    """
+    n = len(features['listing_key'])
+    affected = np.zeros(n, dtype=bool)
+    if len(delta_idx) == 0:
+        return affected
+
+    for start in range(0, n, block_size):
+        src_idx = np.arange(start, min(start + block_size, n))
+        overall = score_block(features, src_idx, delta_idx)['overall']
+        # A listing never competes with itself
+        overall[src_idx[:, None] == delta_idx[None, :]] = -np.inf
+        affected[src_idx] = (overall >= thresholds[src_idx, None]).any(axis=1)
+
+    return affected
+
+
+def blocks_to_records(features: Dict[str, np.ndarray],
+                      blocks: Iterator[Dict[str, np.ndarray]]) -> List[Dict[str, Any]]:
+    """
+    Convert scored blocks into the records expected by the bridge loader.
+
+    Parameters
+    ----------
+    features : dict of str to np.ndarray
+        Output of ``build_feature_arrays``
+    blocks : iterator of dict
+        Output of ``iter_competitor_blocks``
+
+    Returns
+    -------
+    list of dict
+        One record per (listing, competitor) with keys ``listing_key``,
+        ``competitor_key``, ``rank``, ``weight``, ``competitor_price`` and
+        the ``*_similarity`` component scores
+    """
+    keys = features['listing_key']
+    prices = features['price']
+    price_is_null = features['price_is_null']
+    records = []
+
+    for block in blocks:
+        src_keys = keys[block['source']].tolist()
+        comp_idx = block['competitor']
+        comp_keys = keys[comp_idx].tolist()
+        comp_prices = prices[comp_idx].tolist()
+        comp_null = price_is_null[comp_idx].tolist()
+        columns = {
+            name: block[name].tolist()
+            for name in ('overall', 'location', 'property', 'quality',
+                         'amenity', 'price', 'weight')
+        }
+
+        for row, listing_key in enumerate(src_keys):
+            for rank in range(comp_idx.shape[1]):
+                records.append({
+                    'listing_key': listing_key,
+                    'competitor_key': comp_keys[row][rank],
+                    'overall_similarity': columns['overall'][row][rank],
+                    'location_similarity': columns['location'][row][rank],
+                    'property_similarity': columns['property'][row][rank],
+                    'quality_similarity': columns['quality'][row][rank],
+                    'amenity_similarity': columns['amenity'][row][rank],
+                    'price_similarity': columns['price'][row][rank],
+                    'competitor_price': None if comp_null[row][rank] else comp_prices[row][rank],
+                    'rank': rank + 1,
+                    'weight': columns['weight'][row][rank],
+                })
+
+    return records
+
+
+def block_to_bridge_values(features: Dict[str, np.ndarray],
+                           block: Dict[str, np.ndarray]) -> List[Tuple]:
+    """
+    Convert one scored block into ``bridge_listing_competitors`` row tuples.
+
+    Values are rounded exactly like ``load_bridge_listing_competitors``.
+
+    Parameters
+    ----------
+    features : dict of str to np.ndarray
+        Output of ``build_feature_arrays``
+    block : dict of str to np.ndarray
+        One block yielded by ``iter_competitor_blocks``
+
+    Returns
+    -------
+    list of tuple
+        Rows of (listing_key, competitor_listing_key, similarity_rank,
+        overall, location, property, quality, amenity, price, weight)
+    """
+    keys = features['listing_key']
+    src_keys = keys[block['source']].tolist()
+    comp_keys = keys[block['competitor']].tolist()
+    columns = [
+        block[name].tolist()
+        for name in ('overall', 'location', 'property', 'quality', 'amenity', 'price')
+    ]
+    weights = block['weight'].tolist()
+
+    values = []
+    for row, listing_key in enumerate(src_keys):
+        for rank in range(len(comp_keys[row])):
+            values.append(
+                (listing_key, comp_keys[row][rank], rank + 1)
+                + tuple(round(column[row][rank], 2) for column in columns)
+                + (round(weights[row][rank], 4),)
+            )
+    return values
+
+
+# Per-process state of shard workers (set by _init_shard_worker)
+_SHARD_STATE: Dict[str, Any] = {}
+
+
+def _init_shard_worker(feature_dir: str, n_neighbors: Optional[int]):
+    """
+    Attach a worker process to the memory-mapped feature arrays.
+
+    Parameters
+    ----------
+    feature_dir : str
+        Directory holding one ``<name>.npy`` file per feature column
+    n_neighbors : int or None
+        Build a CandidateIndex with this many neighbours (spatial mode), or
+        None for exhaustive scoring
+    """
+    features = {
+        filename[:-4]: np.load(os.path.join(feature_dir, filename), mmap_mode='r')
+        for filename in os.listdir(feature_dir)
+        if filename.endswith('.npy')
+    }
+    _SHARD_STATE['features'] = features
+    _SHARD_STATE['candidate_index'] = (
+        CandidateIndex(features, n_neighbors=n_neighbors) if n_neighbors else None
+    )
+
+
+def _score_shard(src_start: int, src_stop: int, top_k: int, block_size: int) -> List[Tuple]:
+    """
+    Score one shard of source listings inside a worker process.
+
+    Parameters
+    ----------
+    src_start, src_stop : int
+        Row range of the source listings in this shard
+    top_k : int
+        Number of competitors per listing
+    block_size : int
+        Number of source listings scored per block
+
+    Returns
+    -------
+    list of tuple
+        Bridge-table rows for the shard (see ``block_to_bridge_values``)
+    """
+    features = _SHARD_STATE['features']
+    blocks = iter_competitor_blocks(
+        features, top_k, block_size,
+        candidate_index=_SHARD_STATE['candidate_index'],
+        src_idx=np.arange(src_start, src_stop)
+    )
+    return [value for block in blocks for value in block_to_bridge_values(features, block)]
+
+
+def iter_parallel_bridge_values(features: Dict[str, np.ndarray], top_k: int = 25,
+                                block_size: int = 512, workers: int = 4,
+                                shard_size: int = 1000,
+                                n_neighbors: Optional[int] = None) -> Iterator[List[Tuple]]:
+    """
+    Score listings across worker processes and stream bridge rows in batches.
+
+    Feature arrays are written once to ``.npy`` files and memory-mapped
+    read-only by every worker, so they are shared through the OS page cache
+    instead of being copied per process. Source listings are split into
+    shards of ``shard_size``; at most two shards per worker are in flight,
+    so peak memory stays flat as the number of listings grows.
+
+    Parameters
+    ----------
+    features : dict of str to np.ndarray
+        Output of ``build_feature_arrays``
+    top_k : int, default=25
+        Number of competitors per listing
+    block_size : int, default=512
+        Number of source listings scored per block inside a worker
+    workers : int, default=4
+        Number of worker processes
+    shard_size : int, default=1000
+        Number of source listings per shard (one yielded batch per shard)
+    n_neighbors : int, optional
+        Use spatial candidate pruning with this many neighbours
+
+    Yields
+    ------
+    list of tuple
+        Bridge-table rows of one shard, in completion order
+    """
+    n = len(features['listing_key'])
+
+    with tempfile.TemporaryDirectory(prefix='similarity_features_') as feature_dir:
+        for name, column in features.items():
+            np.save(os.path.join(feature_dir, f'{name}.npy'), column)
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_shard_worker,
+            initargs=(feature_dir, n_neighbors)
+        ) as pool:
+            shards = iter(range(0, n, shard_size))
+            pending = set()
+
+            def submit_next() -> bool:
+                start = next(shards, None)
+                if start is None:
+                    return False
+                pending.add(pool.submit(
+                    _score_shard, start, min(start + shard_size, n), top_k, block_size
+                ))
+                return True
+
+            for _ in range(workers * 2):
+                if not submit_next():
+                    break
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.discard(future)
+                    submit_next()
+                    yield future.result()
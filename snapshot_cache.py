@@ -0,0 +1,316 @@
+"""
+Snapshot Cache
+==============
+
+Persistent, content-addressed cache of BrightData snapshot results. Every
+scrape request is normalized (location or URL, country, currency,
+``limit_per_input`` and output fields) and hashed; the listings of the
+snapshot that answered it are stored as gzip-compressed NDJSON under that
+hash. Repeating a request within the freshness TTL is served from disk
+without an API round trip.
+
+The cache directory holds one file per request plus ``index.json``, which
+maps every request hash to its snapshot, file, size and timestamps and every
+snapshot_id to its file. Entries older than the TTL are removed when they are
+looked up or when another request is stored; past ``max_bytes``, the least
+recently used entries are evicted as well.
+
+Classes
+-------
+SnapshotCache : Request-keyed store of snapshot listings
+
+Functions
+---------
+normalize_request : Canonical form of a scrape request
+request_key : SHA-256 hash of a normalized request
+
+Example
+-------
+>>> cache = SnapshotCache('Resources/snapshot_cache', ttl=24 * 3600)
+>>> request = normalize_request('location', 'Beltline, Calgary', 'CA', 'CAD', 100, fields)
+>>> cached = cache.get(request)
+>>> if cached is None:
+...     cache.put(request, snapshot_id, listings)
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 24 * 3600  # Seconds a cached snapshot stays fresh
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024  # Cache size before eviction (500 MB)
+INDEX_FILE = 'index.json'  # Index of request hashes and snapshot IDs
+
+
+def _normalize_url(url: str) -> str:
+    """Lower-case scheme and host, drop the fragment and trailing slash, sort the query."""
+    parts = urlsplit(url.strip())
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), query, ''))
+
+
+def normalize_request(kind: str, value: str, country: Optional[str], currency: Optional[str],
+                      limit_per_input: Optional[int], custom_output_fields: Iterable[str]) -> Dict[str, Any]:
+    """
+    Build the canonical form of a scrape request.
+
+    Locations are case- and whitespace-insensitive, URLs are normalized
+    (see ``_normalize_url``) and the output fields are order-insensitive.
+
+    Parameters
+    ----------
+    kind : str
+        'location' or 'url'
+    value : str
+        Location searched or listing URL
+    country, currency : str or None
+        Country and currency codes sent with the request
+    limit_per_input : int or None
+        Listing limit (location requests)
+    custom_output_fields : iterable of str
+        Requested output fields
+
+    Returns
+    -------
+    dict
+        JSON-serializable request description
+    """
+    if kind == 'location':
+        value = re.sub(r'\s+', ' ', value).strip().casefold()
+    elif kind == 'url':
+        value = _normalize_url(value)
+    else:
+        raise ValueError(f"Unknown request kind: {kind}. Must be 'location' or 'url'")
+
+    return {
+        'kind': kind,
+        'value': value,
+        'country': country.upper() if country else None,
+        'currency': currency.upper() if currency else None,
+        'limit_per_input': int(limit_per_input) if limit_per_input is not None else None,
+        'custom_output_fields': sorted(set(custom_output_fields)),
+    }
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    """
+    Hash a normalized request.
+
+    Parameters
+    ----------
+    request : dict
+        Output of ``normalize_request``
+
+    Returns
+    -------
+    str
+        Hex SHA-256 of the request's canonical JSON
+    """
+    canonical = json.dumps(request, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class SnapshotCache:
+    """
+    Request-keyed, size-bounded store of snapshot listings.
+
+    Parameters
+    ----------
+    directory : str
+        Cache directory (created on first write)
+    ttl : float, default=DEFAULT_TTL
+        Seconds a snapshot stays fresh
+    max_bytes : int, default=DEFAULT_MAX_BYTES
+        Total size of the cached files before eviction
+    """
+
+    def __init__(self, directory: str, ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.index = self._load_index()
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        """Read index.json, or start empty if it is missing or unreadable."""
+        path = os.path.join(self.directory, INDEX_FILE)
+        if not os.path.exists(path):
+            return {'entries': {}, 'snapshots': {}}
+        try:
+            with open(path) as f:
+                index = json.load(f)
+            return {'entries': dict(index['entries']), 'snapshots': dict(index['snapshots'])}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable snapshot cache index {path}: {e}")
+            return {'entries': {}, 'snapshots': {}}
+
+    def _save_index(self):
+        """Write index.json atomically."""
+        path = os.path.join(self.directory, INDEX_FILE)
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(f"{path}.tmp", path)
+
+    def _remove(self, key: str):
+        """Drop an entry and its file from the index and disk."""
+        entry = self.index['entries'].pop(key)
+        if self.index['snapshots'].get(entry['snapshot_id']) == entry['file']:
+            del self.index['snapshots'][entry['snapshot_id']]
+        try:
+            os.remove(os.path.join(self.directory, entry['file']))
+        except FileNotFoundError:
+            pass
+
+    def get(self, request: Dict[str, Any], max_age: Optional[float] = None) -> Optional[Tuple[str, str]]:
+        """
+        Look up the snapshot that answered a request.
+
+        Parameters
+        ----------
+        request : dict
+            Output of ``normalize_request``
+        max_age : float, optional
+            Freshness in seconds for this lookup (default: the cache TTL)
+
+        Returns
+        -------
+        tuple of (str, str) or None
+            Snapshot ID and path of its gzip NDJSON listings file, or None if
+            the request is not cached or the entry is stale (entries older
+            than the cache TTL are removed)
+        """
+        max_age = self.ttl if max_age is None else max_age
+        key = request_key(request)
+        with self._lock:
+            entry = self.index['entries'].get(key)
+            if entry is None:
+                return None
+            age = time.time() - entry['created_at']
+            if age > max_age:
+                if age > self.ttl:
+                    self._remove(key)
+                    self._save_index()
+                return None
+            path = os.path.join(self.directory, entry['file'])
+            if not os.path.exists(path):
+                self._remove(key)
+                self._save_index()
+                return None
+            entry['last_access'] = time.time()
+            self._save_index()
+            return entry['snapshot_id'], path
+
+    def put(self, request: Dict[str, Any], snapshot_id: str, listings: Iterable[Dict]) -> str:
+        """
+        Store the listings of the snapshot that answered a request.
+
+        Listings are written one line at a time, so an iterator (e.g. a
+        streamed snapshot) is never materialized.
+
+        Parameters
+        ----------
+        request : dict
+            Output of ``normalize_request``
+        snapshot_id : str
+            Snapshot that answered the request
+        listings : iterable of dict
+            Snapshot listings
+
+        Returns
+        -------
+        str
+            Path of the cached gzip NDJSON file
+        """
+        key = request_key(request)
+        filename = f"{key}.ndjson.gz"
+        path = os.path.join(self.directory, filename)
+        os.makedirs(self.directory, exist_ok=True)
+
+        count = 0
+        with gzip.open(f"{path}.part", 'wt', encoding='utf-8') as f:
+            for listing in listings:
+                f.write(json.dumps(listing))
+                f.write('\n')
+                count += 1
+        os.replace(f"{path}.part", path)
+
+        now = time.time()
+        with self._lock:
+            # A refreshed request replaces the file of its previous snapshot
+            previous = self.index['entries'].get(key)
+            if previous is not None and self.index['snapshots'].get(previous['snapshot_id']) == filename:
+                del self.index['snapshots'][previous['snapshot_id']]
+            self.index['entries'][key] = {
+                'snapshot_id': snapshot_id,
+                'file': filename,
+                'size': os.path.getsize(path),
+                'listings': count,
+                'created_at': now,
+                'last_access': now,
+                'request': request,
+            }
+            self.index['snapshots'][snapshot_id] = filename
+            self._evict(keep=key)
+            self._save_index()
+        return path
+
+    def path_for_snapshot(self, snapshot_id: str) -> Optional[str]:
+        """
+        Find the cached file of a snapshot.
+
+        Parameters
+        ----------
+        snapshot_id : str
+            Snapshot ID
+
+        Returns
+        -------
+        str or None
+            Path of the gzip NDJSON listings file, None if not cached
+        """
+        with self._lock:
+            filename = self.index['snapshots'].get(snapshot_id)
+        path = os.path.join(self.directory, filename) if filename else None
+        return path if path and os.path.exists(path) else None
+
+    def _evict(self, keep: Optional[str] = None) -> List[str]:
+        """
+        Evict expired entries, then least recently used ones until under max_bytes.
+
+        Parameters
+        ----------
+        keep : str, optional
+            Request hash never evicted (the entry just written)
+
+        Returns
+        -------
+        list of str
+            Snapshot IDs evicted
+        """
+        entries = self.index['entries']
+        now = time.time()
+        evicted = []
+        for key in [k for k, entry in entries.items() if k != keep and now - entry['created_at'] > self.ttl]:
+            evicted.append(entries[key]['snapshot_id'])
+            self._remove(key)
+
+        total = sum(entry['size'] for entry in entries.values())
+        candidates = sorted((key for key in entries if key != keep), key=lambda k: entries[k]['last_access'])
+        for key in candidates:
+            if total <= self.max_bytes:
+                break
+            total -= entries[key]['size']
+            evicted.append(entries[key]['snapshot_id'])
+            self._remove(key)
+        if evicted:
+            logger.info(f"Evicted {len(evicted)} cached snapshots ({total / 1e6:.1f} MB kept)")
+        return evicted
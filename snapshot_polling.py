@@ -0,0 +1,286 @@
+"""
+Snapshot Polling
+================
+
+Adaptive polling schedule for BrightData snapshots. Instead of checking every
+fixed interval up to a retry count, checks start short and grow geometrically
+(with jitter, so concurrent pollers drift apart) up to a cap, until a total
+deadline. ``Retry-After`` headers on 429/5xx responses are honoured.
+
+How long a snapshot takes depends mostly on the kind of scrape: a single URL
+is ready in a minute or two, a location discovery in 10-30 minutes.
+``ReadyTimeHistogram`` keeps a histogram of observed time-to-ready per dataset
+type and tunes the schedule from it: the first check waits until the fastest
+snapshots of that type were ready, and the starting interval scales with the
+typical time-to-ready.
+
+Classes
+-------
+PollSchedule : Backoff schedule with jitter, cap and deadline
+ReadyTimeHistogram : Time-to-ready histograms per dataset type
+
+Functions
+---------
+retry_after_seconds : Delay requested by the Retry-After header of a 429/5xx response
+
+Example
+-------
+>>> ready_times = ReadyTimeHistogram('Resources/snapshot_ready_times.json')
+>>> schedule = ready_times.schedule('url', timeout=1800)
+>>> delay = schedule.first_delay
+>>> while delay is not None:
+...     time.sleep(delay)
+...     if check():
+...         ready_times.record('url', schedule.elapsed())
+...         break
+...     delay = schedule.next_delay()
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INITIAL_INTERVAL = 5.0  # Seconds between the first checks without history
+MIN_INITIAL_INTERVAL = 2.0  # Floor for tuned starting intervals (seconds)
+MAX_INTERVAL = 60.0  # Cap on the interval between checks (seconds)
+BACKOFF_FACTOR = 1.5  # Interval growth after each check
+JITTER = 0.2  # Random +/- fraction applied to each interval
+READY_BUCKETS = (15, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200)  # Time-to-ready bucket upper bounds (seconds)
+MIN_SAMPLES = 5  # Observations per dataset type before tuning the schedule
+FIRST_CHECK_QUANTILE = 0.1  # No check before the fastest 10% were ready
+INTERVAL_FRACTION = 0.1  # Starting interval as fraction of the median time-to-ready
+
+
+def retry_after_seconds(response: Optional[requests.Response]) -> Optional[float]:
+    """
+    Read the delay requested by a 429/5xx response's Retry-After header.
+
+    Parameters
+    ----------
+    response : requests.Response or None
+        Failed response (e.g. ``HTTPError.response``)
+
+    Returns
+    -------
+    float or None
+        Seconds to wait, or None if the response is not a 429/5xx or has no
+        valid Retry-After (delta-seconds or HTTP-date)
+    """
+    if response is None or (response.status_code != 429 and response.status_code < 500):
+        return None
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class PollSchedule:
+    """
+    Polling delays that grow geometrically with jitter up to a cap and deadline.
+
+    Parameters
+    ----------
+    timeout : float
+        Total seconds to keep polling, counted from construction
+    initial_interval : float, default=DEFAULT_INITIAL_INTERVAL
+        Delay after the first unsuccessful check
+    first_delay : float, default=0.0
+        Delay before the first check (clipped to the timeout)
+    backoff_factor : float, default=BACKOFF_FACTOR
+        Interval growth after each check
+    max_interval : float, default=MAX_INTERVAL
+        Cap on the interval (a longer Retry-After is still honoured)
+    jitter : float, default=JITTER
+        Random +/- fraction applied to each interval
+    rng : random.Random, optional
+        Random source for the jitter
+    clock : callable, default=time.monotonic
+        Clock returning seconds
+
+    Attributes
+    ----------
+    interval : float
+        Interval the next delay is based on
+    """
+
+    def __init__(self, timeout: float, initial_interval: float = DEFAULT_INITIAL_INTERVAL,
+                 first_delay: float = 0.0, backoff_factor: float = BACKOFF_FACTOR,
+                 max_interval: float = MAX_INTERVAL, jitter: float = JITTER,
+                 rng: Optional[random.Random] = None, clock: Callable[[], float] = time.monotonic):
+        if timeout <= 0:
+            raise ValueError(f"timeout must be positive, got {timeout}")
+        if backoff_factor < 1:
+            raise ValueError(f"backoff_factor must be at least 1, got {backoff_factor}")
+
+        self.clock = clock
+        self.start = clock()
+        self.deadline = self.start + timeout
+        self.first_delay = min(max(0.0, first_delay), timeout)
+        self.interval = min(initial_interval, max_interval)
+        self.backoff_factor = backoff_factor
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.rng = rng or random.Random()
+
+    def elapsed(self) -> float:
+        """Seconds since the schedule started."""
+        return self.clock() - self.start
+
+    def next_delay(self, retry_after: Optional[float] = None) -> Optional[float]:
+        """
+        Compute the delay before the next check and advance the backoff.
+
+        Parameters
+        ----------
+        retry_after : float, optional
+            Delay requested by the server (see ``retry_after_seconds``)
+
+        Returns
+        -------
+        float or None
+            Seconds to wait, clipped so the last check happens at the
+            deadline; None once the deadline has passed
+        """
+        remaining = self.deadline - self.clock()
+        if remaining <= 0:
+            return None
+
+        delay = self.interval * (1 + self.jitter * self.rng.uniform(-1, 1))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        self.interval = min(self.interval * self.backoff_factor, self.max_interval)
+        return min(delay, remaining)
+
+
+class ReadyTimeHistogram:
+    """
+    Histograms of snapshot time-to-ready per dataset type.
+
+    Observations are counted in the ``READY_BUCKETS`` buckets (plus one
+    overflow bucket) and optionally persisted as JSON, so the schedule keeps
+    tuning itself across runs.
+
+    Parameters
+    ----------
+    path : str, optional
+        JSON file to load the histograms from and save them to
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.counts: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    stored = json.load(f)
+                if stored.get('buckets') == list(READY_BUCKETS):
+                    self.counts = {name: list(counts) for name, counts in stored['counts'].items()}
+            except (OSError, ValueError, KeyError, AttributeError) as e:
+                logger.warning(f"Ignoring unreadable ready-time histograms {path}: {e}")
+
+    def record(self, dataset_type: str, seconds: float):
+        """
+        Add one time-to-ready observation and save the histograms.
+
+        Parameters
+        ----------
+        dataset_type : str
+            Kind of scrape (e.g. 'url' or 'location')
+        seconds : float
+            Seconds from trigger to ready output
+        """
+        bucket = next((i for i, bound in enumerate(READY_BUCKETS) if seconds <= bound), len(READY_BUCKETS))
+        with self._lock:
+            counts = self.counts.setdefault(dataset_type, [0] * (len(READY_BUCKETS) + 1))
+            counts[bucket] += 1
+            if self.path:
+                try:
+                    os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                    with open(self.path, 'w') as f:
+                        json.dump({'buckets': list(READY_BUCKETS), 'counts': self.counts}, f, indent=2)
+                except OSError as e:
+                    logger.warning(f"Could not save ready-time histograms to {self.path}: {e}")
+
+    def quantile_bucket(self, dataset_type: str, q: float) -> Optional[int]:
+        """
+        Find the bucket holding the q-quantile of a dataset type's ready times.
+
+        Parameters
+        ----------
+        dataset_type : str
+            Kind of scrape
+        q : float
+            Quantile between 0 and 1
+
+        Returns
+        -------
+        int or None
+            Bucket index, or None with fewer than MIN_SAMPLES observations
+        """
+        counts = self.counts.get(dataset_type)
+        total = sum(counts) if counts else 0
+        if total < MIN_SAMPLES:
+            return None
+        cumulative = 0
+        for bucket, count in enumerate(counts):
+            cumulative += count
+            if cumulative >= q * total:
+                return bucket
+        return len(counts) - 1
+
+    def schedule(self, dataset_type: str, timeout: float, **kwargs) -> PollSchedule:
+        """
+        Build a poll schedule tuned to a dataset type's observed ready times.
+
+        The first check waits until the lower edge of the bucket holding the
+        FIRST_CHECK_QUANTILE of ready times; the starting interval is
+        INTERVAL_FRACTION of the median bucket's upper bound. Without enough
+        history the defaults apply.
+
+        Parameters
+        ----------
+        dataset_type : str
+            Kind of scrape
+        timeout : float
+            Total seconds to keep polling
+        **kwargs
+            Other ``PollSchedule`` arguments
+
+        Returns
+        -------
+        PollSchedule
+            Schedule starting now
+        """
+        first_bucket = self.quantile_bucket(dataset_type, FIRST_CHECK_QUANTILE)
+        median_bucket = self.quantile_bucket(dataset_type, 0.5)
+        if first_bucket is not None:
+            kwargs.setdefault('first_delay', READY_BUCKETS[first_bucket - 1] if first_bucket > 0 else 0.0)
+            median = READY_BUCKETS[min(median_bucket, len(READY_BUCKETS) - 1)]
+            kwargs.setdefault('initial_interval', min(
+                max(median * INTERVAL_FRACTION, MIN_INITIAL_INTERVAL),
+                kwargs.get('max_interval', MAX_INTERVAL)
+            ))
+        return PollSchedule(timeout, **kwargs)
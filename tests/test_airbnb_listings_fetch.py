@@ -0,0 +1,282 @@
+"""
+Tests for the concurrent fetching and polling of airbnb_listings_fetch.
+
+The BrightData dataset API is replaced by a local ``http.server`` stub of
+``/trigger`` and ``/snapshot/{id}``: every snapshot becomes ready a fixed
+time after its trigger, inputs can be made to fail, go missing or error, and
+snapshots can answer 429 with a Retry-After header. ``format=ndjson``
+requests get one listing per line, like the real API.
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import airbnb_listings_fetch
+from snapshot_cache import SnapshotCache
+from snapshot_polling import ReadyTimeHistogram
+
+REPO_ROOT = os.path.join(os.path.dirname(__file__), '..')
+POLL_INTERVAL = 0.1
+LISTINGS_PER_LOCATION = 3
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Stub of the BrightData dataset API (see StubServer)."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, body, headers=None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/datasets/v3/trigger':
+            return self.send_json(404, {'error': 'not found'})
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        keys = [item.get('location') or item.get('url') for item in body['input']]
+        if any('BAD' in key for key in keys):
+            return self.send_json(400, {'error': 'invalid input'})
+        self.send_json(200, {'snapshot_id': self.server.trigger(body['input'], keys)})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        snapshot_id = url.path.rsplit('/', 1)[-1]
+        snapshot = self.server.snapshots.get(snapshot_id)
+        if snapshot is None:
+            return self.send_json(404, {'error': 'unknown snapshot'})
+
+        with self.server.lock:
+            snapshot['polls'].append(time.monotonic())
+            throttled = snapshot['throttle'] > 0
+            snapshot['throttle'] -= throttled
+        if throttled:
+            return self.send_json(429, {'error': 'rate limited'}, {'Retry-After': '1'})
+        if time.monotonic() < snapshot['ready_at']:
+            return self.send_json(202, {'status': 'running'})
+        output = snapshot_output(snapshot['inputs'])
+        if parse_qs(url.query).get('format') != ['ndjson']:
+            return self.send_json(200, output)
+
+        payload = ''.join(json.dumps(record) + '\n' for record in output).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def snapshot_output(inputs):
+    """Listings for each input: missing/error URLs by name, three listings per location."""
+    output = []
+    for item in inputs:
+        if 'url' in item:
+            if 'missing' in item['url']:
+                continue
+            if 'error' in item['url']:
+                output.append({'error': 'Page not found', 'error_code': 'dead_page', 'input': item})
+                continue
+            output.append({'property_id': airbnb_listings_fetch.listing_id_from_url(item['url']),
+                           'name': item['url'], 'input': item})
+        else:
+            output += [{'property_id': f"{item['location']}-{i}", 'name': item['location']}
+                       for i in range(LISTINGS_PER_LOCATION)]
+    return output
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    Stub server whose snapshots are ready ``delays[input]`` seconds after the
+    trigger (the slowest input of a snapshot counts) and answer 429 to the
+    first ``throttle[input]`` polls.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.delays = {}
+        self.throttle = {}
+        self.snapshots = {}
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/datasets/v3"
+
+    def trigger(self, inputs, keys):
+        with self.lock:
+            snapshot_id = f"s_{len(self.snapshots) + 1}"
+            self.snapshots[snapshot_id] = {
+                'inputs': inputs,
+                'ready_at': time.monotonic() + max(self.delays.get(key, 0.0) for key in keys),
+                'throttle': max(self.throttle.get(key, 0) for key in keys),
+                'polls': [],
+            }
+        return snapshot_id
+
+
+@pytest.fixture
+def server():
+    stub = StubServer()
+    thread = threading.Thread(target=stub.serve_forever, daemon=True)
+    thread.start()
+    yield stub
+    stub.shutdown()
+    stub.server_close()
+
+
+@pytest.fixture(autouse=True)
+def local_state(monkeypatch, tmp_path):
+    """Keep ready-time history and cache out of Resources/."""
+    monkeypatch.setattr(airbnb_listings_fetch, '_ready_times', ReadyTimeHistogram())
+    monkeypatch.setattr(airbnb_listings_fetch, '_snapshot_cache', SnapshotCache(str(tmp_path / 'cache')))
+
+
+async def collect_locations(locations, server):
+    results = []
+    async for location, snapshot_id, listings_data, _ in airbnb_listings_fetch.fetch_many_locations(
+        locations, api_key='test', max_poll_interval=POLL_INTERVAL, timeout=30, base_url=server.base_url
+    ):
+        results.append((location, time.monotonic(), len(listings_data)))
+    return results
+
+
+def test_fetch_many_locations_yields_in_completion_order(server):
+    server.delays = {'slow': 1.5, 'fast': 0.3, 'medium': 0.9}
+
+    start = time.monotonic()
+    results = asyncio.run(collect_locations(['slow', 'fast', 'medium'], server))
+    elapsed = time.monotonic() - start
+
+    assert [location for location, _, _ in results] == ['fast', 'medium', 'slow']
+    assert all(count == LISTINGS_PER_LOCATION for _, _, count in results)
+    # Polled concurrently: close to the slowest snapshot, not the 2.7s sum
+    assert 1.5 <= elapsed < 2.1
+    assert results[0][1] - start < 0.9
+
+
+def test_fetch_many_locations_groups_failures(server):
+    server.delays = {'slow': 0.6, 'fast': 0.2}
+    yielded = []
+
+    async def run():
+        async for location, _, _, _ in airbnb_listings_fetch.fetch_many_locations(
+            ['slow', 'BAD', 'fast'], api_key='test', max_poll_interval=POLL_INTERVAL,
+            timeout=30, base_url=server.base_url
+        ):
+            yielded.append(location)
+
+    with pytest.raises(ExceptionGroup) as info:
+        asyncio.run(run())
+
+    # The failure is raised only after every other location finished
+    assert yielded == ['fast', 'slow']
+    assert len(info.value.exceptions) == 1
+    error = info.value.exceptions[0]
+    assert error.response.status_code == 400
+    assert 'Location: BAD' in error.__notes__
+
+
+def test_fetch_by_urls_reports_each_url(server):
+    urls = [
+        'https://www.airbnb.ca/rooms/101',
+        'https://www.airbnb.ca/rooms/102?missing=1',
+        'https://www.airbnb.ca/rooms/103?error=1',
+        'https://www.airbnb.ca/rooms/104',
+        'https://www.airbnb.ca/rooms/105?BAD=1',
+        'https://www.airbnb.ca/rooms/101',
+    ]
+    server.delays = {urls[0]: 0.3}
+
+    results, listings_df = asyncio.run(airbnb_listings_fetch.fetch_airbnb_listings_by_urls(
+        urls, api_key='test', chunk_size=2, max_poll_interval=POLL_INTERVAL,
+        timeout=30, base_url=server.base_url
+    ))
+
+    assert [r['url'] for r in results] == urls
+    assert [r['status'] for r in results] == ['ok', 'missing', 'error', 'ok', 'error', 'ok']
+    assert [r['property_id'] for r in results] == ['101', '102', '103', '104', '105', '101']
+    assert results[0]['listing']['property_id'] == '101'
+    assert results[2]['error'] == 'dead_page: Page not found'
+    # The chunk with the rejected trigger fails on its own, without a snapshot
+    assert results[4]['snapshot_id'] is None and 'HTTPError' in results[4]['error']
+    assert results[3]['snapshot_id'] == results[2]['snapshot_id']
+    assert sorted(listings_df['property_id']) == ['101', '104']
+    assert len(server.snapshots) == 2
+
+
+@pytest.mark.parametrize('mode', ['sync', 'async'])
+def test_polling_honours_retry_after(server, mode):
+    url = 'https://www.airbnb.ca/rooms/201'
+    server.throttle = {url: 1}
+    snapshot_id = airbnb_listings_fetch.get_brightdata_snapshot_by_url(url, 'test', base_url=server.base_url)
+
+    if mode == 'sync':
+        output = airbnb_listings_fetch.get_snapshot_output(
+            snapshot_id, 'test', timeout=30, max_interval=POLL_INTERVAL, base_url=server.base_url
+        )
+    else:
+        session = airbnb_listings_fetch.create_shared_session(1)
+        with session:
+            output = asyncio.run(airbnb_listings_fetch.poll_snapshot_output_async(
+                snapshot_id, 'test', session, 'url', POLL_INTERVAL, 30, server.base_url
+            ))
+
+    assert output[0]['property_id'] == '201'
+    polls = server.snapshots[snapshot_id]['polls']
+    assert len(polls) == 2
+    # Retry-After: 1 overrides the much shorter poll interval
+    assert polls[1] - polls[0] >= 0.95
+
+
+def test_stream_snapshot_listings(server, tmp_path):
+    server.delays = {'Beltline': 0.4}
+    snapshot_id = airbnb_listings_fetch.get_brightdata_snapshot_by_location(
+        'Beltline', 10, 'test', base_url=server.base_url
+    )
+    downloads = tmp_path / 'downloads'
+    downloads.mkdir()
+    path = str(downloads / f"airbnb_listing_s_{snapshot_id}.ndjson.gz")
+
+    listings = list(airbnb_listings_fetch.stream_snapshot_listings(
+        snapshot_id, 'test', path, timeout=30, dataset_type='location',
+        max_interval=POLL_INTERVAL, base_url=server.base_url
+    ))
+
+    assert listings == snapshot_output(server.snapshots[snapshot_id]['inputs'])
+    assert len(listings) == LISTINGS_PER_LOCATION
+    # Polled through the running phase before the download
+    assert len(server.snapshots[snapshot_id]['polls']) > 1
+    # Written atomically: only the finished file, no .part left behind
+    assert os.listdir(downloads) == [os.path.basename(path)]
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        assert [json.loads(line) for line in f] == listings
+    assert list(airbnb_listings_fetch.iter_snapshot_listings(path)) == listings
+
+
+def test_import_has_no_side_effects(tmp_path):
+    env = {name: value for name, value in os.environ.items() if name != 'BRIGHTDATA_API_KEY'}
+    env['PYTHONPATH'] = os.path.abspath(REPO_ROOT)
+
+    subprocess.run(
+        [sys.executable, '-c', 'import airbnb_listings_fetch'],
+        cwd=tmp_path, env=env, check=True, capture_output=True
+    )
+    assert not (tmp_path / 'Resources').exists()
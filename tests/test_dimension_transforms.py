@@ -0,0 +1,134 @@
+"""
+Parity tests for dimension_transforms.
+
+Every columnar transform must reproduce its scalar ``DimensionalETL``
+counterpart exactly, on tier boundaries, NULLs, Decimal and float inputs and
+random values.
+"""
+
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+import dimension_transforms
+from etl_normalized_to_dimensional import DimensionalETL
+
+N_SAMPLES = 2000
+BOUNDARIES = [0, 4.0, 4.5, 4.8, 5.0]
+DISTANCE_BOUNDARIES = [1.0, 3.0, 7.0]
+
+
+@pytest.fixture(scope='module')
+def etl():
+    """ETL instance for the scalar helpers (no database connection)."""
+    return DimensionalETL({}, {})
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(42)
+
+
+def around(values):
+    """Each value plus its nearest floats below and above."""
+    return [np.nextafter(v, d) for v in values for d in (-np.inf, np.inf)] + list(values)
+
+
+@pytest.fixture
+def decimal_ratings(rng):
+    """NUMERIC ratings: None, every cent from 0 to 5 and random values."""
+    return ([None] + [Decimal(f"{v:.2f}") for v in np.arange(0, 5.01, 0.01)]
+            + [Decimal(f"{v:.2f}") for v in rng.uniform(0, 5, N_SAMPLES)])
+
+
+@pytest.fixture
+def float_scores(rng):
+    """Float scores: None, NaN, values around every threshold and random values."""
+    return [None, float('nan')] + around(BOUNDARIES) + rng.uniform(0, 5, N_SAMPLES).tolist()
+
+
+@pytest.fixture
+def integers(rng):
+    """Integer counts: None, negatives, every value up to 59 and random values."""
+    return [None] + list(range(-2, 60)) + rng.integers(0, 60, N_SAMPLES).tolist()
+
+
+def test_classify_host_tiers(etl, decimal_ratings):
+    flags = [bool(i % 2) for i in range(len(decimal_ratings))]
+    flags[1::3] = [None] * len(flags[1::3])
+
+    vectorized = dimension_transforms.classify_host_tiers(
+        flags, dimension_transforms.float_column(decimal_ratings)
+    )
+    assert vectorized.tolist() == [etl.classify_host_tier(f, r) for f, r in zip(flags, decimal_ratings)]
+
+
+def test_classify_host_tiers_float_input(etl, float_scores):
+    ratings = [s for s in float_scores if s is None or s == s]
+    flags = [True] * len(ratings)
+
+    vectorized = dimension_transforms.classify_host_tiers(
+        flags, dimension_transforms.float_column(ratings), decimal_input=False
+    )
+    assert vectorized.tolist() == [etl.classify_host_tier(f, r) for f, r in zip(flags, ratings)]
+
+
+def test_classify_experience_levels(etl, integers):
+    vectorized = dimension_transforms.classify_experience_levels(dimension_transforms.float_column(integers))
+    assert vectorized.tolist() == [etl.classify_experience_level(y) for y in integers]
+
+
+def test_classify_property_size_tiers(etl, integers):
+    vectorized = dimension_transforms.classify_property_size_tiers(dimension_transforms.float_column(integers))
+    assert vectorized.tolist() == [etl.classify_property_size_tier(b) for b in integers]
+
+
+def test_classify_location_tiers(etl, rng):
+    distances = [0.0] + around(DISTANCE_BOUNDARIES) + rng.uniform(0, 20, N_SAMPLES).tolist()
+
+    vectorized = dimension_transforms.classify_location_tiers(np.array(distances))
+    assert vectorized.tolist() == [etl.classify_location_tier(d) for d in distances]
+
+
+def test_classify_location_tiers_nan_is_suburban():
+    assert dimension_transforms.classify_location_tiers(np.array([np.nan])).tolist() == ['Suburban']
+
+
+def test_classify_quality_tiers(etl, float_scores):
+    vectorized = dimension_transforms.classify_quality_tiers(dimension_transforms.float_column(float_scores))
+    assert vectorized.tolist() == [etl.classify_quality_tier(q) for q in float_scores]
+
+
+def test_classify_amenity_tiers(etl, integers):
+    scores = [i for i in integers if i is not None] + around([15, 30, 50])
+
+    vectorized = dimension_transforms.classify_amenity_tiers(np.array(scores))
+    assert vectorized.tolist() == [etl.classify_amenity_tier(s) for s in scores]
+
+
+def test_haversine_to_point(etl, rng):
+    lats = rng.uniform(50.8, 51.3, N_SAMPLES)
+    lons = rng.uniform(-114.4, -113.8, N_SAMPLES)
+    ref_lat, ref_lon = etl.CALGARY_DOWNTOWN_LAT, etl.CALGARY_DOWNTOWN_LONG
+
+    vectorized = dimension_transforms.haversine_to_point(lats, lons, ref_lat, ref_lon)
+    scalar = [
+        float(etl.calculate_haversine_distance(lat, lon, ref_lat, ref_lon))
+        for lat, lon in zip(lats.tolist(), lons.tolist())
+    ]
+    assert vectorized.tolist() == scalar
+
+
+def test_haversine_to_point_decimal_coordinates(etl):
+    lats = [Decimal('51.0447'), Decimal('51.05'), Decimal('50.99123')]
+    lons = [Decimal('-114.0719'), Decimal('-114.1'), Decimal('-113.95001')]
+    ref_lat, ref_lon = etl.CALGARY_DOWNTOWN_LAT, etl.CALGARY_DOWNTOWN_LONG
+
+    vectorized = dimension_transforms.haversine_to_point(
+        dimension_transforms.float_column(lats), dimension_transforms.float_column(lons), ref_lat, ref_lon
+    )
+    assert vectorized.tolist() == [
+        float(etl.calculate_haversine_distance(lat, lon, ref_lat, ref_lon)) for lat, lon in zip(lats, lons)
+    ]
+    assert vectorized[0] == 0.0
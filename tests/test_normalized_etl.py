@@ -0,0 +1,102 @@
+"""
+Tests for the change detection of etl_airbnb_normalized_postgres.
+
+A listing whose content_hash changed is re-upserted, so the ON CONFLICT
+clauses must overwrite every column the hash covers; otherwise the new hash
+is stored beside stale values and later runs skip the listing.
+"""
+
+import copy
+import gzip
+import json
+import os
+import re
+
+import pytest
+
+from airbnb_listings_fetch import iter_snapshot_listings
+from etl_airbnb_normalized_postgres import AirbnbETL
+
+SAMPLE_LISTING = os.path.join(os.path.dirname(__file__), '..', 'Resources', 'airbnb_listing_1300059188064308611.json')
+
+
+def updated_columns(query):
+    return set(re.findall(r'(\w+) = EXCLUDED\.\1', query))
+
+
+@pytest.fixture(scope='module')
+def etl():
+    return AirbnbETL({})
+
+
+@pytest.fixture
+def listing():
+    with open(SAMPLE_LISTING, encoding='utf-8') as f:
+        data = json.load(f)
+    return copy.deepcopy(data[0] if isinstance(data, list) else data)
+
+
+def test_listing_upsert_updates_every_hashed_column():
+    hashed = {name for name, _ in AirbnbETL.LISTING_COLUMNS} - {'property_id', 'timestamp'}
+    assert updated_columns(AirbnbETL.LISTING_UPSERT_QUERY) == hashed
+
+
+def test_host_upsert_updates_every_hashed_column():
+    hashed = {name for name, _ in AirbnbETL.HOST_COLUMNS} - {'host_id'}
+    assert updated_columns(AirbnbETL.HOST_UPSERT_QUERY) == hashed
+
+
+def test_content_hash_ignores_scrape_timestamp(etl, listing):
+    rescraped = copy.deepcopy(listing)
+    rescraped['timestamp'] = '2030-01-01T00:00:00.000Z'
+    assert etl.content_hash(rescraped) == etl.content_hash(listing)
+
+
+@pytest.mark.parametrize('field, value', [
+    ('name', 'Renamed listing'),
+    ('description', 'A new description'),
+    ('guests', 99),
+])
+def test_content_hash_detects_listing_changes(etl, listing, field, value):
+    changed = copy.deepcopy(listing)
+    changed[field] = value
+    assert etl.content_hash(changed) != etl.content_hash(listing)
+
+
+@pytest.fixture
+def listings(listing):
+    renamed = copy.deepcopy(listing)
+    renamed['property_id'] = '1'
+    renamed['name'] = 'Second listing, with a "quoted" name'
+    return [listing, renamed]
+
+
+def test_stream_gzip_ndjson_snapshot(etl, listings, tmp_path):
+    # Same layout as airbnb_listings_fetch.download_snapshot_ndjson writes
+    path = str(tmp_path / 'airbnb_listing_s_test.ndjson.gz')
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        f.writelines(json.dumps(listing) + '\n' for listing in listings)
+
+    assert list(etl.stream_json_data(path)) == listings
+    assert list(etl.stream_json_data(path)) == list(iter_snapshot_listings(path))
+
+
+def test_read_gzip_json_array(etl, listings, tmp_path):
+    path = str(tmp_path / 'listings.json.gz')
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        json.dump(listings, f)
+
+    assert list(etl.read_listings(path, stream=True)) == listings
+    assert etl.read_listings(path, stream=False) == listings
+
+
+def test_bulk_buffers_isolate_malformed_listings(listings):
+    good, malformed = listings
+    malformed['availability'] = True  # not the string the row builder expects
+
+    etl = AirbnbETL({})
+    buffers, row_by_row = etl.build_bulk_buffers([good, malformed])
+
+    assert [row[0] for row in buffers['listings']] == [good['property_id']]
+    assert {row[0] for row in buffers['listing_amenities']} <= {good['property_id']}
+    assert row_by_row == [malformed]
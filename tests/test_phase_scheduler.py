@@ -0,0 +1,137 @@
+"""
+Tests for phase_scheduler.
+"""
+
+import threading
+import time
+
+import pytest
+
+from phase_scheduler import Phase, PhaseError, PhaseScheduler
+
+DIMENSIONS = ('dim_host', 'dim_property', 'dim_location', 'dim_category_ratings')
+
+# Same shape as the run_full_etl DAG (without the optional phases)
+DEPENDENCIES = {
+    'snapshot_partitions': (),
+    **{name: () for name in DIMENSIONS},
+    'fact_listing_metrics': ('snapshot_partitions', *DIMENSIONS),
+    'fact_listing_amenities_summary': ('fact_listing_metrics',),
+    'competitor_similarity': ('fact_listing_metrics', 'fact_listing_amenities_summary'),
+    'pricing_analysis': ('competitor_similarity',),
+    'refresh_views': ('pricing_analysis',),
+}
+
+
+class Recorder:
+    """Phase callables that log start/end events, optionally failing one phase."""
+
+    def __init__(self, fail=None, duration=0.05):
+        self.fail = fail
+        self.duration = duration
+        self.events = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def phase(self, name):
+        def run():
+            with self.lock:
+                self.events.append(('start', name))
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+            time.sleep(self.duration)
+            with self.lock:
+                self.active -= 1
+                self.events.append(('end', name))
+            if name == self.fail:
+                raise RuntimeError(f"{name} broke")
+        return run
+
+    def started(self):
+        return [name for event, name in self.events if event == 'start']
+
+    def position(self, event, name):
+        return self.events.index((event, name))
+
+
+def scheduler(recorder, max_workers):
+    return PhaseScheduler(
+        [Phase(name, recorder.phase(name), deps) for name, deps in DEPENDENCIES.items()],
+        max_workers=max_workers
+    )
+
+
+@pytest.mark.parametrize('max_workers', [1, 3])
+def test_dependencies_finish_before_dependents_start(max_workers):
+    recorder = Recorder()
+    timings = scheduler(recorder, max_workers).run()
+
+    assert set(timings) == set(DEPENDENCIES)
+    assert sorted(recorder.started()) == sorted(DEPENDENCIES)
+    for name, deps in DEPENDENCIES.items():
+        for dep in deps:
+            assert recorder.position('end', dep) < recorder.position('start', name)
+    assert recorder.max_active == min(max_workers, 3)
+
+
+@pytest.mark.parametrize('max_workers', [1, 3])
+def test_failed_phase_stops_its_dependents(max_workers):
+    recorder = Recorder(fail='fact_listing_amenities_summary')
+
+    with pytest.raises(PhaseError) as info:
+        scheduler(recorder, max_workers).run()
+
+    assert info.value.phase == 'fact_listing_amenities_summary'
+    assert isinstance(info.value.error, RuntimeError)
+    assert isinstance(info.value.__cause__, RuntimeError)
+    started = set(recorder.started())
+    assert 'fact_listing_amenities_summary' in started
+    assert not started & {'competitor_similarity', 'pricing_analysis', 'refresh_views'}
+
+
+def test_running_phases_finish_after_a_failure():
+    recorder = Recorder(fail='dim_host')
+    phases = [Phase(name, recorder.phase(name), DEPENDENCIES[name]) for name in DIMENSIONS]
+    phases[1] = Phase('dim_property', recorder.phase('dim_property'))
+
+    with pytest.raises(PhaseError):
+        PhaseScheduler(phases, max_workers=2).run()
+
+    # dim_property was started alongside dim_host and is not abandoned;
+    # nothing new starts once dim_host has failed
+    assert recorder.started() == ['dim_host', 'dim_property']
+    assert ('end', 'dim_property') in recorder.events
+
+
+@pytest.mark.parametrize('max_workers', [1, 3])
+@pytest.mark.parametrize('resume_from', ['fact_listing_metrics', 'competitor_similarity', 'dim_location'])
+def test_resume_skips_exactly_the_ancestors(max_workers, resume_from):
+    recorder = Recorder(duration=0.01)
+    phases = scheduler(recorder, max_workers)
+    timings = phases.run(resume_from=resume_from)
+
+    skipped = phases.ancestors(resume_from)
+    assert set(recorder.started()) == set(DEPENDENCIES) - skipped
+    assert set(timings) == set(DEPENDENCIES) - skipped
+    assert resume_from in timings
+
+
+def test_ancestors_are_transitive():
+    phases = scheduler(Recorder(), 1)
+    assert phases.ancestors('competitor_similarity') == {
+        'snapshot_partitions', *DIMENSIONS, 'fact_listing_metrics', 'fact_listing_amenities_summary'
+    }
+    assert phases.ancestors('dim_host') == set()
+
+
+def test_invalid_phases():
+    run = Recorder().phase('x')
+    with pytest.raises(ValueError, match='unknown phases'):
+        PhaseScheduler([Phase('a', run, ('missing',))])
+    with pytest.raises(ValueError, match='before its dependencies'):
+        PhaseScheduler([Phase('b', run, ('a',)), Phase('a', run)])
+    with pytest.raises(ValueError, match='unique'):
+        PhaseScheduler([Phase('a', run), Phase('a', run)])
+    with pytest.raises(ValueError, match='Unknown phase to resume from'):
+        PhaseScheduler([Phase('a', run)]).run(resume_from='b')
@@ -0,0 +1,195 @@
+"""
+Parity tests for pricing_engine.
+
+The expected values follow PostgreSQL semantics of the SQL path in
+``DimensionalETL.compute_pricing_stats_sql``: ``COUNT(*)`` counts NULL
+prices, the other aggregates skip them, ``SUM(price * weight)`` skips rows
+where either is NULL, and ``PERCENTILE_CONT`` interpolates as
+``lo + (hi - lo) * fraction``.
+
+Set PRICING_TEST_DSN (a libpq connection string) to also run the fixtures
+through the SQL aggregates of a live PostgreSQL.
+"""
+
+import math
+import os
+
+import numpy as np
+import pytest
+
+import pricing_engine
+
+NAN = float('nan')
+
+# listing_key -> competitor (price, weight) rows, None for NULL
+BRIDGE_ROWS = {
+    1: [(100.00, 1.000)],  # single competitor
+    2: [(200.00, 0.200), (100.00, 0.500), (150.00, 0.300)],  # odd count, unsorted
+    3: [(80.50, 0.400), (300.25, 0.100), (99.99, 0.300), (120.00, 0.200)],  # even count
+    4: [(None, 0.500), (50.00, 0.250), (None, 0.125), (70.00, 0.125)],  # NULL prices
+    5: [(None, 0.600), (None, 0.400)],  # only NULL prices
+    6: [(100.00, None), (200.00, 0.500)],  # NULL weight
+}
+
+EXPECTED_STATS = {
+    # key: (count, avg, min, max, median, p25, p75, weighted_avg)
+    1: (1, 100.0, 100.0, 100.0, 100.0, 100.0, 100.0, 100.0),
+    2: (3, 150.0, 100.0, 200.0, 150.0, 125.0, 175.0, 135.0),
+    3: (4, 150.185, 80.5, 300.25, 109.995, 95.1175, 165.0625, 116.222),
+    4: (4, 60.0, 50.0, 70.0, 60.0, 55.0, 65.0, 21.25),
+    5: (2, NAN, NAN, NAN, NAN, NAN, NAN, NAN),
+    6: (2, 150.0, 100.0, 200.0, 150.0, 125.0, 175.0, 100.0),
+}
+
+STAT_NAMES = ('competitor_count', 'avg_price', 'min_price', 'max_price',
+              'median_price', 'p25_price', 'p75_price', 'weighted_avg_price')
+
+
+def bridge_columns():
+    """Bridge rows as (listing_keys, price_cents, weight_milli) arrays, like compute_pricing_stats."""
+    rows = [(key, price, weight) for key, competitors in BRIDGE_ROWS.items() for price, weight in competitors]
+    # Interleave listings so build_price_matrix has to group them
+    rows.sort(key=lambda row: (row[1] is None, row[1] or 0))
+    keys = np.array([key for key, _, _ in rows], dtype=np.int64)
+    cents = np.array([NAN if p is None else round(p * pricing_engine.CENTS) for _, p, _ in rows])
+    milli = np.array([NAN if w is None else round(w * pricing_engine.WEIGHT_SCALE) for _, _, w in rows])
+    return keys, cents, milli
+
+
+@pytest.fixture
+def stats():
+    keys, prices, weights, counts = pricing_engine.build_price_matrix(*bridge_columns())
+    assert keys.tolist() == sorted(BRIDGE_ROWS)
+    return pricing_engine.competitor_price_stats(prices, weights, counts)
+
+
+def assert_matches(actual, expected):
+    assert len(actual) == len(expected)
+    for a, e in zip(actual, expected):
+        if math.isnan(e):
+            assert math.isnan(a)
+        else:
+            assert a == pytest.approx(e, rel=0, abs=1e-9)
+
+
+@pytest.mark.parametrize('index, name', list(enumerate(STAT_NAMES)))
+def test_competitor_price_stats(stats, index, name):
+    expected = [EXPECTED_STATS[key][index] for key in sorted(BRIDGE_ROWS)]
+    assert_matches(stats[name].tolist(), expected)
+
+
+def test_build_price_matrix_pads_with_nan():
+    keys, prices, weights, counts = pricing_engine.build_price_matrix(
+        np.array([7, 3, 7]), np.array([100.0, 200.0, 300.0]), np.array([1.0, 2.0, 3.0])
+    )
+    assert keys.tolist() == [3, 7]
+    assert counts.tolist() == [1, 2]
+    assert prices[0, 0] == 200.0 and np.isnan(prices[0, 1])
+    assert prices[1].tolist() == [100.0, 300.0]
+
+
+def test_empty_input():
+    keys, prices, weights, counts = pricing_engine.build_price_matrix(np.array([]), np.array([]), np.array([]))
+    stats = pricing_engine.competitor_price_stats(prices, weights, counts)
+    assert len(keys) == 0
+    assert all(len(values) == 0 for values in stats.values())
+
+
+@pytest.mark.parametrize('fraction', [0.0, 0.25, 0.5, 0.75, 0.9, 1.0])
+def test_percentile_cont_uses_postgres_interpolation(fraction):
+    rng = np.random.default_rng(7)
+    sorted_values = np.sort(rng.uniform(10, 500, (200, 9)), axis=1)
+    n_valid = rng.integers(1, 10, 200)
+    sorted_values[np.arange(9) >= n_valid[:, None]] = np.nan
+
+    expected = []
+    for row, n in zip(sorted_values.tolist(), n_valid.tolist()):
+        position = fraction * (n - 1)
+        lo, hi = row[math.floor(position)], row[math.ceil(position)]
+        expected.append(lo if lo == hi else lo + (hi - lo) * (position - math.floor(position)))
+
+    # Bit-identical, not just close
+    assert pricing_engine.percentile_cont(sorted_values, n_valid, fraction).tolist() == expected
+
+
+def test_percentile_cont_rows_without_values():
+    result = pricing_engine.percentile_cont(np.full((2, 3), np.nan), np.array([0, 0]), 0.5)
+    assert np.isnan(result).all()
+
+
+def recommend(weighted, current_price, rating, p25=100.0, p75=200.0):
+    stats = {
+        'weighted_avg_price': np.array([weighted]),
+        'p25_price': np.array([p25]),
+        'p75_price': np.array([p75]),
+    }
+    recommendations = pricing_engine.price_recommendations(stats, np.array([current_price]), np.array([rating]))
+    return {name: values[0] for name, values in recommendations.items()}
+
+
+def test_price_recommendations():
+    result = recommend(135.0, 150.0, 4.5, p25=125.0, p75=175.0)
+    assert result['price_premium_discount'] == pytest.approx((150.0 - 135.0) / 135.0 * 100)
+    assert result['recommended_price_lower'] == pytest.approx(118.75)
+    assert result['recommended_price_upper'] == pytest.approx(183.75)
+    assert result['recommended_optimal_price'] == pytest.approx(135.0)
+
+
+@pytest.mark.parametrize('rating, factor', [(5.4, 1.15), (3.0, 0.85), (4.95, 1.1)])
+def test_quality_adjustment_is_capped(rating, factor):
+    assert recommend(100.0, 90.0, rating)['recommended_optimal_price'] == pytest.approx(100.0 * factor)
+
+
+@pytest.mark.parametrize('current_price', [0.0, NAN])
+def test_missing_current_price_has_no_premium(current_price):
+    result = recommend(135.0, current_price, 4.5)
+    assert np.isnan(result['price_premium_discount'])
+    assert result['recommended_optimal_price'] == pytest.approx(135.0)
+
+
+@pytest.mark.parametrize('rating', [0.0, NAN])
+def test_missing_rating_keeps_weighted_average(rating):
+    assert recommend(135.0, 150.0, rating)['recommended_optimal_price'] == pytest.approx(135.0)
+
+
+def test_missing_statistics():
+    result = recommend(NAN, 150.0, 4.5, p25=0.0, p75=NAN)
+    assert np.isnan(result['price_premium_discount'])
+    assert np.isnan(result['recommended_price_lower'])
+    assert np.isnan(result['recommended_price_upper'])
+    assert np.isnan(result['recommended_optimal_price'])
+    assert np.isnan(recommend(0.0, 150.0, 4.5)['price_premium_discount'])
+
+
+@pytest.mark.skipif(not os.getenv('PRICING_TEST_DSN'), reason='PRICING_TEST_DSN not set')
+def test_matches_postgres_aggregates(stats):
+    psycopg2 = pytest.importorskip('psycopg2')
+
+    rows = [(key, price, weight) for key, competitors in BRIDGE_ROWS.items() for price, weight in competitors]
+    with psycopg2.connect(os.environ['PRICING_TEST_DSN']) as conn, conn.cursor() as cursor:
+        # Same aggregates as DimensionalETL.compute_pricing_stats_sql
+        cursor.execute("""
+            WITH competitor_prices (listing_key, competitor_price, weight) AS (
+                SELECT key, price::DECIMAL(10, 2), weight::DECIMAL(4, 3)
+                FROM unnest(%s::integer[], %s::float8[], %s::float8[]) AS rows (key, price, weight)
+            )
+            SELECT
+                listing_key,
+                COUNT(*) as competitor_count,
+                AVG(competitor_price) as avg_price,
+                MIN(competitor_price) as min_price,
+                MAX(competitor_price) as max_price,
+                PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY competitor_price) as median_price,
+                PERCENTILE_CONT(0.25) WITHIN GROUP (ORDER BY competitor_price) as p25_price,
+                PERCENTILE_CONT(0.75) WITHIN GROUP (ORDER BY competitor_price) as p75_price,
+                SUM(competitor_price * weight) as weighted_avg_price
+            FROM competitor_prices
+            GROUP BY listing_key
+            ORDER BY listing_key
+        """, ([r[0] for r in rows], [r[1] for r in rows], [r[2] for r in rows]))
+        sql_rows = cursor.fetchall()
+
+    assert [row[0] for row in sql_rows] == sorted(BRIDGE_ROWS)
+    for index, name in enumerate(STAT_NAMES):
+        sql_values = [NAN if row[index + 1] is None else float(row[index + 1]) for row in sql_rows]
+        assert_matches(stats[name].tolist(), sql_values)
@@ -0,0 +1,104 @@
+"""
+Tests for similarity_engine: parity with the pairwise loop and the spatial candidate stage.
+"""
+
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+import similarity_engine
+from etl_normalized_to_dimensional import DimensionalETL
+
+N_LISTINGS = 60
+N_DUPLICATES = 10
+
+
+def feature_rows(coordinates, clusters):
+    """Similarity feature rows (see build_feature_arrays) at the given coordinates."""
+    return [
+        (key, f"p{key}", 100.0, 4.5, 1, 1, 1.0, 2, lat, lon, cluster, 4.5, 20)
+        for key, ((lat, lon), cluster) in enumerate(zip(coordinates, clusters), start=1)
+    ]
+
+
+def random_rows(seed, n=N_LISTINGS):
+    """
+    Similarity feature rows with NULL prices, ratings, bedrooms, clusters and
+    amenity scores, and prices drawn from a few values. The last listings
+    copy the attributes of the first ones, so overall scores tie exactly.
+    """
+    rng = np.random.default_rng(seed)
+
+    def maybe_null(value, p=0.15):
+        return None if rng.random() < p else value
+
+    rows = [
+        (
+            key, f"p{key}",
+            maybe_null(Decimal(str(rng.choice([80, 95, 120, 120, 150, 200])))),
+            maybe_null(Decimal(f"{rng.uniform(3.5, 5):.2f}")),
+            maybe_null(int(rng.integers(0, 4))),
+            int(rng.integers(1, 5)), int(rng.integers(1, 3)), int(rng.integers(1, 9)),
+            Decimal(f"{rng.uniform(51.0, 51.1):.7f}"), Decimal(f"{rng.uniform(-114.15, -114.0):.7f}"),
+            maybe_null(int(rng.integers(0, 5))),
+            maybe_null(float(rng.uniform(3, 5))),
+            maybe_null(int(rng.choice([10, 20, 20, 35]))),
+        )
+        for key in range(1, n - N_DUPLICATES + 1)
+    ]
+    return rows + [(n - N_DUPLICATES + 1 + i, f"d{i}") + row[2:] for i, row in enumerate(rows[:N_DUPLICATES])]
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('block_size', [7, 512])
+def test_vectorized_matches_loop(seed, block_size):
+    rows = random_rows(seed)
+    etl = DimensionalETL({}, {})
+
+    loop = [
+        (
+            s['listing_key'], s['competitor_key'], s['rank'],
+            round(s['overall_similarity'], 2),
+            round(s['location_similarity'], 2),
+            round(s['property_similarity'], 2),
+            round(s['quality_similarity'], 2),
+            round(s['amenity_similarity'], 2),
+            round(s['price_similarity'], 2),
+            round(s['weight'], 4)
+        )
+        for s in etl._score_competitors_loop(rows)
+    ]
+
+    features = similarity_engine.build_feature_arrays(rows)
+    blocks = similarity_engine.iter_competitor_blocks(features, top_k=25, block_size=block_size)
+    vectorized = [
+        values for block in blocks
+        for values in similarity_engine.block_to_bridge_values(features, block)
+    ]
+
+    assert len(loop) == N_LISTINGS * 25
+    assert vectorized == loop
+
+
+def test_candidate_index_without_listings():
+    features = similarity_engine.build_feature_arrays([])
+    index = similarity_engine.CandidateIndex(features, n_neighbors=200)
+
+    assert index.tree is None
+    cand_idx, valid = index.candidates(np.array([], dtype=np.int64))
+    assert cand_idx.shape == (0, 0) and valid.shape == (0, 0)
+    assert similarity_engine.check_candidate_recall(features, index, top_k=25) == 1.0
+
+
+def test_candidates_are_nearest_plus_cluster_members():
+    # Listings 0-2 are close together; 3 is far away but shares cluster 1 with listing 0
+    coordinates = [(51.04, -114.07), (51.041, -114.071), (51.042, -114.07), (51.30, -113.50)]
+    features = similarity_engine.build_feature_arrays(feature_rows(coordinates, [1, 2, 2, 1]))
+    index = similarity_engine.CandidateIndex(features, n_neighbors=2)
+
+    cand_idx, valid = index.candidates(np.array([0]))
+    candidates = cand_idx[0][valid[0]].tolist()
+    assert candidates == sorted(candidates)
+    assert 3 in candidates
+    assert set(candidates) & {1, 2}
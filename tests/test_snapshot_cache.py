@@ -0,0 +1,141 @@
+"""
+Tests for snapshot_cache: request normalization, TTL expiry, LRU eviction
+and the snapshot_id index.
+"""
+
+import gzip
+import json
+import os
+
+import pytest
+
+import snapshot_cache
+from snapshot_cache import INDEX_FILE, SnapshotCache, normalize_request
+
+TTL = 3600
+FIELDS = ['name', 'price', 'property_id']
+LISTINGS = [{'property_id': str(i), 'name': f"Listing {i}", 'price': 100 + i} for i in range(20)]
+
+
+class Clock:
+    """Stand-in for the time module with a settable time()."""
+
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(snapshot_cache, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    return SnapshotCache(str(tmp_path / 'cache'), ttl=TTL)
+
+
+def location(name):
+    return normalize_request('location', name, 'CA', 'CAD', 100, FIELDS)
+
+
+def read_listings(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_normalized_requests_share_a_key():
+    assert location('  Beltline,   Calgary ') == location('beltline, calgary')
+    assert (normalize_request('url', 'HTTPS://www.Airbnb.ca/rooms/1/?b=2&a=1#photos', 'ca', 'cad', None, FIELDS)
+            == normalize_request('url', 'https://www.airbnb.ca/rooms/1?a=1&b=2', 'CA', 'CAD', None, FIELDS[::-1]))
+    assert location('Beltline, Calgary') != normalize_request('location', 'Beltline, Calgary', 'CA', 'CAD', 50, FIELDS)
+
+
+def test_hit(cache, clock):
+    path = cache.put(location('Beltline, Calgary'), 's_1', iter(LISTINGS))
+    clock.now += TTL - 1
+
+    assert cache.get(location('beltline, calgary')) == ('s_1', path)
+    assert read_listings(path) == LISTINGS
+    assert not os.path.exists(f"{path}.part")
+
+    # The index survives a restart
+    assert SnapshotCache(cache.directory, ttl=TTL).get(location('Beltline, Calgary')) == ('s_1', path)
+
+
+def test_stale_entry_is_removed(cache, clock):
+    path = cache.put(location('Beltline, Calgary'), 's_1', LISTINGS)
+    clock.now += TTL + 1
+
+    assert cache.get(location('Beltline, Calgary')) is None
+    assert not os.path.exists(path)
+    assert cache.index == {'entries': {}, 'snapshots': {}}
+    with open(os.path.join(cache.directory, INDEX_FILE)) as f:
+        assert json.load(f) == {'entries': {}, 'snapshots': {}}
+
+
+def test_max_age_miss_keeps_fresh_entry(cache, clock):
+    path = cache.put(location('Beltline, Calgary'), 's_1', LISTINGS)
+    clock.now += 600
+
+    assert cache.get(location('Beltline, Calgary'), max_age=60) is None
+    assert cache.get(location('Beltline, Calgary')) == ('s_1', path)
+
+
+def test_expired_entries_are_swept_below_size_cap(cache, clock):
+    old_path = cache.put(location('Beltline, Calgary'), 's_1', LISTINGS)
+    clock.now += TTL + 1
+    cache.put(location('Kensington, Calgary'), 's_2', LISTINGS)
+
+    assert not os.path.exists(old_path)
+    assert list(cache.index['snapshots']) == ['s_2']
+
+
+def test_evicts_least_recently_used(cache, clock):
+    names = ['Beltline', 'Kensington', 'Mission', 'Bridgeland']
+    paths = {}
+    for i, name in enumerate(names[:3]):
+        paths[name] = cache.put(location(name), f"s_{i}", LISTINGS)
+        clock.now += 10
+    # Room for three files; Beltline is read again, so Kensington is least recently used
+    cache.max_bytes = sum(entry['size'] for entry in cache.index['entries'].values())
+    assert cache.get(location('Beltline')) is not None
+    clock.now += 10
+
+    paths['Bridgeland'] = cache.put(location('Bridgeland'), 's_3', LISTINGS)
+
+    assert cache.get(location('Kensington')) is None
+    assert not os.path.exists(paths['Kensington'])
+    assert sorted(cache.index['snapshots']) == ['s_0', 's_2', 's_3']
+    assert all(cache.get(location(name)) is not None for name in ('Beltline', 'Mission', 'Bridgeland'))
+
+
+def test_newest_entry_is_never_evicted(cache):
+    cache.max_bytes = 1
+    cache.put(location('Beltline'), 's_1', LISTINGS)
+    path = cache.put(location('Kensington'), 's_2', LISTINGS)
+
+    assert list(cache.index['snapshots']) == ['s_2']
+    assert cache.path_for_snapshot('s_2') == path
+
+
+def test_path_for_snapshot(cache):
+    first = cache.put(location('Beltline'), 's_1', LISTINGS)
+    assert cache.path_for_snapshot('s_1') == first
+    assert cache.path_for_snapshot('s_unknown') is None
+
+    # Refreshing the request points it at the new snapshot; the old ID no longer maps to the file
+    refreshed = cache.put(location('Beltline'), 's_2', LISTINGS[:5])
+    assert refreshed == first
+    assert cache.path_for_snapshot('s_1') is None
+    assert cache.path_for_snapshot('s_2') == refreshed
+    assert read_listings(refreshed) == LISTINGS[:5]
+
+    os.remove(refreshed)
+    assert cache.path_for_snapshot('s_2') is None
+    assert cache.get(location('Beltline')) is None
+    assert cache.index['entries'] == {}